@@ -4,7 +4,7 @@ Main Flask Application for Customer Support Chatbot
 Provides web interface and API endpoints for the chatbot system.
 """
 
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session
 from flask_cors import CORS
 import uuid
 import json
@@ -13,6 +13,8 @@ from datetime import datetime
 import threading
 
 from chatbot import Chatbot
+from chatbot.export import EXPORT_FORMATS
+from chatbot.retention import validate_policy_overrides
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -94,23 +96,137 @@ def get_history():
         user_id = request.args.get('user_id')
         session_id = request.args.get('session_id')
         limit = int(request.args.get('limit', 50))
+        before = request.args.get('before')
+        after = request.args.get('after')
         
         if not user_id:
             return jsonify({'error': 'User ID is required'}), 400
         
         bot = get_chatbot()
-        history = bot.get_conversation_history(user_id, session_id, limit)
+        try:
+            page = bot.get_conversation_page(user_id, session_id, limit, before, after)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        history = page['messages']
         
         return jsonify({
             'success': True,
             'history': history,
-            'count': len(history)
+            'count': len(history),
+            'paging': {
+                'before': page['before'],
+                'after': page['after'],
+                'has_more': page['has_more']
+            }
         })
         
     except Exception as e:
         print(f"Error getting history: {e}")
         return jsonify({'error': 'Failed to retrieve history'}), 500
 
+@app.route('/api/history/archive', methods=['GET'])
+def get_archived_history():
+    """Stream archived conversation history as JSON Lines."""
+    try:
+        user_id = request.args.get('user_id')
+        session_id = request.args.get('session_id')
+        start_ms = request.args.get('start_ms', type=int)
+        end_ms = request.args.get('end_ms', type=int)
+        
+        if not user_id:
+            return jsonify({'error': 'User ID is required'}), 400
+        
+        bot = get_chatbot()
+        if bot.db.archive is None:
+            return jsonify({'error': 'Archive is not enabled'}), 404
+        
+        records = bot.db.iter_archived_history(user_id, session_id, start_ms, end_ms)
+        return Response(
+            (json.dumps(record, ensure_ascii=False) + '\n' for record in records),
+            mimetype='application/x-ndjson'
+        )
+        
+    except Exception as e:
+        print(f"Error getting archived history: {e}")
+        return jsonify({'error': 'Failed to retrieve archived history'}), 500
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """Full-text search over conversations or tickets."""
+    try:
+        query = request.args.get('q', '').strip()
+        search_type = request.args.get('type', 'conversations')
+        user_id = request.args.get('user_id')
+        start_ms = request.args.get('start_ms', type=int)
+        end_ms = request.args.get('end_ms', type=int)
+        limit = min(int(request.args.get('limit', 20)), 100)
+        offset = int(request.args.get('offset', 0))
+        
+        if not query:
+            return jsonify({'error': 'Search query is required'}), 400
+        if search_type not in ('conversations', 'tickets'):
+            return jsonify({'error': 'Search type must be conversations or tickets'}), 400
+        
+        bot = get_chatbot()
+        try:
+            if search_type == 'tickets':
+                page = bot.db.search_tickets(query, user_id, request.args.get('status'),
+                                             start_ms, end_ms, limit, offset)
+            else:
+                page = bot.db.search_conversations(query, user_id, start_ms, end_ms, limit, offset,
+                                                   request.args.get('before'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'type': search_type,
+            'results': page['results'],
+            'count': len(page['results']),
+            'paging': {
+                'offset': page['offset'],
+                'limit': page['limit'],
+                'has_more': page['has_more'],
+                'truncated': page['truncated'],
+                # Matches ranked per window (null when all are); next_before
+                # as ?before= ranks the next older window
+                'rank_window': page.get('rank_window'),
+                'next_before': page.get('next_before')
+            }
+        })
+        
+    except Exception as e:
+        print(f"Error searching: {e}")
+        return jsonify({'error': 'Failed to search'}), 500
+
+@app.route('/api/export', methods=['GET'])
+def export_conversations():
+    """Stream conversations as JSON Lines, CSV or Parquet with chunked transfer."""
+    try:
+        fmt = request.args.get('format', 'jsonl')
+        user_id = request.args.get('user_id')
+        start_ms = request.args.get('start_ms', type=int)
+        end_ms = request.args.get('end_ms', type=int)
+        chunk_size = min(int(request.args.get('chunk_size', 1000)), 10000)
+        
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'error': f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+        
+        bot = get_chatbot()
+        try:
+            chunks = bot.db.export_conversations(fmt, user_id, start_ms, end_ms, chunk_size)
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 501
+        
+        _, mimetype, extension = EXPORT_FORMATS[fmt]
+        return Response(chunks, mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename=conversations.{extension}'
+        })
+        
+    except Exception as e:
+        print(f"Error exporting conversations: {e}")
+        return jsonify({'error': 'Failed to export conversations'}), 500
+
 @app.route('/api/ticket', methods=['POST'])
 def create_ticket():
     """Create a support ticket."""
@@ -329,24 +445,44 @@ def human_agent_handoff():
 
 @app.route('/api/cleanup', methods=['POST'])
 def cleanup_old_data():
-    """Clean up old conversation data."""
+    """Start a background retention job, or report the one already running."""
     try:
-        data = request.get_json()
-        days = int(data.get('days', 90))
+        data = request.get_json(silent=True) or {}
+        try:
+            policies = validate_policy_overrides(data.get('policies') or {})
+            if 'days' in data:
+                policies.setdefault('conversations', {})['days'] = data['days']
+                policies = validate_policy_overrides(policies)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         bot = get_chatbot()
-        deleted_count = bot.db.cleanup_old_data(days)
+        job = bot.db.run_retention(policies, background=True)
         
         return jsonify({
             'success': True,
-            'message': f'Cleaned up {deleted_count} old records',
-            'deleted_count': deleted_count
-        })
+            'message': 'Cleanup running in the background; poll GET /api/cleanup for progress',
+            'job': job
+        }), 202
         
     except Exception as e:
         print(f"Error cleaning up data: {e}")
         return jsonify({'error': 'Failed to cleanup data'}), 500
 
+@app.route('/api/cleanup', methods=['GET'])
+def get_cleanup_status():
+    """Get progress of the current or last retention job."""
+    try:
+        bot = get_chatbot()
+        return jsonify({
+            'success': True,
+            'job': bot.db.get_retention_status()
+        })
+        
+    except Exception as e:
+        print(f"Error getting cleanup status: {e}")
+        return jsonify({'error': 'Failed to get cleanup status'}), 500
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for Customer Support Chatbot
+
+Measures throughput of the chatbot components so performance changes can be
+compared before and after.
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import threading
+
+from chatbot.codecs import decode_value
+from chatbot.database import DatabaseManager
+from chatbot.sharding import ShardedDatabaseManager
+from chatbot.nlp import NLPProcessor
+
+SAMPLE_MESSAGES = [
+    "Hello",
+    "How do I reset my password?",
+    "What are your business hours?",
+    "I need help with billing",
+    "Tell me about your products",
+    "Create a support ticket",
+    "What payment methods do you accept?",
+    "My invoice shows $49.99 but I was quoted $29.99",
+    "The app is down and I get an error at 10:30 am, call me at 555-123-4567",
+    "Please email me at jane.doe@example.com about the Pro Plan",
+    "I was charged 15% more than last month",
+    "Is there a discount for yearly subscription?",
+    "Thank you for your help",
+    "Goodbye"
+]
+
+
+def print_banner(title: str):
+    """Print a benchmark banner."""
+    print("=" * 60)
+    print(f"⏱️  {title}")
+    print("=" * 60)
+
+
+def make_corpus(size: int, seed: int = 42) -> list:
+    """Build a reproducible list of messages with realistic repetition."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        message = rng.choice(SAMPLE_MESSAGES)
+        # Make roughly half of the messages unique
+        if i % 2:
+            message = f"{message} (ref {i})"
+        corpus.append(message)
+    return corpus
+
+
+def benchmark_batch(size: int = 2000):
+    """Compare NLPProcessor.process_message in a loop with process_batch."""
+    print_banner(f"NLP batch processing ({size} messages)")
+    
+    corpus = make_corpus(size)
+    
+    # A fresh processor per side without the analysis cache, so neither side
+    # reuses the other's work and process_batch takes the vectorized path.
+    # process_message results are lazy; resolving them inside the timed
+    # region makes both sides compute every stage.
+    nlp = NLPProcessor(cache_size=0)
+    start = time.perf_counter()
+    single_results = [nlp.process_message(message).to_dict() for message in corpus]
+    single_time = time.perf_counter() - start
+    
+    nlp = NLPProcessor(cache_size=0)
+    start = time.perf_counter()
+    batch_results = [result.to_dict() for result in nlp.process_batch(corpus)]
+    batch_time = time.perf_counter() - start
+    
+    print(f"process_message loop: {single_time:.3f}s ({size / single_time:.0f} msg/s)")
+    print(f"process_batch:        {batch_time:.3f}s ({size / batch_time:.0f} msg/s)")
+    print(f"Speedup:              {single_time / batch_time:.1f}x")
+    print(f"Identical results:    {single_results == batch_results}")
+
+
+def benchmark_startup(runs: int = 5):
+    """Compare NLPProcessor cold start with and without a model snapshot."""
+    print_banner(f"NLP startup time (median of {runs} runs)")
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        snapshot_file = os.path.join(tmp_dir, 'nlp_model.pkl')
+        NLPProcessor(snapshot_file=snapshot_file)
+        
+        def construct(**kwargs) -> float:
+            start = time.perf_counter()
+            NLPProcessor(**kwargs)
+            return time.perf_counter() - start
+        
+        fit_time = statistics.median(construct() for _ in range(runs))
+        snapshot_time = statistics.median(construct(snapshot_file=snapshot_file) for _ in range(runs))
+        
+        # Full process start, including interpreter and imports
+        def cold_start(snapshot: str) -> float:
+            code = f"from chatbot.nlp import NLPProcessor; NLPProcessor(snapshot_file={snapshot!r})"
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.DEVNULL)
+            return time.perf_counter() - start
+        
+        process_fit = statistics.median(cold_start(None) for _ in range(runs))
+        process_snapshot = statistics.median(cold_start(snapshot_file) for _ in range(runs))
+    finally:
+        shutil.rmtree(tmp_dir)
+    
+    print(f"NLPProcessor() fit:        {fit_time * 1000:.1f} ms")
+    print(f"NLPProcessor() snapshot:   {snapshot_time * 1000:.1f} ms")
+    print(f"Process start fit:         {process_fit * 1000:.1f} ms")
+    print(f"Process start snapshot:    {process_snapshot * 1000:.1f} ms")
+
+
+class PerCallConnectionStore:
+    """Stores messages the way DatabaseManager did before persistent connections."""
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+    
+    def store_message(self, user_id: str, session_id: str, message: str, sender: str):
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO conversations (user_id, session_id, message, sender)
+                VALUES (?, ?, ?, ?)
+            ''', (user_id, session_id, message, sender))
+            cursor.execute('SELECT total_messages FROM users WHERE user_id = ?', (user_id,))
+            if cursor.fetchone():
+                cursor.execute(
+                    'UPDATE users SET total_messages = total_messages + 1, last_seen = CURRENT_TIMESTAMP WHERE user_id = ?',
+                    (user_id,)
+                )
+            else:
+                cursor.execute('INSERT INTO users (user_id, total_messages) VALUES (?, 1)', (user_id,))
+            conn.commit()
+            conn.close()
+    
+    def get_conversation_history(self, user_id: str, session_id: str, limit: int):
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            rows = conn.execute('''
+                SELECT message, sender, timestamp FROM conversations
+                WHERE user_id = ? AND session_id = ?
+                ORDER BY timestamp DESC LIMIT ?
+            ''', (user_id, session_id, limit)).fetchall()
+            conn.close()
+            return rows
+
+
+def run_chat_turns(store, threads: int, turns: int) -> float:
+    """Run chat turns from several threads and return the elapsed seconds.
+    
+    Like Chatbot.process_message, each turn stores the message and the reply;
+    every 25th turn also reads the history, as /api/history clients do.
+    """
+    def worker(index: int):
+        user_id = f"user{index}"
+        for turn in range(turns):
+            store.store_message(user_id, "session", f"message {turn}", "user")
+            store.store_message(user_id, "session", f"reply {turn}", "bot")
+            if turn % 25 == 0:
+                store.get_conversation_history(user_id, "session", 10)
+    
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def benchmark_database(threads: int = 4, turns: int = 250):
+    """Compare per-call connections with persistent per-thread WAL connections."""
+    print_banner(f"Database chat turns ({threads} threads x {turns} turns)")
+    
+    messages = threads * turns * 2
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        legacy_path = os.path.join(tmp_dir, 'legacy.db')
+        DatabaseManager(legacy_path, pragmas={'journal_mode': 'DELETE', 'synchronous': 'FULL'}).initialize_database()
+        legacy_time = run_chat_turns(PerCallConnectionStore(legacy_path), threads, turns)
+        
+        db = DatabaseManager(os.path.join(tmp_dir, 'persistent.db'))
+        db.initialize_database()
+        persistent_time = run_chat_turns(db, threads, turns)
+        db.close()
+        
+        db = DatabaseManager(os.path.join(tmp_dir, 'write_behind.db'))
+        db.initialize_database()
+        db.enable_write_behind()
+        write_behind_time = run_chat_turns(db, threads, turns)
+        db.close()
+        
+        db = DatabaseManager(os.path.join(tmp_dir, 'counters.db'))
+        db.initialize_database()
+        db.enable_counter_buffer()
+        counters_time = run_chat_turns(db, threads, turns)
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+    
+    print(f"Per-call connections:   {legacy_time:.3f}s ({messages / legacy_time:.0f} msg/s)")
+    print(f"Persistent connections: {persistent_time:.3f}s ({messages / persistent_time:.0f} msg/s)")
+    print(f"Write-behind queue:     {write_behind_time:.3f}s ({messages / write_behind_time:.0f} msg/s)")
+    print(f"Counter buffer:         {counters_time:.3f}s ({messages / counters_time:.0f} msg/s)")
+    print(f"Speedup:                {legacy_time / persistent_time:.1f}x persistent, "
+          f"{legacy_time / write_behind_time:.1f}x write-behind, "
+          f"{legacy_time / counters_time:.1f}x counter buffer")
+
+
+def benchmark_shards(threads: int = 8, turns: int = 100, shard_counts=(1, 2, 4, 8)):
+    """Measure write throughput as users are spread over more shards.
+    
+    Commits use synchronous=FULL so each one waits for the disk, as a
+    durable deployment would; SQLite releases the GIL while it waits, so
+    writers on different shards overlap.
+    """
+    print_banner(f"Sharded writes ({threads} threads x {turns} turns, {os.cpu_count()} CPUs)")
+    
+    messages = threads * turns * 2
+    results = []
+    for shard_count in shard_counts:
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            db = ShardedDatabaseManager(shard_count, tmp_dir, pragmas={'synchronous': 'FULL'})
+            db.initialize_database()
+            elapsed = run_chat_turns(db, threads, turns)
+            db.close()
+        finally:
+            shutil.rmtree(tmp_dir)
+        results.append((shard_count, elapsed))
+    
+    baseline = results[0][1]
+    for shard_count, elapsed in results:
+        print(f"{shard_count} shard(s): {elapsed:.3f}s ({messages / elapsed:.0f} msg/s, "
+              f"{baseline / elapsed:.1f}x)")
+
+
+def benchmark_search(rows: int = 1000000, queries: int = 50):
+    """Compare FTS5 search with a LIKE scan over a large conversations table."""
+    print_banner(f"Full-text search ({rows} messages, {queries} queries)")
+    
+    rng = random.Random(42)
+    corpus = make_corpus(1000)
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'search.db'))
+        db.initialize_database()
+        now_ms = db._now_ms()
+        
+        start = time.perf_counter()
+        with db.lock, db.connections.transaction() as conn:
+            conn.executemany(
+                'INSERT INTO conversations (user_id, session_id, message, sender, timestamp_ms) VALUES (?, ?, ?, ?, ?)',
+                ((f"user{i % 5000}", f"session{i % 20000}", f"{corpus[i % len(corpus)]} #{i}", 'user',
+                  now_ms - (rows - i) * 1000) for i in range(rows))
+            )
+        print(f"Insert with index triggers: {time.perf_counter() - start:.1f}s")
+        
+        terms = ['password', 'billing', 'invoice', 'discount', 'hours']
+        week_ms = now_ms - 7 * 86400000
+        
+        start = time.perf_counter()
+        for i in range(queries):
+            db.search_conversations(terms[i % len(terms)], user_id=f"user{rng.randrange(5000)}", start_ms=week_ms)
+        fts_user = (time.perf_counter() - start) / queries
+        
+        start = time.perf_counter()
+        for i in range(queries):
+            db.search_conversations(terms[i % len(terms)], start_ms=week_ms)
+        fts_all = (time.perf_counter() - start) / queries
+        
+        # A rare term: the reference number of a single message
+        refs = [str(rng.randrange(rows)) for _ in range(5)]
+        start = time.perf_counter()
+        for ref in refs:
+            db.search_conversations(ref)
+        fts_rare = (time.perf_counter() - start) / len(refs)
+        
+        conn = db.connections.connection()
+        start = time.perf_counter()
+        for ref in refs:
+            conn.execute('SELECT id FROM conversations WHERE message LIKE ? LIMIT 20', (f"%#{ref}",)).fetchall()
+        like = (time.perf_counter() - start) / len(refs)
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+    
+    print(f"FTS5, one user:     {fts_user * 1000:.2f}ms per query")
+    print(f"FTS5, all users:    {fts_all * 1000:.2f}ms per query")
+    print(f"FTS5, rare term:    {fts_rare * 1000:.2f}ms per query")
+    print(f"LIKE, rare term:    {like * 1000:.2f}ms per query")
+
+
+def benchmark_codecs(rows: int = 50000):
+    """Compare JSON text with the binary entities and sentiment codecs."""
+    print_banner(f"Column codecs ({rows} analyzed messages)")
+    
+    corpus = make_corpus(1000)
+    analyses = NLPProcessor().process_batch(corpus)
+    values = [(dict(analysis['entities']), dict(analysis['sentiment'])) for analysis in analyses]
+    
+    results = {}
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        for name, codecs in (('JSON text', {'entities': 'json', 'sentiment': 'json'}),
+                             ('Binary', {'entities': 'compact', 'sentiment': 'struct'})):
+            path = os.path.join(tmp_dir, f"{codecs['entities']}.db")
+            db = DatabaseManager(path)
+            db.configure_column_codecs(**codecs)
+            db.initialize_database()
+            
+            start = time.perf_counter()
+            encoded = [(db.codecs.encode('entities', entities), db.codecs.encode('sentiment', sentiment))
+                       for entities, sentiment in (values[i % len(values)] for i in range(rows))]
+            encode_time = time.perf_counter() - start
+            
+            now_ms = db._now_ms()
+            db._write_message_batch([
+                (f"user{i % 500}", f"session{i % 2000}", corpus[i % len(corpus)], 'user', now_ms - rows + i,
+                 None, None, *encoded[i])
+                for i in range(rows)
+            ])
+            conn = db.connections.connection()
+            column_bytes = conn.execute(
+                'SELECT SUM(IFNULL(LENGTH(entities), 0) + IFNULL(LENGTH(sentiment), 0)) FROM conversations'
+            ).fetchone()[0]
+            
+            stored = conn.execute('SELECT entities, sentiment FROM conversations').fetchall()
+            start = time.perf_counter()
+            for entities, sentiment in stored:
+                decode_value(entities)
+                decode_value(sentiment)
+            decode_time = time.perf_counter() - start
+            db.close()
+            
+            conn = sqlite3.connect(path)
+            conn.execute('VACUUM')
+            conn.close()
+            results[name] = (encode_time, decode_time, column_bytes, os.path.getsize(path))
+    finally:
+        shutil.rmtree(tmp_dir)
+    
+    for name, (encode_time, decode_time, column_bytes, file_size) in results.items():
+        print(f"{name + ':':<11} encode {encode_time / rows * 1e6:.2f}us, decode {decode_time / rows * 1e6:.2f}us "
+              f"per row, {column_bytes / rows:.0f} column bytes per row, {file_size / 1048576:.1f} MiB file")
+
+
+BENCHMARKS = {
+    'batch': benchmark_batch,
+    'startup': benchmark_startup,
+    'database': benchmark_database,
+    'shards': benchmark_shards,
+    'search': benchmark_search,
+    'codecs': benchmark_codecs
+}
+
+
+def main():
+    """Main function."""
+    names = sys.argv[1:] or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print("Usage: python benchmark.py [" + "|".join(BENCHMARKS) + "] ...")
+        sys.exit(1)
+    
+    for name in names:
+        BENCHMARKS[name]()
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Model Snapshot Build Script
+
+Fits the NLP model and writes the snapshot configured in data/config.json
+so workers can load it at startup instead of refitting.
+This script should be run during the build process.
+"""
+
+import json
+import sys
+
+from chatbot.nlp import NLPProcessor
+
+
+def build_snapshot(config_path: str = "data/config.json") -> bool:
+    """Fit the NLP model from scratch and write its snapshot."""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        config = {}
+    
+    snapshot_file = config.get('nlp', {}).get('snapshot_file', 'data/nlp_model.pkl')
+    
+    print(f"Building model snapshot {snapshot_file}...")
+    nlp = NLPProcessor(cache_size=0)
+    if not nlp.save_snapshot(snapshot_file):
+        print("✗ Failed to build model snapshot")
+        return False
+    
+    print("✓ Model snapshot written")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if build_snapshot(*sys.argv[1:2]) else 1)
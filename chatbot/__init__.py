@@ -4,12 +4,33 @@ Python Customer Support Chatbot Package
 A comprehensive chatbot solution for customer support and interactive communication.
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "Chatbot Developer"
 
-from .core import Chatbot
-from .nlp import NLPProcessor
-from .database import DatabaseManager
-from .responses import ResponseManager
+# Components are imported on first access so that, for example, using
+# DatabaseManager does not pay for importing the NLP stack.
+_LAZY_IMPORTS = {
+    'Chatbot': '.core',
+    'NLPProcessor': '.nlp',
+    'DatabaseManager': '.database',
+    'ShardedDatabaseManager': '.sharding',
+    'ResponseManager': '.responses'
+}
+
+__all__ = ['Chatbot', 'NLPProcessor', 'DatabaseManager', 'ShardedDatabaseManager', 'ResponseManager']
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ['Chatbot', 'NLPProcessor', 'DatabaseManager', 'ResponseManager'] 
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -0,0 +1,217 @@
+"""
+Conversation Archive Module
+
+Moves aged conversation rows out of the hot ``conversations`` table into
+gzip-compressed JSON Lines segments, one per UTC day, and keeps a small
+index of which users appear in each segment so archived history can be
+streamed back without opening unrelated segments.
+"""
+
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from .codecs import decode_value
+
+# Conversation columns stored in each archived record, in SELECT order
+ARCHIVE_COLUMNS = [
+    'id', 'user_id', 'session_id', 'message', 'sender', 'timestamp', 'timestamp_ms',
+    'intent', 'confidence', 'entities', 'sentiment'
+]
+
+
+class ConversationArchive:
+    """
+    Daily gzip JSONL segments plus a per-user segment index.
+    
+    Segments are only appended to: every archived batch adds a new gzip
+    member, so a segment is written without rewriting earlier data. Rows
+    are written and synced before they are deleted from the database; if
+    the delete is rolled back or the process stops in between, the retry
+    finds those ids already in the segment and does not append them again.
+    Index entries are set from the segment's contents rather than added
+    to, so a retry leaves them unchanged.
+    """
+    
+    def __init__(self, directory: str, cached_segments: int = 8):
+        """
+        Initialize the archive.
+        
+        Args:
+            directory: Directory holding the segment files
+            cached_segments: Segments whose ids and index entries are kept
+                in memory between batches
+        """
+        self.directory = directory
+        self.cached_segments = max(int(cached_segments), 1)
+        self._segments = {}
+        os.makedirs(directory, exist_ok=True)
+    
+    def create_tables(self, cursor):
+        """Create the segment index table if it doesn't exist."""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS archive_index (
+                user_id TEXT NOT NULL,
+                segment TEXT NOT NULL,
+                messages INTEGER NOT NULL DEFAULT 0,
+                first_ms INTEGER,
+                last_ms INTEGER,
+                PRIMARY KEY (user_id, segment)
+            ) WITHOUT ROWID
+        ''')
+    
+    @staticmethod
+    def segment_name(timestamp_ms: int) -> str:
+        """Get the segment a timestamp belongs to."""
+        day = datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc)
+        return f"conversations-{day.strftime('%Y-%m-%d')}.jsonl.gz"
+    
+    def segment_path(self, segment: str) -> str:
+        return os.path.join(self.directory, segment)
+    
+    def archive_rows(self, cursor, rows: List[tuple]) -> List[str]:
+        """
+        Append conversation rows to their daily segments and index them.
+        
+        Args:
+            cursor: Cursor inside the transaction that deletes the rows
+            rows: Conversation rows in ARCHIVE_COLUMNS order
+            
+        Returns:
+            Names of the segments written
+        """
+        by_segment = defaultdict(list)
+        for row in rows:
+            record = dict(zip(ARCHIVE_COLUMNS, row))
+            for field in ('entities', 'sentiment'):
+                record[field] = decode_value(record[field])
+            by_segment[self.segment_name(record['timestamp_ms'])].append(record)
+        
+        index = []
+        for segment, records in by_segment.items():
+            contents = self._segment_contents(segment)
+            # Rows of an earlier attempt whose delete was rolled back are already there
+            new_records = [record for record in records if record['id'] not in contents['ids']]
+            if new_records:
+                with open(self.segment_path(segment), 'ab') as f:
+                    with gzip.GzipFile(fileobj=f, mode='wb') as gz:
+                        for record in new_records:
+                            gz.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                for record in new_records:
+                    self._add_record(contents, record)
+            
+            users = {record['user_id'] for record in records}
+            index.extend((user_id, segment, *contents['users'][user_id]) for user_id in users)
+        
+        cursor.executemany('''
+            INSERT INTO archive_index (user_id, segment, messages, first_ms, last_ms)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, segment) DO UPDATE SET
+                messages = excluded.messages,
+                first_ms = excluded.first_ms,
+                last_ms = excluded.last_ms
+        ''', index)
+        return list(by_segment)
+    
+    def _segment_contents(self, segment: str) -> Dict:
+        """Get the ids and per-user index entries of the records in a segment."""
+        contents = self._segments.pop(segment, None)
+        if contents is None:
+            contents = {'ids': set(), 'users': defaultdict(lambda: [0, None, None])}
+            path = self.segment_path(segment)
+            if os.path.exists(path):
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    for line in f:
+                        self._add_record(contents, json.loads(line))
+        
+        # Most recently used last; the oldest segment is dropped when full
+        self._segments[segment] = contents
+        while len(self._segments) > self.cached_segments:
+            del self._segments[next(iter(self._segments))]
+        return contents
+    
+    @staticmethod
+    def _add_record(contents: Dict, record: Dict):
+        """Count a segment record in its user's index entry, once per id."""
+        if record['id'] in contents['ids']:
+            return
+        contents['ids'].add(record['id'])
+        entry = contents['users'][record['user_id']]
+        entry[0] += 1
+        entry[1] = record['timestamp_ms'] if entry[1] is None else min(entry[1], record['timestamp_ms'])
+        entry[2] = record['timestamp_ms'] if entry[2] is None else max(entry[2], record['timestamp_ms'])
+    
+    def iter_history(self, cursor, user_id: str, session_id: Optional[str] = None,
+                     start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Stream a user's archived messages in chronological order.
+        
+        Only the segments the index lists for the user are opened, and each
+        segment is decompressed line by line.
+        
+        Args:
+            cursor: Database cursor for the segment index
+            user_id: User identifier
+            session_id: Optional session filter
+            start_ms: Optional inclusive lower time bound
+            end_ms: Optional exclusive upper time bound
+            
+        Yields:
+            Archived message records
+        """
+        query = 'SELECT segment FROM archive_index WHERE user_id = ?'
+        params = [user_id]
+        if start_ms is not None:
+            query += ' AND last_ms >= ?'
+            params.append(start_ms)
+        if end_ms is not None:
+            query += ' AND first_ms < ?'
+            params.append(end_ms)
+        cursor.execute(query + ' ORDER BY segment', params)
+        segments = [row[0] for row in cursor.fetchall()]
+        
+        for segment in segments:
+            path = self.segment_path(segment)
+            if not os.path.exists(path):
+                print(f"Error reading archive segment {segment}: file is missing")
+                continue
+            
+            records = []
+            seen = set()
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record['user_id'] != user_id or record['id'] in seen:
+                        continue
+                    if session_id and record['session_id'] != session_id:
+                        continue
+                    if start_ms is not None and record['timestamp_ms'] < start_ms:
+                        continue
+                    if end_ms is not None and record['timestamp_ms'] >= end_ms:
+                        continue
+                    seen.add(record['id'])
+                    records.append(record)
+            
+            # Batches of one day are appended oldest first, but may interleave
+            records.sort(key=lambda record: (record['timestamp_ms'], record['id']))
+            yield from records
+    
+    def get_stats(self, cursor) -> Dict:
+        """Get archive size statistics."""
+        cursor.execute('SELECT COUNT(DISTINCT segment), COALESCE(SUM(messages), 0) FROM archive_index')
+        segments, messages = cursor.fetchone()
+        size = sum(
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory) if name.endswith('.jsonl.gz')
+        )
+        return {
+            'directory': self.directory,
+            'segments': segments,
+            'archived_messages': messages,
+            'size_bytes': size
+        }
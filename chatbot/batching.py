@@ -0,0 +1,192 @@
+"""
+Micro-batching Module
+
+Coalesces work items that arrive concurrently into small batches so that
+vectorized NLP passes can be shared across simultaneous chat requests.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads and hands them to a batch
+    handler in groups. Each caller receives its own result through a future.
+    """
+    
+    def __init__(self, batch_handler: Callable[[List[Any]], List[Any]],
+                 max_wait_ms: float = 2.0, max_batch_size: int = 32,
+                 name: str = "micro-batcher"):
+        """
+        Initialize the micro-batcher and start its worker thread.
+        
+        Args:
+            batch_handler: Callable that maps a list of items to a list of
+                results of the same length and order
+            max_wait_ms: How long to wait for more items after the first one
+            max_batch_size: Maximum number of items per batch
+            name: Worker thread name
+        """
+        self.batch_handler = batch_handler
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.max_batch_size = max(int(max_batch_size), 1)
+        
+        self._queue = queue.Queue()
+        self._closed = False
+        # Orders submits against close() so nothing is queued behind the stop sentinel
+        self._submit_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'batches': 0,
+            'items': 0,
+            'max_batch_seen': 0,
+            'errors': 0
+        }
+        
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+    
+    def submit(self, item: Any) -> Future:
+        """
+        Queue an item for the next batch.
+        
+        Args:
+            item: Item to pass to the batch handler
+            
+        Returns:
+            Future resolved with the handler's result for this item
+        """
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((item, future))
+        return future
+    
+    def process(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Submit an item and block until its result is available.
+        
+        Args:
+            item: Item to pass to the batch handler
+            timeout: Seconds to wait for the result, or None to wait forever
+            
+        Returns:
+            The handler's result for this item
+            
+        Raises:
+            concurrent.futures.TimeoutError: If no result arrived in time. The
+                item is dropped if its batch has not started yet.
+        """
+        future = self.submit(item)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+    
+    def close(self, timeout: Optional[float] = None):
+        """Stop accepting items, finish queued work and stop the worker."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join(timeout)
+    
+    def _run(self):
+        """Worker loop: gather a batch, run the handler, resolve futures."""
+        try:
+            self._gather_batches()
+        finally:
+            self._fail_pending()
+    
+    def _claim(self, batch: List) -> List:
+        """Mark futures as running, dropping items whose callers cancelled them."""
+        return [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+    
+    def _gather_batches(self):
+        """Run batches until the stop sentinel, which close() queues last."""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            
+            batch = self._claim(batch)
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                # Keep the worker alive; only this batch's callers see the error
+                print(f"Error in micro-batch worker: {e}")
+                with self._stats_lock:
+                    self._stats['errors'] += 1
+                self._fail_batch(batch, e)
+            if stop:
+                return
+    
+    def _fail_pending(self):
+        """Fail the futures of items still queued when the worker exits."""
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not None:
+                self._fail_batch(self._claim([entry]), RuntimeError("MicroBatcher is closed"))
+    
+    def _fail_batch(self, batch: List, error: Exception):
+        """Fail the claimed futures of a batch that have no result yet."""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+    
+    def _run_batch(self, batch: List):
+        """Run the handler for one claimed batch and deliver results to callers."""
+        if not batch:
+            return
+        items = [item for item, _ in batch]
+        
+        results = self.batch_handler(items)
+        if len(results) != len(items):
+            raise ValueError(
+                f"Batch handler returned {len(results)} results for {len(items)} items"
+            )
+        
+        with self._stats_lock:
+            self._stats['batches'] += 1
+            self._stats['items'] += len(items)
+            self._stats['max_batch_seen'] = max(self._stats['max_batch_seen'], len(items))
+        
+        # Claimed futures can no longer be cancelled, so setting them cannot race
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+    
+    def get_stats(self) -> Dict:
+        """Get batching statistics."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        
+        stats['avg_batch_size'] = round(stats['items'] / max(stats['batches'], 1), 2)
+        stats['queued'] = self._queue.qsize()
+        stats['max_wait_ms'] = self.max_wait * 1000.0
+        stats['max_batch_size'] = self.max_batch_size
+        return stats
@@ -0,0 +1,228 @@
+"""
+Cache Module
+
+Small thread-safe in-process caches used to avoid repeating expensive work
+for frequently requested data.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded least-recently-used cache whose entries also expire after a
+    fixed time to live.
+    """
+    
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 300.0):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of entries kept
+            ttl: Seconds an entry stays valid, or None for no expiry
+        """
+        self.max_size = max(int(max_size), 1)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value and mark it as recently used.
+        
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+            
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+    
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value without counting a lookup or changing its LRU position."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[0] is not None and entry[0] <= time.monotonic()):
+                return default
+            return entry[1]
+    
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries if full."""
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry is not None else default
+    
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+    
+    def get_stats(self) -> Dict:
+        """Get cache counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'hit_ratio': round(self._hits / lookups, 3) if lookups else 0.0
+            }
+
+
+class ProfileCache:
+    """
+    Read-through cache of user profiles.
+    
+    Writes that change a profile update the cached copy in place instead
+    of dropping it, so the next read is still a hit. A profile loaded from
+    the database is only cached if no write to that user was in progress
+    while it was read, so a load can neither miss a write nor count it twice.
+    """
+    
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 60.0):
+        """
+        Initialize the profile cache.
+        
+        Args:
+            max_size: Maximum number of profiles cached
+            ttl: Seconds a profile stays valid, or None for no expiry
+        """
+        self._entries = TTLCache(max_size, ttl)
+        self._lock = threading.Lock()
+        self._loading: Dict[str, bool] = {}
+        self._writing: Dict[str, int] = {}
+        self._updates = 0
+        self._invalidations = 0
+    
+    def get(self, user_id: str, load: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        """
+        Get a user's profile, loading and caching it on a miss.
+        
+        Args:
+            user_id: User identifier
+            load: Callable that reads the profile from the database
+            
+        Returns:
+            Copy of the profile, or None if the user doesn't exist
+        """
+        profile = self._entries.get(user_id)
+        if profile is not None:
+            with self._lock:
+                return copy.deepcopy(profile)
+        
+        with self._lock:
+            self._loading[user_id] = self._loading.get(user_id, False) or user_id in self._writing
+        try:
+            profile = load(user_id)
+        finally:
+            with self._lock:
+                stale = self._loading.pop(user_id, True) or user_id in self._writing
+                if profile is not None and not stale:
+                    self._entries.set(user_id, copy.deepcopy(profile))
+        return profile
+    
+    @contextmanager
+    def writing(self, user_id: str, change: Callable[[Dict], None]):
+        """
+        Wrap a database write that changes a user's profile.
+        
+        Loads running during the write are not cached. If the write
+        succeeds, ``change`` is applied to the cached profile in place.
+        
+        Args:
+            user_id: User identifier
+            change: Callable that modifies the cached profile dictionary
+        """
+        with self._lock:
+            self._writing[user_id] = self._writing.get(user_id, 0) + 1
+            if user_id in self._loading:
+                self._loading[user_id] = True
+        
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        finally:
+            with self._lock:
+                if self._writing[user_id] == 1:
+                    del self._writing[user_id]
+                else:
+                    self._writing[user_id] -= 1
+                
+                profile = self._entries.peek(user_id)
+                if profile is not None:
+                    if succeeded:
+                        change(profile)
+                        self._updates += 1
+                    else:
+                        self._entries.pop(user_id)
+                        self._invalidations += 1
+    
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop one user's profile, or every profile when no user is given."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+                for loading in self._loading:
+                    self._loading[loading] = True
+            else:
+                self._entries.pop(user_id)
+                if user_id in self._loading:
+                    self._loading[user_id] = True
+            self._invalidations += 1
+    
+    def get_stats(self) -> Dict:
+        """Get profile cache statistics."""
+        stats = self._entries.get_stats()
+        with self._lock:
+            stats['updates'] = self._updates
+            stats['invalidations'] = self._invalidations
+        return stats
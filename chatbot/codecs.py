@@ -0,0 +1,215 @@
+"""
+Column Codecs Module
+
+Encodes the structured ``entities`` and ``sentiment`` conversation
+columns. Binary encodings start with a one-byte tag naming the codec that
+wrote them, and JSON text is read as before, so every row decodes the
+same way whichever codec is configured or was configured when the row
+was written.
+"""
+
+import json
+import struct
+from typing import Callable, Dict, Optional, Union
+
+# Leading byte of each binary encoding
+TAG_ENTITIES_COMPACT = 0x01
+TAG_ENTITIES_MSGPACK = 0x02
+TAG_SENTIMENT_STRUCT = 0x03
+
+# Score order of packed sentiment
+SENTIMENT_KEYS = ('neg', 'neu', 'pos', 'compound')
+
+# Separators of the compact entity encoding (ASCII group and record separators)
+GROUP_SEPARATOR = '\x1d'
+VALUE_SEPARATOR = '\x1e'
+
+_SENTIMENT_STRUCT = struct.Struct('<B4d')
+
+StoredValue = Union[str, bytes, None]
+
+
+class JSONCodec:
+    """JSON text, the original encoding and the fallback of the binary codecs."""
+    
+    name = 'json'
+    
+    def encode(self, value) -> Optional[str]:
+        return json.dumps(value) if value else None
+
+
+class CompactEntitiesCodec(JSONCodec):
+    """
+    Entities as UTF-8 text with control-character separators.
+    
+    ``{'email': ['a@b.c'], 'phone': []}`` is stored as
+    ``\\x01email\\x1ea@b.c\\x1dphone``. Decoding is two ``str.split`` calls,
+    and values that are not lists of strings, or contain a separator,
+    fall back to JSON.
+    """
+    
+    name = 'compact'
+    
+    def encode(self, value) -> StoredValue:
+        if not value:
+            return None
+        try:
+            groups = [VALUE_SEPARATOR.join([kind, *values]) for kind, values in value.items()]
+        except (AttributeError, TypeError):
+            return super().encode(value)
+        text = GROUP_SEPARATOR.join(groups)
+        # Only lists of strings without separators in them round-trip
+        if (text.count(VALUE_SEPARATOR) != sum(map(len, value.values()))
+                or text.count(GROUP_SEPARATOR) != len(groups) - 1
+                or not all(isinstance(values, (list, tuple)) for values in value.values())):
+            return super().encode(value)
+        return bytes((TAG_ENTITIES_COMPACT,)) + text.encode('utf-8')
+    
+    @staticmethod
+    def decode(data: bytes) -> Dict:
+        text = data.decode('utf-8')
+        if GROUP_SEPARATOR not in text:
+            # One entity type, the common case
+            values = text.split(VALUE_SEPARATOR)
+            return {values[0][1:]: values[1:]}
+        entities = {}
+        for group in text[1:].split(GROUP_SEPARATOR):
+            kind, *values = group.split(VALUE_SEPARATOR)
+            entities[kind] = values
+        return entities
+
+
+class MsgpackCodec(JSONCodec):
+    """Any JSON-compatible value as MessagePack; needs ``pip install msgpack``."""
+    
+    name = 'msgpack'
+    
+    def __init__(self):
+        self._msgpack = _import_msgpack()
+    
+    def encode(self, value) -> StoredValue:
+        if not value:
+            return None
+        return bytes((TAG_ENTITIES_MSGPACK,)) + self._msgpack.packb(value, use_bin_type=True)
+    
+    @staticmethod
+    def decode(data: bytes):
+        return _import_msgpack().unpackb(data[1:], raw=False)
+
+
+class SentimentStructCodec(JSONCodec):
+    """
+    VADER scores packed as four little-endian doubles (33 bytes).
+    
+    Values with other keys or non-numeric scores fall back to JSON.
+    """
+    
+    name = 'struct'
+    
+    def encode(self, value) -> StoredValue:
+        if not value:
+            return None
+        try:
+            if len(value) == len(SENTIMENT_KEYS):
+                return _SENTIMENT_STRUCT.pack(
+                    TAG_SENTIMENT_STRUCT, value['neg'], value['neu'], value['pos'], value['compound']
+                )
+        except (KeyError, TypeError, struct.error):
+            pass
+        return super().encode(value)
+    
+    @staticmethod
+    def decode(data: bytes) -> Dict:
+        try:
+            return dict(zip(SENTIMENT_KEYS, _SENTIMENT_STRUCT.unpack(data)[1:]))
+        except struct.error as e:
+            raise ValueError(f"Truncated sentiment value: {e}") from None
+
+
+def _import_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise RuntimeError("The msgpack column codec requires msgpack (pip install msgpack)")
+    return msgpack
+
+
+# Column: {codec name: codec class}
+COLUMN_CODECS = {
+    'entities': {codec.name: codec for codec in (JSONCodec, CompactEntitiesCodec, MsgpackCodec)},
+    'sentiment': {codec.name: codec for codec in (JSONCodec, SentimentStructCodec)}
+}
+
+DEFAULT_CODECS = {'entities': 'compact', 'sentiment': 'struct'}
+
+_DECODERS: Dict[int, Callable[[bytes], object]] = {
+    TAG_ENTITIES_COMPACT: CompactEntitiesCodec.decode,
+    TAG_ENTITIES_MSGPACK: MsgpackCodec.decode,
+    TAG_SENTIMENT_STRUCT: SentimentStructCodec.decode
+}
+
+
+def decode_value(value: StoredValue):
+    """
+    Decode a stored entities or sentiment value.
+    
+    Args:
+        value: JSON text, a tagged binary encoding or None
+        
+    Returns:
+        Decoded value, or None
+        
+    Raises:
+        ValueError: If the value is malformed or has an unknown codec tag
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        return json.loads(value)
+    decoder = _DECODERS.get(value[0])
+    if decoder is None:
+        raise ValueError(f"Unknown column codec tag {value[0]:#04x}")
+    return decoder(value)
+
+
+class ColumnCodecs:
+    """The codecs used to write each structured conversation column."""
+    
+    def __init__(self, entities: str = DEFAULT_CODECS['entities'],
+                 sentiment: str = DEFAULT_CODECS['sentiment']):
+        """
+        Initialize the column codecs.
+        
+        Args:
+            entities: 'compact', 'msgpack' (needs msgpack) or 'json'
+            sentiment: 'struct' or 'json'
+        """
+        self.configure(entities, sentiment)
+    
+    def configure(self, entities: Optional[str] = None, sentiment: Optional[str] = None):
+        """Switch codecs; rows already written keep decoding as before."""
+        if entities is not None:
+            self.entities = self._create('entities', entities)
+        if sentiment is not None:
+            self.sentiment = self._create('sentiment', sentiment)
+    
+    @staticmethod
+    def _create(column: str, name: str):
+        codecs = COLUMN_CODECS[column]
+        if name not in codecs:
+            raise ValueError(f"Unknown {column} codec '{name}', use one of: {', '.join(codecs)}")
+        return codecs[name]()
+    
+    def encode(self, column: str, value) -> StoredValue:
+        """Encode a value of the 'entities' or 'sentiment' column."""
+        return getattr(self, column).encode(value)
+    
+    def recode(self, column: str, stored: StoredValue) -> StoredValue:
+        """Rewrite a stored value with the current codec of its column; unreadable values are kept."""
+        try:
+            return self.encode(column, decode_value(stored))
+        except ValueError:
+            return stored
+    
+    def get_names(self) -> Dict[str, str]:
+        return {'entities': self.entities.name, 'sentiment': self.sentiment.name}
@@ -0,0 +1,184 @@
+"""
+SQLite Connection Management Module
+
+Keeps one long-lived SQLite connection per thread, configured with WAL
+journaling and tuned pragmas, so database calls do not pay for opening a
+connection and readers do not block behind writers.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from .query_log import SlowQueryLog, TimedConnection
+
+# Pragmas applied to every new connection, in order. auto_vacuum only takes
+# effect on new databases or after a VACUUM.
+DEFAULT_PRAGMAS = {
+    'auto_vacuum': 'INCREMENTAL',
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -16000,
+    'mmap_size': 134217728,
+    'temp_store': 'MEMORY'
+}
+
+
+class ConnectionManager:
+    """
+    Per-thread pool of persistent SQLite connections.
+    
+    Connections run in autocommit mode; writes are grouped with
+    ``transaction()``, which starts an IMMEDIATE transaction so that
+    concurrent writers wait on the busy timeout instead of failing.
+    Connections of threads that have exited are closed when new
+    connections are opened.
+    """
+    
+    def __init__(self, db_path: str, pragmas: Optional[Dict] = None,
+                 statement_cache_size: int = 256):
+        """
+        Initialize the connection manager.
+        
+        Args:
+            db_path: Path to SQLite database file
+            pragmas: Pragma overrides merged over DEFAULT_PRAGMAS
+            statement_cache_size: Prepared statements cached per connection
+        """
+        self.db_path = db_path
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        self.pragmas.update(pragmas or {})
+        self.statement_cache_size = statement_cache_size
+        self.query_log: Optional[SlowQueryLog] = None
+        
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._opened = 0
+        self._closed = 0
+    
+    def connection(self) -> sqlite3.Connection:
+        """
+        Get the calling thread's connection, opening it on first use.
+        
+        Returns:
+            SQLite connection owned by the current thread
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+    
+    def _open(self) -> sqlite3.Connection:
+        """Open and configure a new connection for the current thread."""
+        busy_timeout = self.pragmas.get('busy_timeout', 5000)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=busy_timeout / 1000.0,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+            factory=TimedConnection if self.query_log is not None else sqlite3.Connection
+        )
+        if self.query_log is not None:
+            conn.query_log = self.query_log
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections[threading.current_thread()] = conn
+            self._opened += 1
+        return conn
+    
+    def _prune_dead_threads(self):
+        """Close connections left behind by finished threads."""
+        for thread in [thread for thread in self._connections if not thread.is_alive()]:
+            self._close_quietly(self._connections.pop(thread))
+    
+    def _close_quietly(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._closed += 1
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block of statements in one write transaction.
+        
+        Nested calls join the enclosing transaction.
+        
+        Yields:
+            The current thread's connection
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        if self.query_log is None:
+            conn.commit()
+            return
+        started = time.perf_counter()
+        conn.commit()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= self.query_log.threshold_ms:
+            self.query_log.observe(conn, 'COMMIT', (), elapsed_ms)
+    
+    def set_query_log(self, query_log: Optional[SlowQueryLog]):
+        """
+        Time statements on connections opened from now on.
+        
+        Open connections are closed so every thread reopens with the new
+        setting; call this before the database is shared between threads.
+        
+        Args:
+            query_log: Log receiving slow statements, or None to stop timing
+        """
+        self.query_log = query_log
+        self.close_all()
+    
+    def close(self):
+        """Close the calling thread's connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.current_thread(), None)
+            self._close_quietly(conn)
+    
+    def close_all(self):
+        """Close every connection. Threads reopen connections on next use."""
+        with self._lock:
+            for conn in self._connections.values():
+                self._close_quietly(conn)
+            self._connections.clear()
+        self._local = threading.local()
+    
+    def get_stats(self) -> Dict:
+        """Get connection statistics."""
+        with self._lock:
+            open_connections = len(self._connections)
+            opened = self._opened
+            closed = self._closed
+        
+        return {
+            'open_connections': open_connections,
+            'opened': opened,
+            'closed': closed,
+            'statement_cache_size': self.statement_cache_size,
+            'pragmas': dict(self.pragmas)
+        }
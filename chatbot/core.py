@@ -8,12 +8,15 @@ and database operations.
 import json
 import time
 import threading
+from functools import partial
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
 from .nlp import NLPProcessor
 from .database import DatabaseManager
+from .sharding import ShardedDatabaseManager
 from .responses import ResponseManager
+from .batching import MicroBatcher
 
 
 class Chatbot:
@@ -30,9 +33,86 @@ class Chatbot:
             config_path: Path to configuration file
         """
         self.config = self._load_config(config_path)
-        self.nlp = NLPProcessor()
-        self.db = DatabaseManager()
-        self.response_manager = ResponseManager()
+        nlp_config = self.config.get('nlp', {})
+        self.nlp = NLPProcessor(
+            tokenizer=nlp_config.get('tokenizer', 'nltk'),
+            lemma_cache_size=nlp_config.get('lemma_cache_size', 10000),
+            cache_size=nlp_config.get('analysis_cache', {}).get('max_size', 1024),
+            cache_ttl=nlp_config.get('analysis_cache', {}).get('ttl_seconds', 300.0),
+            snapshot_file=nlp_config.get('snapshot_file')
+        )
+        db_config = self.config.get('database', {})
+        sharding_config = db_config.get('sharding', {})
+        if sharding_config.get('enabled', False):
+            self.db = ShardedDatabaseManager(
+                shard_count=sharding_config.get('shards', 4),
+                directory=sharding_config.get('directory', 'database/shards'),
+                pragmas=db_config.get('pragmas'),
+                statement_cache_size=db_config.get('statement_cache_size', 256)
+            )
+        else:
+            self.db = DatabaseManager(
+                pragmas=db_config.get('pragmas'),
+                statement_cache_size=db_config.get('statement_cache_size', 256)
+            )
+        retention_config = db_config.get('retention', {})
+        self.db.configure_retention(
+            policies=retention_config.get('policies'),
+            batch_size=retention_config.get('batch_size', 1000),
+            pause_ms=retention_config.get('pause_ms', 10.0),
+            vacuum_pages=retention_config.get('vacuum_pages', 256)
+        )
+        archive_config = db_config.get('archive', {})
+        if archive_config.get('enabled', False):
+            self.db.enable_archive(
+                directory=archive_config.get('directory', 'database/archive'),
+                after_days=archive_config.get('after_days', 30),
+                batch_size=archive_config.get('batch_size', 1000)
+            )
+        write_behind_config = db_config.get('write_behind', {})
+        if write_behind_config.get('enabled', False):
+            self.db.enable_write_behind(
+                flush_interval_ms=write_behind_config.get('flush_interval_ms', 50.0),
+                batch_size=write_behind_config.get('batch_size', 256),
+                max_queue_size=write_behind_config.get('max_queue_size', 10000)
+            )
+        counter_config = db_config.get('counter_buffer', {})
+        if counter_config.get('enabled', False):
+            self.db.enable_counter_buffer(
+                flush_interval_ms=counter_config.get('flush_interval_ms', 1000.0),
+                max_pending=counter_config.get('max_pending', 5000)
+            )
+        profile_cache_config = db_config.get('profile_cache', {})
+        if profile_cache_config.get('enabled', False):
+            self.db.enable_profile_cache(
+                max_size=profile_cache_config.get('max_size', 1024),
+                ttl_seconds=profile_cache_config.get('ttl_seconds', 60.0)
+            )
+        codec_config = db_config.get('column_codecs', {})
+        self.db.configure_column_codecs(
+            entities=codec_config.get('entities', 'compact'),
+            sentiment=codec_config.get('sentiment', 'struct')
+        )
+        slow_query_config = db_config.get('slow_query_log', {})
+        if slow_query_config.get('enabled', False):
+            self.db.enable_slow_query_log(
+                threshold_ms=slow_query_config.get('threshold_ms', 100.0),
+                max_entries=slow_query_config.get('max_entries', 100),
+                log_file=slow_query_config.get('log_file')
+            )
+        self.response_manager = ResponseManager(keyword_rules=self.nlp.keyword_rules)
+        
+        # Optional micro-batching of concurrent NLP requests
+        self.nlp_batcher = None
+        batching_config = nlp_config.get('micro_batching', {})
+        self.nlp_batch_timeout = batching_config.get('timeout_ms', 1000) / 1000.0
+        if batching_config.get('enabled', False):
+            self.nlp_batcher = MicroBatcher(
+                partial(self.nlp.process_batch, lazy=True),
+                max_wait_ms=batching_config.get('max_wait_ms', 2.0),
+                max_batch_size=batching_config.get('max_batch_size', 32),
+                name="nlp-micro-batcher"
+            )
         
         # Conversation state
         self.conversations = {}
@@ -83,7 +163,7 @@ class Chatbot:
             self.db.store_message(user_id, session_id, message, "user")
             
             # Process message with NLP
-            nlp_result = self.nlp.process_message(message)
+            nlp_result = self._analyze_message(message)
             
             # Get conversation context
             context = self._get_conversation_context(user_id, session_id)
@@ -126,6 +206,16 @@ class Chatbot:
                 'error': str(e)
             }
     
+    def _analyze_message(self, message: str) -> Dict:
+        """Run NLP analysis, through the micro-batcher when enabled."""
+        if self.nlp_batcher:
+            try:
+                return self.nlp_batcher.process(message, timeout=self.nlp_batch_timeout)
+            except Exception as e:
+                # A slow, failed or closed batcher falls back to direct analysis
+                print(f"Error in NLP micro-batching, analyzing directly: {e!r}")
+        return self.nlp.process_message(message)
+    
     def _get_conversation_context(self, user_id: str, session_id: str) -> List[Dict]:
         """Get recent conversation context for the user."""
         with self.lock:
@@ -164,6 +254,11 @@ class Chatbot:
         """Get conversation history for a user."""
         return self.db.get_conversation_history(user_id, session_id, limit)
     
+    def get_conversation_page(self, user_id: str, session_id: str = None, limit: int = 50,
+                              before: str = None, after: str = None) -> Dict:
+        """Get one page of conversation history, paged with before/after cursors."""
+        return self.db.get_conversation_page(user_id, session_id, limit, before, after)
+    
     def create_support_ticket(self, user_id: str, subject: str, description: str, priority: str = "medium") -> Dict:
         """Create a support ticket for the user."""
         ticket_id = self.db.create_ticket(user_id, subject, description, priority)
@@ -181,9 +276,9 @@ class Chatbot:
         """Update user preferences."""
         return self.db.update_user_preferences(user_id, preferences)
     
-    def get_statistics(self) -> Dict:
+    def get_statistics(self, days: int = 30) -> Dict:
         """Get chatbot usage statistics."""
-        return self.db.get_statistics()
+        return self.db.get_statistics(days)
     
     def reset_conversation(self, user_id: str, session_id: str):
         """Reset conversation context for a user session."""
@@ -191,6 +286,12 @@ class Chatbot:
             if user_id in self.conversations and session_id in self.conversations[user_id]:
                 self.conversations[user_id][session_id] = []
     
+    def close(self):
+        """Stop background workers and flush pending database writes."""
+        if self.nlp_batcher:
+            self.nlp_batcher.close()
+        self.db.close()
+    
     def health_check(self) -> Dict:
         """Perform health check on all components."""
         return {
@@ -198,7 +299,8 @@ class Chatbot:
             'components': {
                 'nlp': self.nlp.health_check(),
                 'database': self.db.health_check(),
-                'response_manager': self.response_manager.health_check()
+                'response_manager': self.response_manager.health_check(),
+                'nlp_batching': self.nlp_batcher.get_stats() if self.nlp_batcher else {'enabled': False}
             },
             'timestamp': datetime.now().isoformat()
         } 
\ No newline at end of file
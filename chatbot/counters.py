@@ -0,0 +1,156 @@
+"""
+Counter Buffer Module
+
+Accumulates per-user message counters and statistics rollup entries in
+memory and writes them to the database periodically in one batch, so
+storing a message costs a single INSERT instead of several counter
+statements.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class CounterBuffer:
+    """
+    In-memory buffer of counter deltas flushed by a background thread.
+    
+    User deltas are kept as ``{user_id: [messages, first_ms, last_ms]}``
+    and rollup entries as a list handed unchanged to the writer. Readers
+    that combine database rows with unflushed deltas must do so inside
+    ``reading()``, which keeps a flush from moving deltas into the
+    database half way through the read.
+    """
+    
+    def __init__(self, write: Callable[[Dict[str, list], List[tuple]], None],
+                 flush_interval_ms: float = 1000.0, max_pending: int = 5000,
+                 name: str = "counter-buffer"):
+        """
+        Initialize the buffer and start its flush thread.
+        
+        Args:
+            write: Callable that durably writes user deltas and rollup
+                entries in one transaction
+            flush_interval_ms: Time between periodic flushes
+            max_pending: Number of buffered rollup entries that triggers an
+                early flush
+            name: Flush thread name
+        """
+        self.write = write
+        self.flush_interval = max(flush_interval_ms, 1.0) / 1000.0
+        self.max_pending = max(int(max_pending), 1)
+        
+        self._lock = threading.Lock()
+        self._flush_lock = threading.RLock()
+        self._users: Dict[str, list] = {}
+        self._entries: List[tuple] = []
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._stats = {
+            'added': 0,
+            'flushes': 0,
+            'flushed_entries': 0,
+            'flushed_users': 0,
+            'errors': 0
+        }
+        
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+    
+    def add(self, user_counts: Dict[str, Tuple[int, int, int]], entries: List[tuple]):
+        """
+        Buffer counter deltas.
+        
+        Args:
+            user_counts: {user_id: (messages, first_ms, last_ms)}
+            entries: Rollup entries for the same messages
+        """
+        with self._lock:
+            for user_id, (count, first_ms, last_ms) in user_counts.items():
+                delta = self._users.get(user_id)
+                if delta is None:
+                    self._users[user_id] = [count, first_ms, last_ms]
+                else:
+                    delta[0] += count
+                    delta[1] = min(delta[1], first_ms)
+                    delta[2] = max(delta[2], last_ms)
+            self._entries.extend(entries)
+            self._stats['added'] += len(entries)
+            full = len(self._entries) >= self.max_pending
+        
+        if full:
+            self._wakeup.set()
+    
+    def pending_for(self, user_id: str) -> Optional[Tuple[int, int, int]]:
+        """Get a user's unflushed (messages, first_ms, last_ms), if any."""
+        with self._lock:
+            delta = self._users.get(user_id)
+            return tuple(delta) if delta is not None else None
+    
+    @contextmanager
+    def reading(self):
+        """Hold off flushes while a reader combines stored rows with pending deltas."""
+        with self._flush_lock:
+            yield
+    
+    def flush(self) -> bool:
+        """
+        Write everything buffered so far.
+        
+        Returns:
+            True if the buffer was written successfully
+        """
+        with self._flush_lock:
+            with self._lock:
+                users, self._users = self._users, {}
+                entries, self._entries = self._entries, []
+            if not users and not entries:
+                return True
+            
+            try:
+                self.write(users, entries)
+            except Exception as e:
+                print(f"Error flushing counters: {e}")
+                # Put the deltas back so the next flush retries them
+                with self._lock:
+                    self._stats['errors'] += 1
+                    for user_id, (count, first_ms, last_ms) in users.items():
+                        delta = self._users.setdefault(user_id, [0, first_ms, last_ms])
+                        delta[0] += count
+                        delta[1] = min(delta[1], first_ms)
+                        delta[2] = max(delta[2], last_ms)
+                    self._entries[:0] = entries
+                return False
+            
+            with self._lock:
+                self._stats['flushes'] += 1
+                self._stats['flushed_entries'] += len(entries)
+                self._stats['flushed_users'] += len(users)
+            return True
+    
+    def _run(self):
+        """Flush loop: flush every interval, or early when the buffer is full."""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+    
+    def close(self):
+        """Stop the flush thread and write what is left."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._worker.join()
+        self.flush()
+    
+    def get_stats(self) -> Dict:
+        """Get counter buffer statistics."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending_users'] = len(self._users)
+            stats['pending_entries'] = len(self._entries)
+        stats['flush_interval_ms'] = self.flush_interval * 1000.0
+        stats['max_pending'] = self.max_pending
+        return stats
@@ -8,9 +8,26 @@ user management, and support ticket tracking.
 import sqlite3
 import json
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import atexit
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Any
 import threading
+import time
+
+from .archive import ARCHIVE_COLUMNS, ConversationArchive
+from .cache import ProfileCache
+from .codecs import ColumnCodecs, decode_value
+from .connections import ConnectionManager
+from .counters import CounterBuffer
+from .export import EXPORT_COLUMNS, get_encoder
+from .importer import DEFERRED_TABLE, BulkImport, read_records, restore_deferred_schema
+from .migrations import SchemaMigrator
+from .query_log import SlowQueryLog
+from .retention import RetentionJob
+from .rollups import StatisticsRollups
+from .search import FullTextSearch, fts5_available
+from .write_behind import WriteBehindQueue
 
 
 class DatabaseManager:
@@ -19,25 +36,47 @@ class DatabaseManager:
     Handles conversations, users, tickets, and analytics.
     """
     
-    def __init__(self, db_path: str = "database/chatbot.db"):
+    def __init__(self, db_path: str = "database/chatbot.db", pragmas: Optional[Dict] = None,
+                 statement_cache_size: int = 256):
         """
         Initialize the database manager.
         
         Args:
             db_path: Path to SQLite database file
+            pragmas: SQLite pragma overrides (journal_mode, synchronous,
+                cache_size, mmap_size, busy_timeout, ...)
+            statement_cache_size: Prepared statements cached per connection
         """
         self.db_path = db_path
+        # Serializes writers; readers use their own connection without locking
         self.lock = threading.Lock()
+        self.connections = ConnectionManager(db_path, pragmas, statement_cache_size)
+        self.write_queue = None
+        self.counter_buffer = None
+        self.profile_cache = None
+        self.rollups = StatisticsRollups()
+        self.search = FullTextSearch()
+        self.search_enabled = False
+        self.codecs = ColumnCodecs()
+        self.migrator = SchemaMigrator(self.connections, self.lock, codecs=self.codecs)
+        self.retention_config = {}
+        self.retention_job = None
+        self.archive = None
+        self.archive_config = {}
         
         # Ensure database directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
         print("💾 Database Manager initialized!")
     
-    def initialize_database(self):
-        """Initialize database tables if they don't exist."""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+    def initialize_database(self, migration_progress=None):
+        """
+        Initialize database tables if they don't exist and migrate existing ones.
+        
+        Args:
+            migration_progress: Optional callback receiving migration progress dicts
+        """
+        with self.lock, self.connections.transaction() as conn:
             cursor = conn.cursor()
             
             # Create conversations table
@@ -49,6 +88,7 @@ class DatabaseManager:
                     message TEXT NOT NULL,
                     sender TEXT NOT NULL,
                     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    timestamp_ms INTEGER,
                     intent TEXT,
                     confidence REAL,
                     entities TEXT,
@@ -81,7 +121,9 @@ class DatabaseManager:
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                     assigned_to TEXT,
-                    category TEXT
+                    category TEXT,
+                    created_at_ms INTEGER,
+                    updated_at_ms INTEGER
                 )
             ''')
             
@@ -95,21 +137,174 @@ class DatabaseManager:
                     unique_users INTEGER DEFAULT 0,
                     avg_response_time REAL,
                     satisfaction_score REAL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    date_ms INTEGER,
+                    created_at_ms INTEGER
                 )
             ''')
             
+            # Recreate indexes and triggers left dropped by an interrupted bulk import
+            restored = restore_deferred_schema(cursor)
+            
             # Create indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations(user_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversations_session_id ON conversations(session_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations(timestamp)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tickets_user_id ON tickets(user_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status)')
+        
+        # Bring existing databases up to the current schema version
+        self.migrate(migration_progress)
+        
+        with self.lock, self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            
+            # Create statistics rollups, backfilling them for existing databases
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_hourly'")
+            rollups_exist = cursor.fetchone() is not None
+            self.rollups.create_tables(cursor)
+            if not rollups_exist:
+                self.rollups.backfill(cursor, 'timestamp_ms')
+            
+            if self.archive is not None:
+                self.archive.create_tables(cursor)
             
-            conn.commit()
-            conn.close()
+            # Full-text indexes, built from existing rows the first time
+            self.search_enabled = fts5_available(cursor)
+            if self.search_enabled:
+                if self.search.create_tables(cursor):
+                    self.search.rebuild(cursor)
+                elif any(kind == 'trigger' for _, kind in restored):
+                    self.search.rebuild(cursor, [DEFERRED_TABLE])
+            else:
+                print("⚠️ SQLite was built without FTS5; full-text search is disabled")
+        
+        print("✅ Database tables initialized successfully!")
+    
+    def migrate(self, progress=None) -> int:
+        """
+        Apply pending schema migrations in small transactions.
+        
+        Args:
+            progress: Optional callback receiving backfill progress dicts
             
-            print("✅ Database tables initialized successfully!")
+        Returns:
+            Schema version after migrating
+        """
+        version = self.migrator.current_version()
+        new_version = self.migrator.migrate(progress)
+        if new_version != version:
+            print(f"🔧 Migrated database schema from version {version} to {new_version}")
+        return new_version
+    
+    def enable_write_behind(self, flush_interval_ms: float = 50.0, batch_size: int = 256,
+                            max_queue_size: int = 10000):
+        """
+        Queue messages in memory and commit them in batches from a background thread.
+        
+        Args:
+            flush_interval_ms: Longest time a message waits before it is committed
+            batch_size: Maximum number of messages per transaction
+            max_queue_size: Number of queued messages before store_message blocks
+        """
+        if self.write_queue is not None:
+            return
+        
+        self.write_queue = WriteBehindQueue(
+            self._write_message_batch,
+            flush_interval_ms=flush_interval_ms,
+            batch_size=batch_size,
+            max_queue_size=max_queue_size,
+            name="db-write-behind",
+            on_failure=self._discard_failed_messages
+        )
+        atexit.register(self.close)
+    
+    def _discard_failed_messages(self, records: List[tuple]):
+        """Drop cached profiles already counting queued messages that were never written."""
+        if self.profile_cache is not None:
+            for user_id in {record[0] for record in records}:
+                self.profile_cache.invalidate(user_id)
+    
+    def enable_counter_buffer(self, flush_interval_ms: float = 1000.0, max_pending: int = 5000):
+        """
+        Keep user counters and statistics rollups in memory and flush them periodically.
+        
+        Storing a message then costs one INSERT; the counter statements run
+        once per flush for all buffered messages. Counter deltas still in
+        memory when the process dies are lost; ``backfill_rollups`` rebuilds
+        the rollups and ``rebuild_user_counters`` the user totals.
+        
+        Args:
+            flush_interval_ms: Time between counter flushes
+            max_pending: Buffered messages that trigger an early flush
+        """
+        if self.counter_buffer is not None:
+            return
+        
+        self.counter_buffer = CounterBuffer(
+            self._write_counters,
+            flush_interval_ms=flush_interval_ms,
+            max_pending=max_pending,
+            name="db-counters"
+        )
+        atexit.register(self.close)
+    
+    def enable_profile_cache(self, max_size: int = 1024, ttl_seconds: Optional[float] = 60.0):
+        """
+        Cache user profiles in memory.
+        
+        Messages, tickets and preference changes made through this manager
+        update cached profiles in place; retention and archiving clear the
+        cache. Changes made by other processes show up once an entry expires.
+        
+        Args:
+            max_size: Maximum number of profiles cached
+            ttl_seconds: Seconds a profile stays cached, or None for no expiry
+        """
+        if self.profile_cache is None:
+            self.profile_cache = ProfileCache(max_size, ttl_seconds)
+    
+    def configure_column_codecs(self, entities: Optional[str] = None, sentiment: Optional[str] = None):
+        """
+        Choose how the entities and sentiment columns are written.
+        
+        Rows written with any codec, and JSON text from before codecs
+        existed, keep decoding; the schema migration rewrites JSON text
+        with the codecs configured when it runs.
+        
+        Args:
+            entities: 'compact' (default), 'msgpack' (needs msgpack) or 'json'
+            sentiment: 'struct' (default, packed doubles) or 'json'
+        """
+        self.codecs.configure(entities, sentiment)
+    
+    def enable_slow_query_log(self, threshold_ms: float = 100.0, max_entries: int = 100,
+                              log_file: Optional[str] = None, explain: bool = True):
+        """
+        Time every statement and record the slow ones with their query plan.
+        
+        Open connections are reopened with timing, so enable the log at
+        startup, before requests are served. Timing costs a couple of
+        microseconds per statement; plans are only looked up for slow ones.
+        
+        Args:
+            threshold_ms: Statements taking at least this long are recorded
+            max_entries: Recent slow queries kept for ``get_slow_queries``
+            log_file: Optional JSON Lines file slow queries are appended to
+            explain: Record the EXPLAIN QUERY PLAN of slow queries
+        """
+        self.connections.set_query_log(
+            SlowQueryLog(threshold_ms, max_entries=max_entries, log_file=log_file, explain=explain)
+        )
+    
+    def get_slow_queries(self) -> List[Dict]:
+        """Get the recently recorded slow queries, oldest first."""
+        query_log = self.connections.query_log
+        return query_log.get_entries() if query_log is not None else []
+    
+    def flush_counters(self):
+        """Write buffered counter deltas to the database now."""
+        if self.write_queue is not None:
+            self.write_queue.flush()
+        if self.counter_buffer is not None:
+            self.counter_buffer.flush()
     
     def store_message(self, user_id: str, session_id: str, message: str, 
                      sender: str, intent: str = None, confidence: float = None,
@@ -127,48 +322,100 @@ class DatabaseManager:
             entities: Extracted entities
             sentiment: Sentiment analysis results
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        record = (
+            user_id, session_id, message, sender, self._now_ms(), intent, confidence,
+            self.codecs.encode('entities', entities),
+            self.codecs.encode('sentiment', sentiment)
+        )
+        
+        last_seen = self._format_timestamp(record[4])
+        
+        def count_message(profile):
+            profile['total_messages'] += 1
+            profile['total_conversations'] += 1
+            profile['last_seen'] = max(profile['last_seen'] or '', last_seen)
+        
+        with self._profile_write(user_id, count_message):
+            if self.write_queue is not None:
+                self.write_queue.submit(record, key=user_id)
+            else:
+                self._write_message_batch([record])
+    
+    def _write_message_batch(self, records: List[tuple]):
+        """
+        Insert messages with their user statistics and rollups.
+        
+        With the counter buffer enabled only the messages are written here;
+        the counters are buffered once the insert has committed.
+        """
+        users = {}
+        for record in records:
+            entry = users.get(record[0])
+            if entry is None:
+                users[record[0]] = [1, record[4], record[4]]
+            else:
+                entry[0] += 1
+                entry[1] = min(entry[1], record[4])
+                entry[2] = max(entry[2], record[4])
+        entries = [(record[4], record[0], record[1], record[3], record[6]) for record in records]
+        
+        with self.lock, self.connections.transaction() as conn:
             cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO conversations (user_id, session_id, message, sender, timestamp, timestamp_ms,
+                                           intent, confidence, entities, sentiment)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [record[:4] + (self._format_timestamp(record[4]),) + record[4:] for record in records])
             
-            # Store the message
-            cursor.execute('''
-                INSERT INTO conversations (user_id, session_id, message, sender, intent, confidence, entities, sentiment)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                user_id, session_id, message, sender, intent, confidence,
-                json.dumps(entities) if entities else None,
-                json.dumps(sentiment) if sentiment else None
-            ))
-            
-            # Update user statistics
-            self._update_user_stats(user_id, cursor)
-            
-            conn.commit()
-            conn.close()
-    
-    def _update_user_stats(self, user_id: str, cursor):
-        """Update user statistics."""
-        # Check if user exists
-        cursor.execute('SELECT total_messages FROM users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
-        
-        if result:
-            # Update existing user
-            cursor.execute('''
-                UPDATE users 
-                SET total_messages = total_messages + 1, last_seen = CURRENT_TIMESTAMP
-                WHERE user_id = ?
-            ''', (user_id,))
-        else:
-            # Create new user
-            cursor.execute('''
-                INSERT INTO users (user_id, total_messages)
-                VALUES (?, 1)
-            ''', (user_id,))
+            if self.counter_buffer is None:
+                self._apply_counters(cursor, users, entries)
+        
+        if self.counter_buffer is not None:
+            self.counter_buffer.add(users, entries)
+    
+    def _write_counters(self, users: Dict[str, list], entries: List[tuple]):
+        """Write buffered counter deltas in one transaction."""
+        with self.lock, self.connections.transaction() as conn:
+            self._apply_counters(conn.cursor(), users, entries)
+    
+    def _apply_counters(self, cursor, users: Dict[str, list], entries: List[tuple]):
+        """
+        Add message counts to users and rollups.
+        
+        Args:
+            cursor: Cursor inside the caller's transaction
+            users: {user_id: [messages, first_ms, last_ms]}
+            entries: Rollup entries (timestamp_ms, user_id, session_id, sender, confidence)
+        """
+        cursor.executemany('''
+            INSERT INTO users (user_id, first_seen, last_seen, total_messages)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                total_messages = total_messages + excluded.total_messages,
+                last_seen = MAX(last_seen, excluded.last_seen)
+        ''', [
+            (user_id, self._format_timestamp(first_ms), self._format_timestamp(last_ms), count)
+            for user_id, (count, first_ms, last_ms) in users.items()
+        ])
+        self.rollups.record_messages(cursor, entries)
+    
+    @staticmethod
+    def _now_ms() -> int:
+        """Current time as epoch milliseconds."""
+        return int(time.time() * 1000)
+    
+    @staticmethod
+    def _format_timestamp(timestamp_ms: int) -> str:
+        """Format epoch milliseconds like SQLite's CURRENT_TIMESTAMP."""
+        return datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    
+    def _wait_for_pending_writes(self, user_id: str):
+        """Make queued messages of a user visible before reading them."""
+        if self.write_queue is not None and self.write_queue.has_pending(user_id):
+            self.write_queue.wait_for(user_id)
     
     def get_conversation_history(self, user_id: str, session_id: str = None, 
-                               limit: int = 50) -> List[Dict]:
+                               limit: int = 50, before: str = None, after: str = None) -> List[Dict]:
         """
         Get conversation history for a user.
         
@@ -176,47 +423,182 @@ class DatabaseManager:
             user_id: User identifier
             session_id: Optional session identifier
             limit: Maximum number of messages to return
+            before: Optional cursor; return the messages just older than it
+            after: Optional cursor; return the messages just newer than it
             
         Returns:
-            List of conversation messages
+            List of conversation messages in chronological order
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        return self.get_conversation_page(user_id, session_id, limit, before, after)['messages']
+    
+    def get_conversation_page(self, user_id: str, session_id: str = None, limit: int = 50,
+                              before: str = None, after: str = None) -> Dict:
+        """
+        Get one page of conversation history using keyset pagination.
+        
+        Pages are located through the (user_id, session_id, timestamp_ms, id)
+        index, so every page costs the same regardless of how far back it is.
+        Without a cursor the newest messages are returned.
+        
+        Args:
+            user_id: User identifier
+            session_id: Optional session identifier
+            limit: Maximum number of messages to return
+            before: Optional cursor; return the messages just older than it
+            after: Optional cursor; return the messages just newer than it
             
-            if session_id:
-                cursor.execute('''
-                    SELECT message, sender, timestamp, intent, confidence, entities, sentiment
-                    FROM conversations
-                    WHERE user_id = ? AND session_id = ?
-                    ORDER BY timestamp DESC
-                    LIMIT ?
-                ''', (user_id, session_id, limit))
-            else:
-                cursor.execute('''
-                    SELECT message, sender, timestamp, intent, confidence, entities, sentiment
-                    FROM conversations
-                    WHERE user_id = ?
-                    ORDER BY timestamp DESC
-                    LIMIT ?
-                ''', (user_id, limit))
+        Returns:
+            Dictionary with chronological messages, cursors of the first and
+            last message, and whether more messages exist in the paging direction
+        """
+        if before and after:
+            raise ValueError("Use either before or after, not both")
+        
+        self._wait_for_pending_writes(user_id)
+        cursor = self.connections.connection().cursor()
+        
+        where = 'user_id = ?'
+        params = [user_id]
+        if session_id:
+            where += ' AND session_id = ?'
+            params.append(session_id)
+        
+        if after:
+            where += ' AND (timestamp_ms, id) > (?, ?)'
+            params.extend(self.decode_cursor(after))
+            order = 'ASC'
+        else:
+            if before:
+                where += ' AND (timestamp_ms, id) < (?, ?)'
+                params.extend(self.decode_cursor(before))
+            order = 'DESC'
+        
+        # Fetch one extra row to know whether another page exists
+        params.append(limit + 1)
+        cursor.execute(f'''
+            SELECT id, timestamp_ms, message, sender, timestamp, intent, confidence, entities, sentiment
+            FROM conversations
+            WHERE {where}
+            ORDER BY timestamp_ms {order}, id {order}
+            LIMIT ?
+        ''', params)
+        
+        results = cursor.fetchall()
+        has_more = len(results) > limit
+        results = results[:limit]
+        if order == 'DESC':
+            results.reverse()  # Chronological order
+        
+        conversations = []
+        for row in results:
+            conversations.append({
+                'message': row[2],
+                'sender': row[3],
+                'timestamp': row[4],
+                'intent': row[5],
+                'confidence': row[6],
+                'entities': decode_value(row[7]),
+                'sentiment': decode_value(row[8]),
+                'cursor': self.encode_cursor(row[1], row[0])
+            })
+        
+        return {
+            'messages': conversations,
+            'has_more': has_more,
+            'before': conversations[0]['cursor'] if conversations else before,
+            'after': conversations[-1]['cursor'] if conversations else after
+        }
+    
+    def iter_conversations(self, user_id: str = None, start_ms: int = None, end_ms: int = None,
+                           chunk_size: int = 1000) -> Iterator[List[tuple]]:
+        """
+        Walk conversations in (timestamp_ms, id) order, one chunk at a time.
+        
+        Each chunk is a separate keyset query, so no read transaction is
+        held open between chunks and memory use stays at one chunk.
+        
+        Args:
+            user_id: Optional user filter
+            start_ms: Optional inclusive lower time bound
+            end_ms: Optional exclusive upper time bound
+            chunk_size: Rows per chunk
             
-            results = cursor.fetchall()
-            conn.close()
+        Yields:
+            Lists of rows in EXPORT_COLUMNS order, with entities and
+            sentiment decoded
+        """
+        if self.write_queue is not None:
+            self.write_queue.flush()
+        chunk_size = max(int(chunk_size), 1)
+        
+        where = []
+        params: List = []
+        if user_id:
+            where.append('user_id = ?')
+            params.append(user_id)
+        if start_ms is not None:
+            where.append('timestamp_ms >= ?')
+            params.append(start_ms)
+        if end_ms is not None:
+            where.append('timestamp_ms < ?')
+            params.append(end_ms)
+        
+        last = None
+        while True:
+            conditions = list(where)
+            chunk_params = list(params)
+            if last is not None:
+                conditions.append('(timestamp_ms, id) > (?, ?)')
+                chunk_params.extend(last)
+            query = f'SELECT {", ".join(EXPORT_COLUMNS)} FROM conversations'
+            if conditions:
+                query += ' WHERE ' + ' AND '.join(conditions)
             
-            conversations = []
-            for row in results:
-                conversations.append({
-                    'message': row[0],
-                    'sender': row[1],
-                    'timestamp': row[2],
-                    'intent': row[3],
-                    'confidence': row[4],
-                    'entities': json.loads(row[5]) if row[5] else None,
-                    'sentiment': json.loads(row[6]) if row[6] else None
-                })
+            cursor = self.connections.connection().cursor()
+            cursor.execute(query + ' ORDER BY timestamp_ms, id LIMIT ?', chunk_params + [chunk_size])
+            rows = cursor.fetchall()
+            if rows:
+                yield [row[:-2] + (decode_value(row[-2]), decode_value(row[-1])) for row in rows]
+            if len(rows) < chunk_size:
+                return
+            last = (rows[-1][EXPORT_COLUMNS.index('timestamp_ms')], rows[-1][0])
+    
+    def export_conversations(self, fmt: str = 'jsonl', user_id: str = None, start_ms: int = None,
+                             end_ms: int = None, chunk_size: int = 1000) -> Iterator[bytes]:
+        """
+        Stream conversations encoded as JSON Lines, CSV or Parquet.
+        
+        Args:
+            fmt: 'jsonl', 'csv' or 'parquet' (needs pyarrow)
+            user_id: Optional user filter
+            start_ms: Optional inclusive lower time bound
+            end_ms: Optional exclusive upper time bound
+            chunk_size: Rows read and encoded at a time
             
-            return conversations[::-1]  # Reverse to get chronological order
+        Returns:
+            Iterator of encoded byte chunks
+        """
+        encoder = get_encoder(fmt)
+        return encoder(self.iter_conversations(user_id, start_ms, end_ms, chunk_size))
+    
+    @staticmethod
+    def encode_cursor(timestamp_ms: int, message_id: int) -> str:
+        """Build the pagination cursor of a message."""
+        return f"{timestamp_ms}_{message_id}"
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        """
+        Parse a pagination cursor.
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            timestamp_ms, message_id = cursor.split('_')
+            return int(timestamp_ms), int(message_id)
+        except (AttributeError, ValueError):
+            raise ValueError(f"Invalid history cursor: {cursor!r}")
     
     def create_ticket(self, user_id: str, subject: str, description: str, 
                      priority: str = "medium", category: str = None) -> int:
@@ -233,20 +615,22 @@ class DatabaseManager:
         Returns:
             Ticket ID
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
+        def count_ticket(profile):
+            profile['total_tickets'] += 1
+        
+        with self._profile_write(user_id, count_ticket), self.lock, self.connections.transaction() as conn:
             cursor = conn.cursor()
             
+            now_ms = self._now_ms()
             cursor.execute('''
-                INSERT INTO tickets (user_id, subject, description, priority, category)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_id, subject, description, priority, category))
+                INSERT INTO tickets (user_id, subject, description, priority, category, created_at_ms, updated_at_ms)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, subject, description, priority, category, now_ms, now_ms))
             
             ticket_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            
-            return ticket_id
+            self.rollups.record_ticket_status(cursor, None, 'open')
+        
+        return ticket_id
     
     def get_tickets(self, user_id: str = None, status: str = None, 
                    limit: int = 50) -> List[Dict]:
@@ -261,44 +645,46 @@ class DatabaseManager:
         Returns:
             List of tickets
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            query = 'SELECT * FROM tickets WHERE 1=1'
-            params = []
-            
-            if user_id:
-                query += ' AND user_id = ?'
-                params.append(user_id)
-            
-            if status:
-                query += ' AND status = ?'
-                params.append(status)
-            
-            query += ' ORDER BY created_at DESC LIMIT ?'
-            params.append(limit)
-            
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            conn.close()
-            
-            tickets = []
-            for row in results:
-                tickets.append({
-                    'ticket_id': row[0],
-                    'user_id': row[1],
-                    'subject': row[2],
-                    'description': row[3],
-                    'priority': row[4],
-                    'status': row[5],
-                    'created_at': row[6],
-                    'updated_at': row[7],
-                    'assigned_to': row[8],
-                    'category': row[9]
-                })
-            
-            return tickets
+        cursor = self.connections.connection().cursor()
+        
+        query = '''
+            SELECT ticket_id, user_id, subject, description, priority, status,
+                   created_at, updated_at, assigned_to, category, created_at_ms
+            FROM tickets WHERE 1=1
+        '''
+        params = []
+        
+        if user_id:
+            query += ' AND user_id = ?'
+            params.append(user_id)
+        
+        if status:
+            query += ' AND status = ?'
+            params.append(status)
+        
+        query += ' ORDER BY created_at_ms DESC, ticket_id DESC LIMIT ?'
+        params.append(limit)
+        
+        cursor.execute(query, params)
+        results = cursor.fetchall()
+        
+        tickets = []
+        for row in results:
+            tickets.append({
+                'ticket_id': row[0],
+                'user_id': row[1],
+                'subject': row[2],
+                'description': row[3],
+                'priority': row[4],
+                'status': row[5],
+                'created_at': row[6],
+                'updated_at': row[7],
+                'assigned_to': row[8],
+                'category': row[9],
+                'created_at_ms': row[10]
+            })
+        
+        return tickets
     
     def update_ticket_status(self, ticket_id: int, status: str, 
                            assigned_to: str = None) -> bool:
@@ -313,30 +699,33 @@ class DatabaseManager:
         Returns:
             Success status
         """
-        with self.lock:
-            try:
-                conn = sqlite3.connect(self.db_path)
+        try:
+            with self.lock, self.connections.transaction() as conn:
                 cursor = conn.cursor()
                 
+                cursor.execute('SELECT status FROM tickets WHERE ticket_id = ?', (ticket_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    return True
+                
                 if assigned_to:
                     cursor.execute('''
                         UPDATE tickets 
-                        SET status = ?, assigned_to = ?, updated_at = CURRENT_TIMESTAMP
+                        SET status = ?, assigned_to = ?, updated_at = CURRENT_TIMESTAMP, updated_at_ms = ?
                         WHERE ticket_id = ?
-                    ''', (status, assigned_to, ticket_id))
+                    ''', (status, assigned_to, self._now_ms(), ticket_id))
                 else:
                     cursor.execute('''
                         UPDATE tickets 
-                        SET status = ?, updated_at = CURRENT_TIMESTAMP
+                        SET status = ?, updated_at = CURRENT_TIMESTAMP, updated_at_ms = ?
                         WHERE ticket_id = ?
-                    ''', (status, ticket_id))
+                    ''', (status, self._now_ms(), ticket_id))
                 
-                conn.commit()
-                conn.close()
-                return True
-            except Exception as e:
-                print(f"Error updating ticket: {e}")
-                return False
+                self.rollups.record_ticket_status(cursor, row[0], status)
+            return True
+        except Exception as e:
+            print(f"Error updating ticket: {e}")
+            return False
     
     def get_user_profile(self, user_id: str) -> Dict:
         """
@@ -348,47 +737,68 @@ class DatabaseManager:
         Returns:
             User profile dictionary
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get user info
+        if self.profile_cache is not None:
+            return self.profile_cache.get(user_id, self._load_user_profile)
+        return self._load_user_profile(user_id)
+    
+    def _profile_write(self, user_id: str, change):
+        """Context for a write that changes a user's cached profile."""
+        if self.profile_cache is None:
+            return nullcontext()
+        return self.profile_cache.writing(user_id, change)
+    
+    def _load_user_profile(self, user_id: str) -> Dict:
+        """Read a user's profile from the database."""
+        self._wait_for_pending_writes(user_id)
+        cursor = self.connections.connection().cursor()
+        
+        # Get user info, plus counter deltas not flushed yet
+        reading = self.counter_buffer.reading() if self.counter_buffer is not None else nullcontext()
+        with reading:
             cursor.execute('''
                 SELECT first_seen, last_seen, total_messages, preferences, language, timezone
                 FROM users WHERE user_id = ?
             ''', (user_id,))
-            
             user_result = cursor.fetchone()
-            
-            if not user_result:
-                conn.close()
-                return None
-            
-            # Get recent conversations
-            cursor.execute('''
-                SELECT COUNT(*) FROM conversations WHERE user_id = ?
-            ''', (user_id,))
-            total_conversations = cursor.fetchone()[0]
-            
-            # Get tickets
-            cursor.execute('''
-                SELECT COUNT(*) FROM tickets WHERE user_id = ?
-            ''', (user_id,))
-            total_tickets = cursor.fetchone()[0]
-            
-            conn.close()
-            
-            return {
-                'user_id': user_id,
-                'first_seen': user_result[0],
-                'last_seen': user_result[1],
-                'total_messages': user_result[2],
-                'preferences': json.loads(user_result[3]) if user_result[3] else {},
-                'language': user_result[4],
-                'timezone': user_result[5],
-                'total_conversations': total_conversations,
-                'total_tickets': total_tickets
-            }
+            pending = self.counter_buffer.pending_for(user_id) if self.counter_buffer is not None else None
+        
+        if pending:
+            count, first_ms, last_ms = pending
+            if user_result:
+                user_result = (
+                    user_result[0], max(user_result[1] or '', self._format_timestamp(last_ms)),
+                    user_result[2] + count
+                ) + tuple(user_result[3:])
+            else:
+                user_result = (self._format_timestamp(first_ms), self._format_timestamp(last_ms),
+                               count, None, 'en', None)
+        
+        if not user_result:
+            return None
+        
+        # Get recent conversations
+        cursor.execute('''
+            SELECT COUNT(*) FROM conversations WHERE user_id = ?
+        ''', (user_id,))
+        total_conversations = cursor.fetchone()[0]
+        
+        # Get tickets
+        cursor.execute('''
+            SELECT COUNT(*) FROM tickets WHERE user_id = ?
+        ''', (user_id,))
+        total_tickets = cursor.fetchone()[0]
+        
+        return {
+            'user_id': user_id,
+            'first_seen': user_result[0],
+            'last_seen': user_result[1],
+            'total_messages': user_result[2],
+            'preferences': json.loads(user_result[3]) if user_result[3] else {},
+            'language': user_result[4],
+            'timezone': user_result[5],
+            'total_conversations': total_conversations,
+            'total_tickets': total_tickets
+        }
     
     def update_user_preferences(self, user_id: str, preferences: Dict) -> bool:
         """
@@ -401,147 +811,427 @@ class DatabaseManager:
         Returns:
             Success status
         """
-        with self.lock:
-            try:
-                conn = sqlite3.connect(self.db_path)
+        cached_preferences = json.loads(json.dumps(preferences))
+        
+        def set_preferences(profile):
+            profile['preferences'] = cached_preferences
+        
+        try:
+            with self._profile_write(user_id, set_preferences), self.lock, \
+                    self.connections.transaction() as conn:
                 cursor = conn.cursor()
                 
+                # Upsert: a new user's row may still be waiting in the counter buffer
                 cursor.execute('''
-                    UPDATE users 
-                    SET preferences = ?
-                    WHERE user_id = ?
-                ''', (json.dumps(preferences), user_id))
-                
-                conn.commit()
-                conn.close()
-                return True
-            except Exception as e:
-                print(f"Error updating user preferences: {e}")
-                return False
+                    INSERT INTO users (user_id, preferences, total_messages) VALUES (?, ?, 0)
+                    ON CONFLICT(user_id) DO UPDATE SET preferences = excluded.preferences
+                ''', (user_id, json.dumps(preferences)))
+            return True
+        except Exception as e:
+            print(f"Error updating user preferences: {e}")
+            return False
     
     def get_statistics(self, days: int = 30) -> Dict:
         """
         Get chatbot usage statistics.
         
+        Figures are read from the hourly and daily rollups and cover whole
+        UTC hours, from the hour ``days`` ago up to the current hour.
+        
         Args:
             days: Number of days to analyze
             
         Returns:
             Statistics dictionary
         """
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Date range
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            # Total messages
-            cursor.execute('''
-                SELECT COUNT(*) FROM conversations 
-                WHERE timestamp >= ? AND timestamp <= ?
-            ''', (start_date.isoformat(), end_date.isoformat()))
-            total_messages = cursor.fetchone()[0]
+        return self.summarize_statistics(days, self.get_statistics_totals(days))
+    
+    def get_statistics_totals(self, days: int = 30, session_ids: bool = False) -> Dict:
+        """
+        Get the additive rollup totals behind get_statistics.
+        
+        Args:
+            days: Number of days to analyze
+            session_ids: Also return the set of active session IDs
             
-            # Unique users
-            cursor.execute('''
-                SELECT COUNT(DISTINCT user_id) FROM conversations 
-                WHERE timestamp >= ? AND timestamp <= ?
-            ''', (start_date.isoformat(), end_date.isoformat()))
-            unique_users = cursor.fetchone()[0]
+        Returns:
+            Dictionary of counts and bot confidence sums, with
+            ``session_ids`` when requested
+        """
+        self.flush_counters()
+        cursor = self.connections.connection().cursor()
+        
+        # Date range
+        end_ms = self._now_ms()
+        start_ms = end_ms - int(timedelta(days=days).total_seconds() * 1000)
+        
+        totals = self.rollups.read_statistics(cursor, start_ms, end_ms)
+        if session_ids:
+            totals['session_ids'] = self.rollups.read_session_ids(cursor, start_ms, end_ms)
+        return totals
+    
+    @staticmethod
+    def summarize_statistics(days: int, stats: Dict) -> Dict:
+        """Turn rollup totals into the get_statistics result."""
+        total_messages = stats['total_messages']
+        unique_users = stats['unique_users']
+        total_conversations = stats['total_conversations']
+        
+        return {
+            'period_days': days,
+            'total_messages': total_messages,
+            'unique_users': unique_users,
+            'total_conversations': total_conversations,
+            'open_tickets': stats['open_tickets'],
+            'avg_confidence': round(stats['avg_confidence'], 3),
+            'messages_per_user': round(total_messages / max(unique_users, 1), 2),
+            'conversations_per_user': round(total_conversations / max(unique_users, 1), 2)
+        }
+    
+    def backfill_rollups(self):
+        """
+        Rebuild the statistics rollups from the conversations and tickets tables.
+        
+        Buckets older than the oldest remaining conversation are kept, so
+        statistics of periods emptied by retention or archiving survive.
+        """
+        self.flush_counters()
+        with self.lock, self.connections.transaction() as conn:
+            self.rollups.backfill(conn.cursor(), 'timestamp_ms')
+    
+    def search_conversations(self, query: str, user_id: str = None, start_ms: int = None,
+                             end_ms: int = None, limit: int = 20, offset: int = 0,
+                             before: str = None) -> Dict:
+        """
+        Full-text search over conversation messages, best matches first.
+        
+        Every word of the query must match; ``word*`` matches a prefix.
+        Without a user filter, the newest ``search.rank_window`` matches in
+        the time range are ranked, and ``truncated`` is set when older
+        matches were left out. Passing the page's ``next_before`` cursor
+        as ``before`` ranks the next older window. Archived messages are
+        not searched.
+        
+        Args:
+            query: Search text
+            user_id: Optional user filter
+            start_ms: Optional inclusive lower time bound (epoch milliseconds)
+            end_ms: Optional exclusive upper time bound (epoch milliseconds)
+            limit: Results per page
+            offset: Results to skip
+            before: Cursor from a previous page's next_before
             
-            # Total conversations (sessions)
-            cursor.execute('''
-                SELECT COUNT(DISTINCT session_id) FROM conversations 
-                WHERE timestamp >= ? AND timestamp <= ?
-            ''', (start_date.isoformat(), end_date.isoformat()))
-            total_conversations = cursor.fetchone()[0]
+        Returns:
+            Dictionary with results (each with rank and snippet), has_more,
+            truncated, rank_window, next_before, offset and limit
+        """
+        if not self.search_enabled:
+            raise RuntimeError("Full-text search is not available")
+        try:
+            before_id = int(before) if before else None
+        except ValueError:
+            raise ValueError("Invalid search cursor") from None
+        if self.write_queue is not None:
+            self.write_queue.flush()
+        cursor = self.connections.connection().cursor()
+        page = self.search.search_conversations(cursor, query, user_id, start_ms, end_ms,
+                                                limit, offset, before_id)
+        next_before_id = page.pop('next_before_id')
+        page['next_before'] = str(next_before_id) if next_before_id is not None else None
+        return page
+    
+    def search_tickets(self, query: str, user_id: str = None, status: str = None,
+                       start_ms: int = None, end_ms: int = None, limit: int = 20,
+                       offset: int = 0) -> Dict:
+        """
+        Full-text search over ticket subjects and descriptions, best matches first.
+        
+        Args:
+            query: Search text
+            user_id: Optional user filter
+            status: Optional status filter
+            start_ms: Optional inclusive lower bound on creation time
+            end_ms: Optional exclusive upper bound on creation time
+            limit: Results per page
+            offset: Results to skip
             
-            # Open tickets
-            cursor.execute('SELECT COUNT(*) FROM tickets WHERE status = "open"')
-            open_tickets = cursor.fetchone()[0]
+        Returns:
+            Dictionary with results (each with rank and snippet), has_more,
+            truncated, offset and limit
+        """
+        if not self.search_enabled:
+            raise RuntimeError("Full-text search is not available")
+        cursor = self.connections.connection().cursor()
+        return self.search.search_tickets(cursor, query, user_id, status, start_ms, end_ms, limit, offset)
+    
+    def rebuild_search_index(self):
+        """Rebuild the full-text indexes from the conversations and tickets tables."""
+        if not self.search_enabled:
+            raise RuntimeError("Full-text search is not available")
+        if self.write_queue is not None:
+            self.write_queue.flush()
+        with self.lock, self.connections.transaction() as conn:
+            self.search.rebuild(conn.cursor())
+    
+    def bulk_import(self, records: Iterable[Dict], nlp=None, batch_size: int = 10000,
+                    defer_indexes: bool = True, progress=None) -> Dict:
+        """
+        Load historical conversation records in large batches.
+        
+        Args:
+            records: Iterable of record dictionaries (see importer.parse_record)
+            nlp: Optional NLPProcessor that classifies user messages without an intent
+            batch_size: Records written per transaction
+            defer_indexes: Drop the conversation indexes and full-text triggers
+                during the load and rebuild them at the end
+            progress: Optional callback receiving the stats after each batch
             
-            # Average response time (simplified)
-            cursor.execute('''
-                SELECT AVG(confidence) FROM conversations 
-                WHERE sender = 'bot' AND timestamp >= ? AND timestamp <= ?
-            ''', (start_date.isoformat(), end_date.isoformat()))
-            avg_confidence = cursor.fetchone()[0] or 0.0
+        Returns:
+            Import statistics (imported, skipped, analyzed, users, errors, ...)
+        """
+        with BulkImport(self, nlp, batch_size, defer_indexes, progress) as job:
+            job.add_all(records)
+        return job.get_stats()
+    
+    def import_conversations(self, stream: TextIO, fmt: str = 'jsonl', **options) -> Dict:
+        """
+        Bulk import conversations from a JSON Lines or CSV text stream.
+        
+        Args:
+            stream: Text stream to read
+            fmt: 'jsonl' or 'csv'
+            **options: bulk_import options
             
-            conn.close()
+        Returns:
+            Import statistics
+        """
+        return self.bulk_import(read_records(stream, fmt), **options)
+    
+    def rebuild_user_counters(self):
+        """Recount every user's total_messages from the conversations table."""
+        self.flush_counters()
+        with self.lock, self.connections.transaction() as conn:
+            conn.execute('''
+                UPDATE users SET total_messages = (
+                    SELECT COUNT(*) FROM conversations WHERE conversations.user_id = users.user_id
+                )
+            ''')
+        if self.profile_cache is not None:
+            self.profile_cache.invalidate()
+    
+    def configure_retention(self, policies: Optional[Dict] = None, batch_size: int = 1000,
+                            pause_ms: float = 10.0, vacuum_pages: int = 256):
+        """
+        Set the defaults used by retention jobs.
+        
+        Args:
+            policies: Per-table policies, e.g. {'tickets': {'days': 180}}
+            batch_size: Maximum rows deleted per transaction
+            pause_ms: Pause between batches so chat turns can write
+            vacuum_pages: Free pages released after each batch
+        """
+        self.retention_config = {
+            'policies': policies or {},
+            'batch_size': batch_size,
+            'pause_ms': pause_ms,
+            'vacuum_pages': vacuum_pages
+        }
+    
+    def _create_retention_job(self, policies: Optional[Dict] = None) -> RetentionJob:
+        config = dict(self.retention_config)
+        merged = {table: dict(policy) for table, policy in config.pop('policies', {}).items()}
+        for table, policy in (policies or {}).items():
+            merged.setdefault(table, {}).update(policy)
+        return RetentionJob(self, merged, **config)
+    
+    def run_retention(self, policies: Optional[Dict] = None, background: bool = False) -> Dict:
+        """
+        Run a retention job unless one is already running.
+        
+        Args:
+            policies: Policy overrides for this run
+            background: Start the job in a background thread and return at once
             
-            return {
-                'period_days': days,
-                'total_messages': total_messages,
-                'unique_users': unique_users,
-                'total_conversations': total_conversations,
-                'open_tickets': open_tickets,
-                'avg_confidence': round(avg_confidence, 3),
-                'messages_per_user': round(total_messages / max(unique_users, 1), 2),
-                'conversations_per_user': round(total_conversations / max(unique_users, 1), 2)
-            }
+        Returns:
+            Status of the running job, or the final status of an inline run
+        """
+        with self.lock:
+            if self.retention_job is not None and self.retention_job.is_running():
+                return self.retention_job.get_status()
+            job = self.retention_job = self._create_retention_job(policies)
+            if background:
+                job.start()
+                return job.get_status()
+        return job.run()
+    
+    def get_retention_status(self) -> Dict:
+        """Get progress of the current or last retention job."""
+        if self.retention_job is None:
+            return {'state': 'idle'}
+        return self.retention_job.get_status()
     
     def cleanup_old_data(self, days: int = 90):
         """
-        Clean up old conversation data.
+        Clean up old conversation data in batches, waiting until it is done.
         
         Args:
             days: Keep data from last N days
         """
-        with self.lock:
-            try:
-                conn = sqlite3.connect(self.db_path)
+        job = self._create_retention_job({
+            'conversations': {'days': days},
+            'tickets': {'days': None},
+            'analytics': {'days': None}
+        })
+        status = job.run()
+        if status['state'] != 'completed':
+            return 0
+        
+        deleted_count = status['deleted']['conversations']
+        print(f"🧹 Cleaned up {deleted_count} old conversation records")
+        return deleted_count
+    
+    def enable_archive(self, directory: str = "database/archive", after_days: int = 30,
+                       batch_size: int = 1000):
+        """
+        Archive aged conversations to compressed daily segments.
+        
+        Args:
+            directory: Directory for the segment files
+            after_days: Age in days after which conversations are archived
+            batch_size: Maximum rows archived per transaction
+        """
+        self.archive = ConversationArchive(directory)
+        self.archive_config = {'after_days': after_days, 'batch_size': max(int(batch_size), 1)}
+        with self.lock, self.connections.transaction() as conn:
+            self.archive.create_tables(conn.cursor())
+    
+    def archive_old_data(self, days: int = None) -> Dict:
+        """
+        Move conversations older than the threshold into the archive.
+        
+        Rows are archived oldest first in batches; each batch is written to
+        its segments and deleted from the database in one short transaction.
+        
+        Args:
+            days: Archive conversations older than N days (defaults to after_days)
+            
+        Returns:
+            Dictionary with archived row count and segments written
+        """
+        if self.archive is None:
+            raise RuntimeError("Archive is not enabled")
+        
+        days = self.archive_config['after_days'] if days is None else days
+        batch_size = self.archive_config['batch_size']
+        cutoff_ms = self._now_ms() - int(timedelta(days=days).total_seconds() * 1000)
+        archived = 0
+        segments = set()
+        
+        while True:
+            with self.lock, self.connections.transaction() as conn:
                 cursor = conn.cursor()
-                
-                cutoff_date = datetime.now() - timedelta(days=days)
-                
-                cursor.execute('''
-                    DELETE FROM conversations 
-                    WHERE timestamp < ?
-                ''', (cutoff_date.isoformat(),))
-                
-                deleted_count = cursor.rowcount
-                conn.commit()
-                conn.close()
-                
-                print(f"🧹 Cleaned up {deleted_count} old conversation records")
-                return deleted_count
-            except Exception as e:
-                print(f"Error cleaning up old data: {e}")
-                return 0
+                cursor.execute(f'''
+                    SELECT {', '.join(ARCHIVE_COLUMNS)} FROM conversations
+                    WHERE timestamp_ms < ?
+                    ORDER BY timestamp_ms, id
+                    LIMIT ?
+                ''', (cutoff_ms, batch_size))
+                rows = cursor.fetchall()
+                if rows:
+                    segments.update(self.archive.archive_rows(cursor, rows))
+                    cursor.executemany('DELETE FROM conversations WHERE id = ?', [(row[0],) for row in rows])
+            
+            archived += len(rows)
+            if len(rows) < batch_size:
+                break
+        
+        if archived and self.profile_cache is not None:
+            self.profile_cache.invalidate()
+        if archived:
+            print(f"📦 Archived {archived} conversation records into {len(segments)} segments")
+        return {'archived': archived, 'segments': sorted(segments)}
+    
+    def iter_archived_history(self, user_id: str, session_id: str = None,
+                              start_ms: int = None, end_ms: int = None):
+        """
+        Stream a user's archived conversation history in chronological order.
+        
+        Args:
+            user_id: User identifier
+            session_id: Optional session identifier
+            start_ms: Optional inclusive start as epoch milliseconds
+            end_ms: Optional exclusive end as epoch milliseconds
+            
+        Yields:
+            Archived messages
+        """
+        if self.archive is None:
+            return
+        cursor = self.connections.connection().cursor()
+        yield from self.archive.iter_history(cursor, user_id, session_id, start_ms, end_ms)
+    
+    def vacuum(self):
+        """Rebuild the database file with incremental auto-vacuum enabled."""
+        self.flush_counters()
+        with self.lock:
+            conn = self.connections.connection()
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
     
     def health_check(self) -> Dict:
         """Perform health check on database."""
         try:
-            with self.lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                # Check tables exist
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-                tables = [row[0] for row in cursor.fetchall()]
-                
-                # Check record counts
-                stats = {}
-                for table in ['conversations', 'users', 'tickets']:
-                    if table in tables:
-                        cursor.execute(f'SELECT COUNT(*) FROM {table}')
-                        stats[f'{table}_count'] = cursor.fetchone()[0]
-                    else:
-                        stats[f'{table}_count'] = 0
-                
-                conn.close()
-                
-                return {
-                    'status': 'healthy',
-                    'database_path': self.db_path,
-                    'tables': tables,
-                    'statistics': stats
-                }
+            cursor = self.connections.connection().cursor()
+            
+            # Check tables exist
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            tables = [row[0] for row in cursor.fetchall()]
+            
+            # Check record counts
+            stats = {}
+            for table in ['conversations', 'users', 'tickets']:
+                if table in tables:
+                    cursor.execute(f'SELECT COUNT(*) FROM {table}')
+                    stats[f'{table}_count'] = cursor.fetchone()[0]
+                else:
+                    stats[f'{table}_count'] = 0
+            
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+            
+            return {
+                'status': 'healthy',
+                'database_path': self.db_path,
+                'journal_mode': journal_mode,
+                'schema_version': self.migrator.current_version(),
+                'auto_vacuum': cursor.execute('PRAGMA auto_vacuum').fetchone()[0],
+                'tables': tables,
+                'statistics': stats,
+                'connections': self.connections.get_stats(),
+                'write_behind': self.write_queue.get_stats() if self.write_queue is not None else {'enabled': False},
+                'counter_buffer': self.counter_buffer.get_stats() if self.counter_buffer is not None else {'enabled': False},
+                'profile_cache': self.profile_cache.get_stats() if self.profile_cache is not None else {'enabled': False},
+                'search': {'enabled': self.search_enabled},
+                'column_codecs': self.codecs.get_names(),
+                'slow_query_log': (self.connections.query_log.get_stats()
+                                   if self.connections.query_log is not None else {'enabled': False}),
+                'retention': self.get_retention_status(),
+                'archive': self.archive.get_stats(cursor) if self.archive is not None else {'enabled': False}
+            }
         except Exception as e:
             return {
                 'status': 'error',
                 'error': str(e),
                 'database_path': self.db_path
-            } 
\ No newline at end of file
+            }
+    
+    def close(self):
+        """Stop retention, flush queued writes and close all database connections."""
+        if self.retention_job is not None:
+            self.retention_job.cancel()
+            self.retention_job.wait()
+        if self.write_queue is not None:
+            self.write_queue.close()
+        if self.counter_buffer is not None:
+            self.counter_buffer.close()
+        self.connections.close_all()
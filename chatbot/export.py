@@ -0,0 +1,130 @@
+"""
+Export Module
+
+Encodes streams of conversation rows as JSON Lines, CSV or Parquet. Each
+encoder consumes row chunks one at a time and yields the encoded bytes
+for that chunk, so memory use depends on the chunk size, not the number
+of rows exported.
+"""
+
+import csv
+import io
+import json
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from .archive import ARCHIVE_COLUMNS
+
+# Exported conversation columns, in SELECT order
+EXPORT_COLUMNS = ARCHIVE_COLUMNS
+
+
+def _with_json_text(rows: List[tuple]) -> List[tuple]:
+    """Turn the trailing entities and sentiment values of each row into JSON text."""
+    return [
+        row[:-2] + tuple(json.dumps(value) if value else None for value in row[-2:])
+        for row in rows
+    ]
+
+
+def iter_jsonl(chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Encode row chunks as JSON Lines, with entities and sentiment as objects."""
+    for rows in chunks:
+        lines = [json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) for row in rows]
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def iter_csv(chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Encode row chunks as CSV with a header row; entities and sentiment are JSON text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows(_with_json_text(rows))
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+class _StreamSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to a generator."""
+    
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_parquet(chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """
+    Encode row chunks as a Parquet file, one row group per chunk.
+    
+    Chunks are converted with pandas and written with pyarrow, which
+    pandas also needs for Parquet. Entities and sentiment are JSON text. The
+    dependencies are checked on call, before any output is produced.
+    """
+    try:
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pandas and pyarrow (pip install pyarrow)")
+    
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('user_id', pa.string()),
+        ('session_id', pa.string()),
+        ('message', pa.string()),
+        ('sender', pa.string()),
+        ('timestamp', pa.string()),
+        ('timestamp_ms', pa.int64()),
+        ('intent', pa.string()),
+        ('confidence', pa.float64()),
+        ('entities', pa.string()),
+        ('sentiment', pa.string())
+    ])
+    
+    def generate():
+        sink = _StreamSink()
+        writer = pq.ParquetWriter(sink, schema, compression='snappy')
+        try:
+            for rows in chunks:
+                frame = pd.DataFrame.from_records(_with_json_text(rows), columns=EXPORT_COLUMNS)
+                writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+    
+    return generate()
+
+
+# format: (encoder, content type, file extension)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    'jsonl': (iter_jsonl, 'application/x-ndjson', 'jsonl'),
+    'csv': (iter_csv, 'text/csv; charset=utf-8', 'csv'),
+    'parquet': (iter_parquet, 'application/vnd.apache.parquet', 'parquet')
+}
+
+
+def get_encoder(fmt: str) -> Callable[[Iterable[List[tuple]]], Iterator[bytes]]:
+    """Get the encoder for an export format."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', use one of: {', '.join(EXPORT_FORMATS)}")
+    return EXPORT_FORMATS[fmt][0]
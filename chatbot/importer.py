@@ -0,0 +1,428 @@
+"""
+Bulk Import Module
+
+Loads historical conversation transcripts from JSON Lines or CSV. Records
+are read as a stream, optionally classified with the NLP processor one
+batch at a time, and inserted with ``executemany`` in large transactions.
+While a load runs the conversations table's secondary indexes and
+full-text triggers are dropped, and they are rebuilt once at the end;
+user counters are recounted for the imported users afterwards.
+"""
+
+import csv
+import json
+import math
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+# Table whose secondary indexes and triggers are dropped during a load
+DEFERRED_TABLE = 'conversations'
+
+# Rows skipped for validation errors are counted; only the first few messages are kept
+MAX_REPORTED_ERRORS = 20
+
+# Epoch milliseconds of the first and last instant a datetime can hold (years 1 to 9999)
+MIN_TIMESTAMP_MS = -62135596800000
+MAX_TIMESTAMP_MS = 253402300799999
+
+
+def read_jsonl(stream: TextIO) -> Iterator[Dict]:
+    """Read one record per non-blank line of a JSON Lines stream."""
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number} is not valid JSON: {e}")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number} is not a JSON object")
+        yield record
+
+
+def read_csv(stream: TextIO) -> Iterator[Dict]:
+    """Read records from a CSV stream with a header row."""
+    yield from csv.DictReader(stream)
+
+
+IMPORT_FORMATS: Dict[str, Callable[[TextIO], Iterator[Dict]]] = {
+    'jsonl': read_jsonl,
+    'csv': read_csv
+}
+
+
+def read_records(stream: TextIO, fmt: str = 'jsonl') -> Iterator[Dict]:
+    """
+    Stream records from a text file in an import format.
+    
+    Args:
+        stream: Text stream; open CSV files with ``newline=''``
+        fmt: 'jsonl' or 'csv'
+        
+    Returns:
+        Iterator of raw record dictionaries
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format '{fmt}', use one of: {', '.join(IMPORT_FORMATS)}")
+    return IMPORT_FORMATS[fmt](stream)
+
+
+def parse_timestamp_ms(value) -> int:
+    """
+    Convert a transcript timestamp to epoch milliseconds.
+    
+    Accepts epoch milliseconds (or seconds, for values before 1973 in
+    milliseconds), ISO 8601 text and SQLite's ``YYYY-MM-DD HH:MM:SS``.
+    Text without a UTC offset is read as UTC, like the stored timestamps.
+    Infinite, NaN and out-of-range values raise ValueError, so a bad
+    record is skipped instead of failing the import.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            value = float(value)
+        except ValueError:
+            parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return _checked_timestamp_ms(int(parsed.timestamp() * 1000), value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Unsupported timestamp {value!r}")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"Timestamp {value!r} is not a finite number")
+    return _checked_timestamp_ms(int(value if abs(value) >= 1e11 else value * 1000), value)
+
+
+def _checked_timestamp_ms(timestamp_ms: int, value) -> int:
+    """Reject epoch milliseconds that cannot be stored as a datetime."""
+    if not MIN_TIMESTAMP_MS <= timestamp_ms <= MAX_TIMESTAMP_MS:
+        raise ValueError(f"Timestamp {value!r} is out of range")
+    return timestamp_ms
+
+
+def _finite_float(value, name: str) -> float:
+    """Read a number, rejecting infinity and NaN."""
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{name} {value!r} is not a finite number")
+    return number
+
+
+def _structured_value(value):
+    """Read an entities or sentiment value given as an object or JSON text."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value or None
+
+
+def parse_record(raw: Dict) -> tuple:
+    """
+    Validate a raw record and convert it to a conversation row.
+    
+    ``user_id`` and ``message`` are required and so is ``timestamp_ms`` or
+    ``timestamp``; ``session_id`` defaults to 'import' and ``sender`` to
+    'user'. An ``id`` column, as written by exports, is ignored.
+    
+    Args:
+        raw: Record read from a transcript file
+        
+    Returns:
+        Tuple of (user_id, session_id, message, sender, timestamp_ms,
+        intent, confidence, entities, sentiment), with entities and
+        sentiment as objects
+    """
+    user_id = raw.get('user_id')
+    message = raw.get('message')
+    if not user_id or not isinstance(user_id, str):
+        raise ValueError("missing user_id")
+    if not message or not isinstance(message, str):
+        raise ValueError("missing message")
+    
+    sender = raw.get('sender') or 'user'
+    if sender not in ('user', 'bot'):
+        raise ValueError(f"unknown sender {sender!r}")
+    
+    timestamp = raw.get('timestamp_ms')
+    if timestamp is None or timestamp == '':
+        timestamp = raw.get('timestamp')
+    if timestamp is None or timestamp == '':
+        raise ValueError("missing timestamp")
+    
+    confidence = raw.get('confidence')
+    return (
+        user_id,
+        raw.get('session_id') or 'import',
+        message,
+        sender,
+        parse_timestamp_ms(timestamp),
+        raw.get('intent') or None,
+        None if confidence is None or confidence == '' else _finite_float(confidence, 'confidence'),
+        _structured_value(raw.get('entities')),
+        _structured_value(raw.get('sentiment'))
+    )
+
+
+def defer_schema(cursor, table: str = DEFERRED_TABLE) -> List[str]:
+    """
+    Drop a table's secondary indexes and triggers, saving their SQL.
+    
+    The SQL is saved in ``deferred_schema`` in the same transaction, so
+    ``restore_deferred_schema`` can recreate them even after a crash.
+    
+    Args:
+        cursor: Cursor inside a transaction
+        table: Table being loaded
+        
+    Returns:
+        Names of the dropped indexes and triggers
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS deferred_schema (
+            name TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            sql TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        SELECT name, type, sql FROM sqlite_master
+        WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    ''', (table,))
+    objects = cursor.fetchall()
+    cursor.executemany('INSERT OR REPLACE INTO deferred_schema (name, type, sql) VALUES (?, ?, ?)', objects)
+    for name, kind, _ in objects:
+        cursor.execute(f'DROP {kind.upper()} IF EXISTS {name}')
+    return [name for name, _, _ in objects]
+
+
+def restore_deferred_schema(cursor) -> List[tuple]:
+    """
+    Recreate indexes and triggers dropped by ``defer_schema``.
+    
+    Args:
+        cursor: Cursor inside a transaction
+        
+    Returns:
+        (name, type) of every restored object
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'deferred_schema'")
+    if cursor.fetchone() is None:
+        return []
+    cursor.execute('''
+        SELECT name, type, sql FROM deferred_schema
+        WHERE name NOT IN (SELECT name FROM sqlite_master)
+    ''')
+    objects = cursor.fetchall()
+    for _, _, sql in objects:
+        cursor.execute(sql)
+    cursor.execute('DELETE FROM deferred_schema')
+    return [(name, kind) for name, kind, _ in objects]
+
+
+class BulkImport:
+    """
+    One bulk load of conversation records into a DatabaseManager.
+    
+    Records are buffered up to ``batch_size``; each full batch is
+    classified (when an NLP processor is given) and written in its own
+    transaction together with its statistics rollups. ``finish()``
+    restores the deferred indexes, rebuilds the full-text index and
+    recounts the imported users. Use it as a context manager, or through
+    ``DatabaseManager.bulk_import``.
+    """
+    
+    def __init__(self, db, nlp=None, batch_size: int = 10000, defer_indexes: bool = True,
+                 progress: Optional[Callable[[Dict], None]] = None):
+        """
+        Initialize the import.
+        
+        Args:
+            db: DatabaseManager to load into
+            nlp: Optional NLPProcessor that fills intent, confidence,
+                entities and sentiment of user messages that have no intent
+            batch_size: Records written per transaction
+            defer_indexes: Drop secondary indexes and full-text triggers
+                during the load and rebuild them at the end
+            progress: Optional callback receiving the stats after each batch
+        """
+        self.db = db
+        self.nlp = nlp
+        self.batch_size = max(int(batch_size), 1)
+        self.defer_indexes = defer_indexes
+        self.progress = progress
+        
+        self._pending: List[tuple] = []
+        self._users: Dict[str, list] = {}
+        self._started = None
+        self._finished = False
+        self.stats = {
+            'imported': 0,
+            'skipped': 0,
+            'analyzed': 0,
+            'batches': 0,
+            'users': 0,
+            'errors': [],
+            'seconds': 0.0
+        }
+    
+    def __enter__(self) -> 'BulkImport':
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(write_pending=exc_type is None)
+    
+    def start(self) -> 'BulkImport':
+        """Flush buffered writes and defer the conversation indexes."""
+        self._started = time.time()
+        self.db.flush_counters()
+        if self.defer_indexes:
+            with self.db.lock, self.db.connections.transaction() as conn:
+                defer_schema(conn.cursor())
+        return self
+    
+    def add(self, raw: Dict):
+        """Queue one raw record, writing a batch when the buffer is full."""
+        try:
+            record = parse_record(raw)
+        except (ValueError, TypeError) as e:
+            self.stats['skipped'] += 1
+            if len(self.stats['errors']) < MAX_REPORTED_ERRORS:
+                position = self.stats['imported'] + len(self._pending) + self.stats['skipped']
+                self.stats['errors'].append(f"Record {position}: {e}")
+            return
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size:
+            self._write_batch()
+    
+    def add_all(self, records: Iterable[Dict]) -> 'BulkImport':
+        """Queue every record of an iterable."""
+        for raw in records:
+            self.add(raw)
+        return self
+    
+    def _analyze(self, records: List[tuple]) -> List[tuple]:
+        """Fill NLP columns of user messages that arrived without an intent."""
+        indexes = [i for i, record in enumerate(records) if record[3] == 'user' and record[5] is None]
+        if not indexes:
+            return records
+        results = self.nlp.process_batch([records[i][2] for i in indexes])
+        for i, result in zip(indexes, results):
+            record = records[i]
+            records[i] = record[:5] + (
+                result['intent'],
+                result['confidence'] if record[6] is None else record[6],
+                record[7] or result['entities'] or None,
+                record[8] or result['sentiment'] or None
+            )
+        self.stats['analyzed'] += len(indexes)
+        return records
+    
+    def _write_batch(self):
+        """Insert the buffered records and their rollups in one transaction."""
+        records, self._pending = self._pending, []
+        if not records:
+            return
+        if self.nlp is not None:
+            records = self._analyze(records)
+        
+        format_timestamp = self.db._format_timestamp
+        encode = self.db.codecs.encode
+        with self.db.lock, self.db.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO conversations (user_id, session_id, message, sender, timestamp, timestamp_ms,
+                                           intent, confidence, entities, sentiment)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                record[:4] + (format_timestamp(record[4]),) + record[4:7]
+                + (encode('entities', record[7]), encode('sentiment', record[8]))
+                for record in records
+            ])
+            self.db.rollups.record_messages(
+                cursor, [(record[4], record[0], record[1], record[3], record[6]) for record in records]
+            )
+        
+        for record in records:
+            counts = self._users.get(record[0])
+            if counts is None:
+                self._users[record[0]] = [1, record[4], record[4]]
+            else:
+                counts[0] += 1
+                counts[1] = min(counts[1], record[4])
+                counts[2] = max(counts[2], record[4])
+        self.stats['imported'] += len(records)
+        self.stats['batches'] += 1
+        self.stats['users'] = len(self._users)
+        if self.progress is not None:
+            self.progress(self.get_stats())
+    
+    def finish(self, write_pending: bool = True) -> Dict:
+        """
+        Write the last batch, restore the indexes and recount the users.
+        
+        Args:
+            write_pending: Write records still buffered; False discards them
+            
+        Returns:
+            Import statistics
+        """
+        if self._finished:
+            return self.get_stats()
+        self._finished = True
+        try:
+            if write_pending:
+                self._write_batch()
+        finally:
+            self._pending = []
+            if self.defer_indexes:
+                print("🔧 Rebuilding conversation indexes...")
+                with self.db.lock, self.db.connections.transaction() as conn:
+                    cursor = conn.cursor()
+                    restored = restore_deferred_schema(cursor)
+                    if self.db.search_enabled and any(kind == 'trigger' for _, kind in restored):
+                        self.db.search.rebuild(cursor, [DEFERRED_TABLE])
+            self._update_user_counters()
+            if self._started is not None:
+                self.stats['seconds'] = round(time.time() - self._started, 3)
+        return self.get_stats()
+    
+    def _update_user_counters(self):
+        """Add the imported messages and first/last seen to the imported users."""
+        if not self._users:
+            return
+        format_timestamp = self.db._format_timestamp
+        with self.db.lock, self.db.connections.transaction() as conn:
+            # Counters also cover purged and archived messages, so add to them rather than recount
+            conn.executemany('''
+                INSERT INTO users (user_id, first_seen, last_seen, total_messages)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    first_seen = MIN(first_seen, excluded.first_seen),
+                    last_seen = MAX(last_seen, excluded.last_seen),
+                    total_messages = total_messages + excluded.total_messages
+            ''', [
+                (user_id, format_timestamp(first_ms), format_timestamp(last_ms), count)
+                for user_id, (count, first_ms, last_ms) in self._users.items()
+            ])
+        if self.db.profile_cache is not None:
+            self.db.profile_cache.invalidate()
+    
+    def get_stats(self) -> Dict:
+        """Get a copy of the import statistics."""
+        stats = dict(self.stats)
+        stats['errors'] = list(stats['errors'])
+        return stats
+
+
+def merge_stats(results: List[Dict]) -> Dict:
+    """Combine the statistics of several imports, such as one per shard."""
+    merged = {'imported': 0, 'skipped': 0, 'analyzed': 0, 'batches': 0, 'users': 0, 'errors': [], 'seconds': 0.0}
+    for stats in results:
+        for key in ('imported', 'skipped', 'analyzed', 'batches', 'users'):
+            merged[key] += stats[key]
+        merged['errors'].extend(stats['errors'])
+        merged['seconds'] = max(merged['seconds'], stats['seconds'])
+    merged['errors'] = merged['errors'][:MAX_REPORTED_ERRORS]
+    return merged
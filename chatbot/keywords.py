@@ -0,0 +1,300 @@
+"""
+Keyword Rules Module
+
+Compiles the rule-based keyword lists used for intent fast paths, urgency
+detection and escalation checks into a single Aho-Corasick automaton so a
+message is scanned once for every rule category.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+DEFAULT_KEYWORD_RULES = {
+    "exact": {
+        "greeting": [
+            "hello", "hi", "hey", "how are you", "how are u", "how r u",
+            "how's it going", "whats up", "what's up", "how do you do",
+            "greetings", "sup", "yo", "good morning", "good afternoon", "good evening"
+        ],
+        "goodbye": ["bye", "goodbye", "see you", "take care", "farewell"],
+        "thanks": ["thank you", "thanks", "thank", "appreciate it", "grateful"]
+    },
+    "prefix": {
+        "greeting": ["hello", "hi", "hey", "how", "whats", "what's", "sup", "yo"]
+    },
+    "keywords": {
+        "intent:business_hours": ["business hours", "hours", "when are you open", "what time", "operating hours"],
+        "intent:password_reset": ["password reset", "forgot password", "reset password", "change password"],
+        "intent:contact_support": ["contact support", "how to contact", "support phone", "support email"],
+        "fallback:greeting": [
+            "hello", "hi", "hey", "good morning", "good afternoon", "good evening",
+            "how are you", "how are u", "how r u", "how's it going", "whats up", "what's up",
+            "how do you do", "greetings", "sup", "yo"
+        ],
+        "fallback:goodbye": ["bye", "goodbye", "see you", "take care"],
+        "fallback:help": ["help", "support", "assistance"],
+        "fallback:thanks": ["thank", "thanks", "appreciate"],
+        "fallback:support_ticket": ["ticket", "issue", "problem", "bug", "complaint"],
+        "fallback:product_info": ["product", "feature", "specification"],
+        "fallback:pricing": ["price", "cost", "how much", "pricing"],
+        "urgency": ["urgent", "emergency", "asap", "immediately", "critical", "broken", "down"],
+        "escalation:urgent": ["urgent", "emergency", "critical", "broken", "down", "not working"],
+        "human:technical": ["api", "integration", "configuration", "setup", "installation"],
+        "human:request": ["human", "person", "agent", "representative", "real person"],
+        "unrelated:greeting": ["hello", "hi", "hey", "how are you", "how r u", "how's it going", "whats up"],
+        "unrelated:goodbye": ["bye", "goodbye", "see you", "take care", "farewell"],
+        "unrelated:thanks": ["thank", "thanks", "appreciate", "grateful"]
+    }
+}
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton mapping keyword phrases to rule categories.
+    
+    Matching has the same semantics as ``phrase in text`` for every phrase,
+    but all phrases are found in a single pass over the text. There are no
+    word boundaries: ``hi`` matches inside ``this``, as the substring
+    checks it replaced did.
+    """
+    
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        """
+        Build the automaton.
+        
+        Args:
+            categories: Mapping of category name to keyword phrases
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        outputs: List[set] = [set()]
+        
+        # Build the keyword trie
+        for category, phrases in categories.items():
+            for phrase in phrases:
+                phrase = phrase.lower()
+                if not phrase:
+                    continue
+                state = 0
+                for char in phrase:
+                    next_state = self._goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][char] = next_state
+                        self._goto.append({})
+                        self._fail.append(0)
+                        outputs.append(set())
+                    state = next_state
+                outputs[state].add(category)
+        
+        # Breadth-first pass to compute failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                outputs[next_state] |= outputs[self._fail[next_state]]
+        
+        self._outputs: List[FrozenSet[str]] = [frozenset(output) for output in outputs]
+    
+    @property
+    def state_count(self) -> int:
+        """Number of automaton states."""
+        return len(self._goto)
+    
+    def match(self, text: str) -> FrozenSet[str]:
+        """
+        Find every category with at least one phrase occurring in the text.
+        
+        Args:
+            text: Lowercased input text
+            
+        Returns:
+            Set of matched category names
+        """
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        
+        state = 0
+        matched = set()
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                matched |= outputs[state]
+        
+        return frozenset(matched)
+
+
+class KeywordRules:
+    """
+    Rule tables loaded from data and compiled once for fast matching.
+    
+    A single call to ``match`` returns every matched rule category: keyword
+    categories from the automaton plus ``exact:<name>`` and ``prefix:<name>``
+    categories for whole-message and leading-phrase rules. The compiled
+    tables are rebuilt when the rules file changes on disk.
+    """
+    
+    def __init__(self, rules_file: str = "data/keyword_rules.json",
+                 check_interval: float = 5.0, tables: Optional[Dict] = None):
+        """
+        Load and compile keyword rules.
+        
+        Args:
+            rules_file: Path to keyword rules file
+            check_interval: Seconds between checks of the rules file for changes
+            tables: Rules and compiled tables from export_tables to use
+                instead of loading and compiling the rules file
+        """
+        self.rules_file = rules_file
+        self.check_interval = check_interval
+        self._reload_lock = threading.Lock()
+        self._reload_listeners = []
+        self._last_check = time.monotonic()
+        self._mtime = self._get_mtime()
+        if tables is not None:
+            self.rules = tables['rules']
+            self._compiled = tables['compiled']
+        else:
+            self.rules = self._load_rules(rules_file)
+            self._compiled = self._compile(self.rules)
+    
+    def _get_mtime(self) -> Optional[float]:
+        """Get the modification time of the rules file, if it exists."""
+        try:
+            return os.path.getmtime(self.rules_file)
+        except OSError:
+            return None
+    
+    def _load_rules(self, rules_file: str) -> Dict:
+        """Load keyword rules from JSON file."""
+        try:
+            with open(rules_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return DEFAULT_KEYWORD_RULES
+    
+    def _compile(self, rules: Dict) -> Tuple[KeywordAutomaton, Dict[str, FrozenSet[str]], List[Tuple[Tuple[str, ...], str]]]:
+        """Compile rule tables into an automaton and lookup structures."""
+        automaton = KeywordAutomaton(rules.get('keywords', {}))
+        
+        exact = {}
+        for name, phrases in rules.get('exact', {}).items():
+            for phrase in phrases:
+                key = phrase.lower()
+                exact[key] = exact.get(key, frozenset()) | {f'exact:{name}'}
+        
+        prefixes = [
+            (tuple(phrase.lower() for phrase in phrases), f'prefix:{name}')
+            for name, phrases in rules.get('prefix', {}).items()
+        ]
+        
+        return automaton, exact, prefixes
+    
+    def export_tables(self) -> Dict:
+        """
+        Get the loaded rules and compiled tables for a model snapshot.
+        
+        Returns:
+            Dictionary accepted by the ``tables`` constructor argument
+        """
+        return {'rules': self.rules, 'compiled': self._compiled}
+    
+    def reload(self):
+        """Reload and recompile rules from the rules file."""
+        with self._reload_lock:
+            self._mtime = self._get_mtime()
+            self.rules = self._load_rules(self.rules_file)
+            self._compiled = self._compile(self.rules)
+            self._last_check = time.monotonic()
+        
+        for listener in list(self._reload_listeners):
+            listener()
+    
+    def add_reload_listener(self, callback):
+        """
+        Register a callable to run after the rules are reloaded.
+        
+        Args:
+            callback: Function called without arguments
+        """
+        self._reload_listeners.append(callback)
+    
+    def reload_if_changed(self) -> bool:
+        """
+        Rebuild the compiled rules if the rules file was modified.
+        
+        Returns:
+            True if the rules were reloaded
+        """
+        self._last_check = time.monotonic()
+        if self._get_mtime() == self._mtime:
+            return False
+        
+        self.reload()
+        return True
+    
+    def match(self, text: str) -> FrozenSet[str]:
+        """
+        Match text against every rule category in one pass.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Set of matched category names
+        """
+        if self.check_interval is not None and time.monotonic() - self._last_check > self.check_interval:
+            self.reload_if_changed()
+        
+        automaton, exact, prefixes = self._compiled
+        text_lower = text.lower()
+        stripped = text_lower.strip()
+        
+        matched = automaton.match(text_lower)
+        
+        extra = exact.get(stripped)
+        if extra:
+            matched = matched | extra
+        
+        for phrases, category in prefixes:
+            if stripped.startswith(phrases):
+                matched = matched | {category}
+        
+        return matched
+    
+    def categories(self, prefix: str) -> List[str]:
+        """
+        Get rule category names with the given prefix, in rules file order.
+        
+        Args:
+            prefix: Category prefix such as 'intent:' or 'fallback:'
+            
+        Returns:
+            List of category names
+        """
+        return [name for name in self.rules.get('keywords', {}) if name.startswith(prefix)]
+    
+    def health_check(self) -> Dict:
+        """Get rule table statistics."""
+        automaton, exact, prefixes = self._compiled
+        return {
+            'rules_file': self.rules_file,
+            'keyword_categories': len(self.rules.get('keywords', {})),
+            'automaton_states': automaton.state_count,
+            'exact_phrases': len(exact),
+            'prefix_rules': len(prefixes)
+        }
@@ -0,0 +1,213 @@
+"""
+Schema Migrations Module
+
+Versioned schema migrations for the chatbot database. The schema version is
+kept in SQLite's ``user_version`` pragma. Column backfills run in short
+rowid-range transactions so a live database stays usable while it is being
+migrated, and an interrupted migration resumes where it stopped.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .codecs import ColumnCodecs
+
+# SQL expression converting a SQLite date/time text column to epoch milliseconds
+EPOCH_MS_SQL = "CAST(ROUND((julianday({column}) - 2440587.5) * 86400000) AS INTEGER)"
+
+MIGRATIONS = [
+    {
+        'version': 1,
+        'description': "Integer epoch-millisecond timestamps",
+        # (table, new column, source text column)
+        'columns': [
+            ('conversations', 'timestamp_ms', 'timestamp'),
+            ('tickets', 'created_at_ms', 'created_at'),
+            ('tickets', 'updated_at_ms', 'updated_at'),
+            ('analytics', 'date_ms', 'date'),
+            ('analytics', 'created_at_ms', 'created_at')
+        ],
+        'indexes': [
+            'CREATE INDEX IF NOT EXISTS idx_conversations_timestamp_ms ON conversations(timestamp_ms)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_created_at_ms ON tickets(created_at_ms)',
+            'CREATE INDEX IF NOT EXISTS idx_analytics_date_ms ON analytics(date_ms)'
+        ],
+        # Text timestamp indexes no query uses any more
+        'drop_indexes': ['idx_conversations_timestamp']
+    },
+    {
+        'version': 2,
+        'description': "Composite indexes for keyset-paginated history",
+        'columns': [],
+        'indexes': [
+            'CREATE INDEX IF NOT EXISTS idx_conversations_user_session_time '
+            'ON conversations(user_id, session_id, timestamp_ms, id)',
+            'CREATE INDEX IF NOT EXISTS idx_conversations_user_time '
+            'ON conversations(user_id, timestamp_ms, id)'
+        ],
+        # Prefix of the composite indexes
+        'drop_indexes': ['idx_conversations_user_id']
+    },
+    {
+        'version': 3,
+        'description': "Index for ticket retention",
+        'columns': [],
+        'indexes': [
+            'CREATE INDEX IF NOT EXISTS idx_tickets_status_updated_at_ms ON tickets(status, updated_at_ms)'
+        ]
+    },
+    {
+        'version': 4,
+        'description': "Binary entities and sentiment encodings",
+        'columns': [],
+        'indexes': [],
+        # (table, columns) whose JSON text is rewritten with the column codecs
+        'recode': [('conversations', ['entities', 'sentiment'])]
+    },
+    {
+        'version': 5,
+        'description': "Composite indexes for newest-first ticket lists",
+        'columns': [],
+        'indexes': [
+            'CREATE INDEX IF NOT EXISTS idx_tickets_user_created_at_ms ON tickets(user_id, created_at_ms)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_status_created_at_ms ON tickets(status, created_at_ms)'
+        ],
+        # Prefixes of the composite indexes
+        'drop_indexes': ['idx_tickets_user_id', 'idx_tickets_status']
+    }
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1]['version']
+
+
+class SchemaMigrator:
+    """
+    Applies pending migrations to a database in small transactions.
+    
+    Each migration adds its columns, backfills them in rowid-range chunks,
+    creates its indexes and only then records its version, so rerunning an
+    interrupted migration is safe.
+    """
+    
+    def __init__(self, connections, lock: Optional[threading.Lock] = None,
+                 batch_size: int = 5000, codecs: Optional[ColumnCodecs] = None):
+        """
+        Initialize the migrator.
+        
+        Args:
+            connections: ConnectionManager of the database
+            lock: Writer lock held for each migration transaction
+            batch_size: Rows backfilled per transaction
+            codecs: Column codecs that recoding migrations write with
+        """
+        self.connections = connections
+        self.lock = lock or threading.Lock()
+        self.batch_size = max(int(batch_size), 1)
+        self.codecs = codecs or ColumnCodecs()
+    
+    def current_version(self) -> int:
+        """Get the schema version recorded in the database."""
+        return self.connections.connection().execute('PRAGMA user_version').fetchone()[0]
+    
+    def pending(self) -> List[Dict]:
+        """Get the migrations that have not been applied yet."""
+        version = self.current_version()
+        return [migration for migration in MIGRATIONS if migration['version'] > version]
+    
+    def migrate(self, progress: Optional[Callable[[Dict], None]] = None) -> int:
+        """
+        Apply every pending migration.
+        
+        Args:
+            progress: Optional callback receiving a dict with the migration
+                version, table, column and rows updated so far
+                
+        Returns:
+            Schema version after migrating
+        """
+        for migration in self.pending():
+            self._apply(migration, progress)
+        return self.current_version()
+    
+    def _apply(self, migration: Dict, progress: Optional[Callable[[Dict], None]]):
+        """Apply one migration."""
+        with self.lock, self.connections.transaction() as conn:
+            for table, column, _ in migration['columns']:
+                existing = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+                if column not in existing:
+                    conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} INTEGER')
+        
+        for table, column, source in migration['columns']:
+            for rows in self._backfill_column(table, column, source):
+                if progress is not None:
+                    progress({'version': migration['version'], 'table': table,
+                              'column': column, 'rows': rows})
+        
+        for table, columns in migration.get('recode', []):
+            for rows in self._recode_columns(table, columns):
+                if progress is not None:
+                    progress({'version': migration['version'], 'table': table,
+                              'column': ', '.join(columns), 'rows': rows})
+        
+        with self.lock, self.connections.transaction() as conn:
+            for statement in migration['indexes']:
+                conn.execute(statement)
+            for index in migration.get('drop_indexes', []):
+                conn.execute(f'DROP INDEX IF EXISTS {index}')
+            conn.execute(f"PRAGMA user_version = {int(migration['version'])}")
+    
+    def _backfill_column(self, table: str, column: str, source: str):
+        """
+        Fill a new column from its source column one rowid range at a time.
+        
+        Yields:
+            Total rows updated after each chunk
+        """
+        conn = self.connections.connection()
+        low, high = conn.execute(f'SELECT MIN(rowid), MAX(rowid) FROM {table}').fetchone()
+        if low is None:
+            return
+        
+        expression = EPOCH_MS_SQL.format(column=source)
+        total = 0
+        for start in range(low, high + 1, self.batch_size):
+            with self.lock, self.connections.transaction() as conn:
+                cursor = conn.execute(f'''
+                    UPDATE {table} SET {column} = {expression}
+                    WHERE rowid BETWEEN ? AND ? AND {column} IS NULL
+                ''', (start, start + self.batch_size - 1))
+                total += cursor.rowcount
+            yield total
+    
+    def _recode_columns(self, table: str, columns: List[str]):
+        """
+        Rewrite JSON text columns with the current codecs one rowid range at a time.
+        
+        Values already stored in a binary encoding are left alone, so an
+        interrupted recode resumes cheaply.
+        
+        Yields:
+            Total rows rewritten after each chunk
+        """
+        conn = self.connections.connection()
+        low, high = conn.execute(f'SELECT MIN(rowid), MAX(rowid) FROM {table}').fetchone()
+        if low is None:
+            return
+        
+        text_filter = ' OR '.join(f"typeof({column}) = 'text'" for column in columns)
+        assignments = ', '.join(f'{column} = ?' for column in columns)
+        total = 0
+        for start in range(low, high + 1, self.batch_size):
+            with self.lock, self.connections.transaction() as conn:
+                rows = conn.execute(f'''
+                    SELECT rowid, {', '.join(columns)} FROM {table}
+                    WHERE rowid BETWEEN ? AND ? AND ({text_filter})
+                ''', (start, start + self.batch_size - 1)).fetchall()
+                updates = []
+                for row in rows:
+                    values = tuple(self.codecs.recode(column, value) for column, value in zip(columns, row[1:]))
+                    if values != row[1:]:
+                        updates.append(values + (row[0],))
+                conn.executemany(f'UPDATE {table} SET {assignments} WHERE rowid = ?', updates)
+                total += len(updates)
+            yield total
@@ -6,42 +6,451 @@ and sentiment analysis for the chatbot.
 """
 
 import re
+import copy
 import json
-import nltk
-from typing import Dict, List, Tuple, Optional
-from collections import Counter
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Tuple, Optional
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
+import threading
+
+from .cache import TTLCache
+from .keywords import KeywordRules
+from .snapshot import compute_source_hash, load_snapshot, save_snapshot
+
+if TYPE_CHECKING:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
 # Download required NLTK data (uncomment if needed)
 # nltk.download('punkt')
 # nltk.download('stopwords')
 # nltk.download('wordnet')
 
-try:
-    from nltk.tokenize import word_tokenize, sent_tokenize
-    from nltk.corpus import stopwords
-    from nltk.stem import WordNetLemmatizer
-    from nltk.sentiment import SentimentIntensityAnalyzer
-except ImportError:
-    print("Warning: NLTK components not available. Using fallback methods.")
-    # Fallback tokenization
-    def word_tokenize(text):
-        return text.lower().split()
-    
-    def sent_tokenize(text):
-        return text.split('.')
-    
-    stopwords = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
-    
-    class WordNetLemmatizer:
-        def lemmatize(self, word):
-            return word
-    
-    class SentimentIntensityAnalyzer:
-        def polarity_scores(self, text):
-            return {'neg': 0.0, 'neu': 0.5, 'pos': 0.0, 'compound': 0.0}
+# NLTK, numpy and sklearn take most of the package import time, so they are
+# imported on first use rather than at module import.
+_nltk_components = None
+
+
+def _fallback_word_tokenize(text, language='english', preserve_line=False):
+    return text.lower().split()
+
+
+class _FallbackLemmatizer:
+    def lemmatize(self, word):
+        return word
+
+
+class _FallbackSentimentAnalyzer:
+    def polarity_scores(self, text):
+        return {'neg': 0.0, 'neu': 0.5, 'pos': 0.0, 'compound': 0.0}
+
+
+def _load_nltk() -> Dict:
+    """Import NLTK components on first use, with fallbacks if NLTK is missing."""
+    global _nltk_components
+    if _nltk_components is None:
+        try:
+            from nltk.tokenize import word_tokenize
+            from nltk.corpus import stopwords
+            from nltk.stem import WordNetLemmatizer
+            from nltk.sentiment import SentimentIntensityAnalyzer
+        except ImportError:
+            print("Warning: NLTK components not available. Using fallback methods.")
+            word_tokenize = _fallback_word_tokenize
+            stopwords = None
+            WordNetLemmatizer = _FallbackLemmatizer
+            SentimentIntensityAnalyzer = _FallbackSentimentAnalyzer
+        
+        _nltk_components = {
+            'word_tokenize': word_tokenize,
+            'stopwords': stopwords,
+            'WordNetLemmatizer': WordNetLemmatizer,
+            'SentimentIntensityAnalyzer': SentimentIntensityAnalyzer
+        }
+    return _nltk_components
+
+# Used when the NLTK stopwords corpus is missing
+FALLBACK_STOPWORDS = frozenset(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
+
+# Fast tokenizer: word runs and single punctuation marks
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# TF-IDF settings for intent pattern matching
+VECTORIZER_PARAMS = {
+    'max_features': 1000,
+    'stop_words': 'english',
+    'ngram_range': (1, 2)
+}
+
+# Greeting patterns that replace the ones from the intents file
+GREETING_PATTERNS = [
+    "hello", "hi", "hey", "good morning", "good afternoon",
+    "good evening", "how are you", "how are u", "how r u", "how's it going", "whats up", "what's up", "how do you do", "greetings", "sup", "yo"
+]
+
+# Words the NLTK Treebank tokenizer splits in two (MacIntyre contractions)
+SPLIT_WORDS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na')
+}
+
+
+class EntityExtractor:
+    """
+    Single-pass regex entity extractor.
+    
+    All entity patterns are compiled into one alternation with a named group
+    per entity type, so the text is scanned once, left to right. Alternatives
+    are ordered by priority: when several patterns match at the same
+    position the highest priority one wins, and matched text is consumed so
+    entities never overlap (a phone number is not also reported as three
+    numbers). Priority only decides between matches starting at the same
+    position; a match that starts earlier wins over a higher-priority one
+    starting inside it.
+    """
+    
+    def __init__(self, patterns: Dict[str, str], priority: Optional[List[str]] = None,
+                 flags: int = re.IGNORECASE):
+        """
+        Compile the combined entity pattern.
+        
+        Args:
+            patterns: Mapping of entity type to regex pattern
+            priority: Entity types from highest to lowest priority; types not
+                listed keep their pattern order after the listed ones
+            flags: Regex flags applied to the combined pattern
+        """
+        order = [name for name in (priority or []) if name in patterns]
+        order += [name for name in patterns if name not in order]
+        
+        self.entity_types = list(patterns)
+        self.priority = order
+        self.pattern = re.compile(
+            '|'.join(f'(?P<{name}>{patterns[name]})' for name in order),
+            flags
+        )
+    
+    def finditer(self, text: str):
+        """
+        Scan text once and yield non-overlapping entity matches.
+        
+        Yields:
+            Tuples of (entity_type, value, start, end)
+        """
+        for match in self.pattern.finditer(text):
+            entity_type = match.lastgroup
+            yield entity_type, match.group(entity_type), match.start(), match.end()
+    
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        """
+        Extract entities grouped by type.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Dictionary of entity types and their values, in pattern order
+        """
+        found = {}
+        for entity_type, value, _, _ in self.finditer(text):
+            found.setdefault(entity_type, []).append(value)
+        
+        return {entity_type: found[entity_type] for entity_type in self.entity_types if entity_type in found}
+
+
+class NLPResult(MutableMapping):
+    """
+    Lazily evaluated NLP analysis of a single message.
+    
+    Behaves like the analysis dictionary returned by earlier versions of
+    process_message, but each analysis stage runs on first access to one of
+    its fields. Stages that actually ran are listed in ``stages_run`` and
+    reported to the owning processor's stage statistics.
+    """
+    
+    # Field name -> analysis stage that produces it
+    FIELD_STAGES = {
+        'original_text': None,
+        'preprocessed_text': 'preprocess',
+        'tokens': 'tokens',
+        'intent': 'intent',
+        'confidence': 'intent',
+        'entities': 'entities',
+        'sentiment': 'sentiment',
+        'word_count': 'tokens',
+        'has_question': None,
+        'is_urgent': 'keywords',
+        'keyword_matches': 'keywords'
+    }
+    
+    # Analysis stage -> fields it produces
+    STAGE_FIELDS = {
+        'keywords': ('keyword_matches', 'is_urgent'),
+        'intent': ('intent', 'confidence'),
+        'preprocess': ('preprocessed_text',),
+        'tokens': ('tokens', 'word_count'),
+        'entities': ('entities',),
+        'sentiment': ('sentiment',)
+    }
+    
+    STAGES = ['keywords', 'intent', 'preprocess', 'tokens', 'entities', 'sentiment']
+    
+    def __init__(self, processor: 'NLPProcessor', message: str,
+                 cached_values: Optional[Dict] = None,
+                 cache: Optional['AnalysisCache'] = None, cache_key: Optional[str] = None):
+        """
+        Create a lazy result.
+        
+        Args:
+            processor: NLPProcessor used to compute stages
+            message: User's input message
+            cached_values: Previously computed field values to start from
+            cache: Analysis cache that receives newly computed stage values
+            cache_key: Normalized text the cache entry is stored under
+        """
+        self._processor = processor
+        self._cache = cache
+        self._cache_key = cache_key
+        self._values = {
+            'original_text': message,
+            'has_question': '?' in message
+        }
+        if cached_values:
+            self._values.update(cached_values)
+        self.stages_run = []
+        self._unrecorded = ['message']
+        self._flush_stats()
+    
+    def __getitem__(self, key):
+        if key not in self._values:
+            stage = self.FIELD_STAGES.get(key)
+            if stage is None:
+                raise KeyError(key)
+            self._run_stage(stage)
+        return self._values[key]
+    
+    def __setitem__(self, key, value):
+        self._values[key] = value
+    
+    def __delitem__(self, key):
+        del self._values[key]
+    
+    def __iter__(self):
+        yield from self.FIELD_STAGES
+        for key in self._values:
+            if key not in self.FIELD_STAGES:
+                yield key
+    
+    def __len__(self):
+        return len(self.FIELD_STAGES) + sum(1 for key in self._values if key not in self.FIELD_STAGES)
+    
+    def __contains__(self, key):
+        return key in self.FIELD_STAGES or key in self._values
+    
+    def __repr__(self):
+        return f"NLPResult({self._values!r}, stages_run={self.stages_run!r})"
+    
+    def __deepcopy__(self, memo):
+        clone = NLPResult.__new__(NLPResult)
+        clone._processor = self._processor
+        clone._cache = self._cache
+        clone._cache_key = self._cache_key
+        clone._values = copy.deepcopy(self._values, memo)
+        clone.stages_run = list(self.stages_run)
+        clone._unrecorded = []
+        return clone
+    
+    def has_stage(self, stage: str) -> bool:
+        """Check whether every field of a stage is available."""
+        return all(field in self._values for field in self.STAGE_FIELDS[stage])
+    
+    def run_stage(self, stage: str):
+        """Run an analysis stage now unless its fields are already available."""
+        if not self.has_stage(stage):
+            self._run_stage(stage)
+    
+    def set_stage_values(self, stage: str, values: Dict):
+        """Store precomputed values for a stage without running it again."""
+        self._values.update(values)
+        self.stages_run.append(stage)
+        
+        if self._cache is not None:
+            self._cache.update(self._cache_key, self._values['original_text'], values)
+        
+        self._unrecorded.append(stage)
+        self._flush_stats()
+    
+    def _flush_stats(self):
+        """Report stage runs once the intent they are grouped by is known."""
+        intent = self._values.get('intent')
+        if intent is None:
+            return
+        for stage in self._unrecorded:
+            self._processor._record_stage(intent, stage)
+        self._unrecorded = []
+    
+    def resolve(self) -> 'NLPResult':
+        """Run every stage that has not run yet."""
+        for key in self.FIELD_STAGES:
+            self[key]
+        return self
+    
+    def to_dict(self) -> Dict:
+        """Return a plain dictionary with every field computed."""
+        return dict(self.resolve().items())
+    
+    def _run_stage(self, stage: str):
+        """Compute the fields produced by an analysis stage."""
+        processor = self._processor
+        message = self._values['original_text']
+        
+        if stage == 'keywords':
+            matches = processor.match_keywords(message)
+            values = {
+                'keyword_matches': matches,
+                'is_urgent': processor._detect_urgency(message, matches)
+            }
+        elif stage == 'intent':
+            intent, confidence = processor._recognize_intents(
+                [message], matches=[self['keyword_matches']]
+            )[0]
+            values = {'intent': intent, 'confidence': confidence}
+        elif stage == 'preprocess':
+            values = {'preprocessed_text': processor.preprocess_text(message)}
+        elif stage == 'tokens':
+            tokens = processor.tokenize_and_lemmatize(self['preprocessed_text'])
+            values = {'tokens': tokens, 'word_count': len(tokens)}
+        elif stage == 'entities':
+            values = {'entities': processor.extract_entities(message)}
+        elif stage == 'sentiment':
+            values = {'sentiment': processor.analyze_sentiment(message)}
+        else:
+            raise ValueError(f"Unknown NLP stage: {stage}")
+        
+        self.set_stage_values(stage, values)
+
+
+class AnalysisCache:
+    """
+    Cache of NLP stage results keyed on preprocess_text output.
+    
+    Fields computed from the normalized text alone (preprocessed text and
+    tokens) are shared by every message that normalizes to the same key.
+    Fields that also depend on the raw message (keyword rules, intent,
+    entities, sentiment) are kept per original message under that key, so
+    "Hi" and "hi!" share tokenization but keep their own sentiment.
+    """
+    
+    SHARED_FIELDS = frozenset(['preprocessed_text', 'tokens', 'word_count'])
+    
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 300.0,
+                 max_variants: int = 8):
+        """
+        Initialize the analysis cache.
+        
+        Args:
+            max_size: Maximum number of normalized texts cached
+            ttl: Seconds a cache entry stays valid, or None for no expiry
+            max_variants: Maximum raw message variants kept per normalized text
+        """
+        self._entries = TTLCache(max_size, ttl)
+        self.max_variants = max(int(max_variants), 1)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._partial_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+    
+    def get(self, key: str, message: str) -> Dict:
+        """
+        Get cached field values for a message.
+        
+        Args:
+            key: Normalized text
+            message: Original message
+            
+        Returns:
+            Copy of the cached field values, empty if nothing is cached
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                self._misses += 1
+            return {}
+        
+        with self._lock:
+            values = dict(entry['shared'])
+            variant = entry['variants'].get(message)
+            if variant is not None:
+                entry['variants'].move_to_end(message)
+                values.update(variant)
+            if variant is not None and 'intent' in variant:
+                self._hits += 1
+            else:
+                self._partial_hits += 1
+            
+            return copy.deepcopy(values)
+    
+    def update(self, key: str, message: str, values: Dict):
+        """
+        Store newly computed field values for a message.
+        
+        Args:
+            key: Normalized text
+            message: Original message
+            values: Field values to merge into the entry
+        """
+        values = copy.deepcopy(values)
+        
+        with self._lock:
+            entry = self._entries.peek(key)
+            if entry is None:
+                entry = {'shared': {}, 'variants': OrderedDict()}
+                self._entries.set(key, entry)
+            
+            variant = entry['variants'].setdefault(message, {})
+            entry['variants'].move_to_end(message)
+            for field, value in values.items():
+                if field in self.SHARED_FIELDS:
+                    entry['shared'][field] = value
+                else:
+                    variant[field] = value
+            
+            while len(entry['variants']) > self.max_variants:
+                entry['variants'].popitem(last=False)
+    
+    def clear(self):
+        """Invalidate every cached analysis."""
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict:
+        """Get cache hit and miss counters."""
+        entry_stats = self._entries.get_stats()
+        with self._lock:
+            lookups = self._hits + self._partial_hits + self._misses
+            return {
+                'enabled': True,
+                'size': entry_stats['size'],
+                'max_size': entry_stats['max_size'],
+                'ttl_seconds': entry_stats['ttl_seconds'],
+                'hits': self._hits,
+                'partial_hits': self._partial_hits,
+                'misses': self._misses,
+                'evictions': entry_stats['evictions'],
+                'expirations': entry_stats['expirations'],
+                'invalidations': self._invalidations,
+                'hit_ratio': round(self._hits / lookups, 3) if lookups else 0.0
+            }
 
 
 class NLPProcessor:
@@ -50,30 +459,70 @@ class NLPProcessor:
     Handles text preprocessing, intent recognition, and entity extraction.
     """
     
-    def __init__(self, intents_file: str = "data/intents.json"):
+    def __init__(self, intents_file: str = "data/intents.json",
+                 keyword_rules_file: str = "data/keyword_rules.json",
+                 tokenizer: str = "nltk", lemma_cache_size: int = 10000,
+                 cache_size: int = 1024, cache_ttl: Optional[float] = 300.0,
+                 snapshot_file: Optional[str] = None):
         """
         Initialize the NLP processor.
         
         Args:
             intents_file: Path to intents configuration file
+            keyword_rules_file: Path to rule-based keyword lists
+            tokenizer: 'nltk' for the NLTK word tokenizer or 'regex' for the
+                fast regex tokenizer
+            lemma_cache_size: Maximum number of cached lemmatized tokens
+            cache_size: Maximum number of normalized texts in the analysis
+                cache, or 0 to disable it
+            cache_ttl: Seconds a cached analysis stays valid
+            snapshot_file: Path of a fitted model snapshot; loaded when it
+                matches the intents and keyword rules files, rebuilt otherwise
         """
-        self.intents = self._load_intents(intents_file)
-        # Ensure greeting patterns are comprehensive
-        if 'greeting' in self.intents:
-            self.intents['greeting']['patterns'] = [
-                "hello", "hi", "hey", "good morning", "good afternoon",
-                "good evening", "how are you", "how are u", "how r u", "how's it going", "whats up", "what's up", "how do you do", "greetings", "sup", "yo"
-            ]
-        self.lemmatizer = WordNetLemmatizer()
-        self.sentiment_analyzer = SentimentIntensityAnalyzer()
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            ngram_range=(1, 2)
-        )
+        if tokenizer not in ('nltk', 'regex'):
+            raise ValueError(f"Unknown tokenizer: {tokenizer}")
         
-        # Train the vectorizer with intent examples
-        self._train_vectorizer()
+        self.intents_file = intents_file
+        self.keyword_rules_file = keyword_rules_file
+        self.snapshot_file = snapshot_file
+        self.snapshot_status = 'disabled'
+        
+        # Precompiled pattern index (filled in by _train_vectorizer or a snapshot)
+        self._model_lock = threading.Lock()
+        self._vectorizer = None
+        self._vectorizer_state = None
+        self.pattern_matrix = None
+        self.pattern_intents = []
+        self.intent_names = []
+        self.intent_offsets = []
+        
+        model = load_snapshot(snapshot_file, self._snapshot_source_hash()) if snapshot_file else None
+        if model is not None:
+            self._apply_snapshot(model)
+            self.snapshot_status = 'loaded'
+        else:
+            self.intents = self._load_intents(intents_file)
+            self._ensure_greeting_patterns()
+            self.keyword_rules = KeywordRules(keyword_rules_file)
+            
+            # Train the vectorizer with intent examples
+            self.vectorizer = self._create_vectorizer()
+            self._train_vectorizer()
+            
+            if snapshot_file:
+                self.save_snapshot()
+        
+        # Cache of analyses keyed on normalized text
+        self.analysis_cache = AnalysisCache(cache_size, cache_ttl) if cache_size > 0 else None
+        if self.analysis_cache is not None:
+            self.keyword_rules.add_reload_listener(self.analysis_cache.clear)
+        
+        # Lemmatizer, stopwords and sentiment analyzer are loaded on first use
+        self.tokenizer = tokenizer
+        self._stage_counts = {}
+        self._stage_lock = threading.Lock()
+        self._lemmatizer_available = True
+        self._lemmatize = lru_cache(maxsize=lemma_cache_size)(self._lemmatize_token)
         
         # Common entities and patterns
         self.entity_patterns = {
@@ -87,6 +536,12 @@ class NLPProcessor:
             'percentage': r'\d+(?:\.\d+)?%'
         }
         
+        # Highest priority first; wins when patterns match at the same position
+        self.entity_priority = [
+            'url', 'email', 'phone', 'date', 'time', 'currency', 'percentage', 'number'
+        ]
+        self.entity_extractor = EntityExtractor(self.entity_patterns, self.entity_priority)
+        
         print("🧠 NLP Processor initialized successfully!")
     
     def _load_intents(self, intents_file: str) -> Dict:
@@ -148,6 +603,129 @@ class NLPProcessor:
                 }
             }
     
+    def _ensure_greeting_patterns(self):
+        """Ensure greeting patterns are comprehensive."""
+        if 'greeting' in self.intents:
+            self.intents['greeting']['patterns'] = list(GREETING_PATTERNS)
+    
+    @cached_property
+    def lemmatizer(self):
+        """WordNet lemmatizer, created on first use."""
+        return _load_nltk()['WordNetLemmatizer']()
+    
+    @cached_property
+    def sentiment_analyzer(self):
+        """VADER sentiment analyzer, created on first use."""
+        return _load_nltk()['SentimentIntensityAnalyzer']()
+    
+    @cached_property
+    def stop_words(self) -> FrozenSet[str]:
+        """Stopword set, built on first use."""
+        return self._load_stopwords()
+    
+    @property
+    def vectorizer(self) -> 'TfidfVectorizer':
+        """TF-IDF vectorizer, restored from snapshot state on first use."""
+        if self._vectorizer is None:
+            with self._model_lock:
+                if self._vectorizer is None:
+                    vectorizer = self._create_vectorizer()
+                    if self._vectorizer_state is not None:
+                        vectorizer.vocabulary_, vectorizer.idf_ = self._vectorizer_state
+                    self._vectorizer = vectorizer
+        return self._vectorizer
+    
+    @vectorizer.setter
+    def vectorizer(self, vectorizer: 'TfidfVectorizer'):
+        self._vectorizer = vectorizer
+        self._vectorizer_state = None
+    
+    def _create_vectorizer(self) -> 'TfidfVectorizer':
+        """Create an unfitted TF-IDF vectorizer."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        return TfidfVectorizer(**VECTORIZER_PARAMS)
+    
+    def _snapshot_source_hash(self) -> str:
+        """Hash the data files and build settings the model depends on."""
+        settings = json.dumps({
+            'vectorizer': VECTORIZER_PARAMS,
+            'greeting_patterns': GREETING_PATTERNS
+        }, sort_keys=True)
+        return compute_source_hash([self.intents_file, self.keyword_rules_file], settings)
+    
+    def save_snapshot(self, snapshot_file: Optional[str] = None) -> bool:
+        """
+        Write the fitted model to a snapshot file.
+        
+        Args:
+            snapshot_file: Destination path; defaults to the configured one
+            
+        Returns:
+            True if the snapshot was written
+        """
+        snapshot_file = snapshot_file or self.snapshot_file
+        if not snapshot_file:
+            return False
+        
+        fitted = hasattr(self.vectorizer, 'vocabulary_')
+        model = {
+            'intents': self.intents,
+            'vocabulary': self.vectorizer.vocabulary_ if fitted else None,
+            'idf': self.vectorizer.idf_ if fitted else None,
+            'pattern_matrix': self.pattern_matrix,
+            'pattern_intents': self.pattern_intents,
+            'intent_names': self.intent_names,
+            'intent_offsets': self.intent_offsets,
+            'keyword_rules': self.keyword_rules.export_tables()
+        }
+        
+        try:
+            save_snapshot(snapshot_file, self._snapshot_source_hash(), model)
+        except Exception as e:
+            print(f"Error saving model snapshot: {e}")
+            self.snapshot_status = 'error'
+            return False
+        
+        if snapshot_file == self.snapshot_file:
+            self.snapshot_status = 'built'
+        return True
+    
+    def _apply_snapshot(self, model: Dict):
+        """Restore the fitted model from snapshot state."""
+        self.intents = model['intents']
+        self.keyword_rules = KeywordRules(self.keyword_rules_file, tables=model['keyword_rules'])
+        
+        # Building the vectorizer imports sklearn, so defer it until scoring
+        self._vectorizer = None
+        if model['vocabulary'] is not None:
+            self._vectorizer_state = (model['vocabulary'], model['idf'])
+        
+        self.pattern_matrix = model['pattern_matrix']
+        self.pattern_intents = model['pattern_intents']
+        self.intent_names = model['intent_names']
+        self.intent_offsets = model['intent_offsets']
+    
+    def reload_intents(self, intents_file: Optional[str] = None):
+        """
+        Reload intents, retrain the vectorizer and invalidate cached analyses.
+        
+        Args:
+            intents_file: Optional new path to the intents configuration file
+        """
+        if intents_file:
+            self.intents_file = intents_file
+        
+        self.intents = self._load_intents(self.intents_file)
+        self._ensure_greeting_patterns()
+        self.vectorizer = self._create_vectorizer()
+        self._train_vectorizer()
+        
+        if self.snapshot_file:
+            self.save_snapshot()
+        
+        if self.analysis_cache is not None:
+            self.analysis_cache.clear()
+    
     def _train_vectorizer(self):
         """Train the TF-IDF vectorizer with intent patterns."""
         all_patterns = []
@@ -156,6 +734,55 @@ class NLPProcessor:
         
         if all_patterns:
             self.vectorizer.fit(all_patterns)
+            self._build_pattern_index()
+    
+    def _build_pattern_index(self):
+        """
+        Vectorize every intent pattern once into a single L2-normalized
+        sparse matrix so intent scoring is one sparse dot product.
+        
+        Rows are grouped by intent in ``self.intents`` order; ``intent_offsets``
+        holds the first row of each group for a grouped max with reduceat.
+        """
+        patterns = []
+        labels = []
+        intent_names = []
+        offsets = []
+        
+        for intent, data in self.intents.items():
+            intent_patterns = data.get('patterns', [])
+            if not intent_patterns:
+                continue
+            offsets.append(len(patterns))
+            labels.extend([len(intent_names)] * len(intent_patterns))
+            intent_names.append(intent)
+            patterns.extend(intent_patterns)
+        
+        import numpy as np
+        from sklearn.preprocessing import normalize
+        
+        self.pattern_matrix = normalize(self.vectorizer.transform(patterns), norm='l2', copy=False).tocsr()
+        self.pattern_intents = np.asarray(labels, dtype=np.intp)
+        self.intent_names = intent_names
+        self.intent_offsets = np.asarray(offsets, dtype=np.intp)
+    
+    def _score_intents(self, text_vector) -> 'np.ndarray':
+        """
+        Score vectorized text against every intent.
+        
+        Args:
+            text_vector: Sparse TF-IDF matrix of shape (n_texts, n_features)
+            
+        Returns:
+            Dense array of shape (n_texts, n_intents) with the best cosine
+            similarity per intent
+        """
+        import numpy as np
+        from sklearn.preprocessing import normalize
+        
+        text_vector = normalize(text_vector, norm='l2', copy=False)
+        similarities = (text_vector @ self.pattern_matrix.T).toarray()
+        return np.maximum.reduceat(similarities, self.intent_offsets, axis=1)
     
     def preprocess_text(self, text: str) -> str:
         """
@@ -178,6 +805,53 @@ class NLPProcessor:
         
         return text
     
+    def _load_stopwords(self) -> FrozenSet[str]:
+        """Build the stopword set once."""
+        try:
+            return frozenset(_load_nltk()['stopwords'].words('english'))
+        except (LookupError, AttributeError):
+            return FALLBACK_STOPWORDS
+    
+    def _lemmatize_token(self, token: str) -> str:
+        """Lemmatize a single token, leaving it unchanged if WordNet is unavailable."""
+        if self._lemmatizer_available:
+            try:
+                return self.lemmatizer.lemmatize(token)
+            except Exception:
+                self._lemmatizer_available = False
+        return token
+    
+    def tokenize(self, text: str) -> List[str]:
+        """
+        Split text into tokens with the configured tokenizer.
+        
+        The regex tokenizer produces the same tokens as the NLTK tokenizer for
+        text returned by preprocess_text.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            List of tokens
+        """
+        if self.tokenizer == 'regex':
+            tokens = []
+            for token in TOKEN_PATTERN.findall(text):
+                split = SPLIT_WORDS.get(token.lower())
+                if split:
+                    tokens.append(token[:len(split[0])])
+                    tokens.append(token[len(split[0]):])
+                else:
+                    tokens.append(token)
+            return tokens
+        
+        try:
+            # Preprocessed text has no sentence punctuation, so skip Punkt
+            return _load_nltk()['word_tokenize'](text, preserve_line=True)
+        except Exception:
+            # Fallback tokenization
+            return text.lower().split()
+    
     def tokenize_and_lemmatize(self, text: str) -> List[str]:
         """
         Tokenize text and lemmatize tokens.
@@ -188,14 +862,10 @@ class NLPProcessor:
         Returns:
             List of lemmatized tokens
         """
-        try:
-            tokens = word_tokenize(text)
-            lemmatized = [self.lemmatizer.lemmatize(token) for token in tokens]
-            return [token for token in lemmatized if token not in stopwords.words('english')]
-        except:
-            # Fallback tokenization
-            tokens = text.lower().split()
-            return [token for token in tokens if token not in stopwords]
+        lemmatize = self._lemmatize
+        stop_words = self.stop_words
+        lemmatized = (lemmatize(token) for token in self.tokenize(text))
+        return [token for token in lemmatized if token not in stop_words]
     
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """
@@ -207,14 +877,22 @@ class NLPProcessor:
         Returns:
             Dictionary of entity types and their values
         """
-        entities = {}
-        
-        for entity_type, pattern in self.entity_patterns.items():
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                entities[entity_type] = matches
+        return self.entity_extractor.extract(text)
+    
+    def extract_entity_spans(self, text: str) -> List[Dict]:
+        """
+        Extract entities with their character spans.
         
-        return entities
+        Args:
+            text: Input text
+            
+        Returns:
+            List of dictionaries with type, value, start and end
+        """
+        return [
+            {'type': entity_type, 'value': value, 'start': start, 'end': end}
+            for entity_type, value, start, end in self.entity_extractor.finditer(text)
+        ]
     
     def analyze_sentiment(self, text: str) -> Dict[str, float]:
         """
@@ -254,73 +932,91 @@ class NLPProcessor:
         Returns:
             Tuple of (intent, confidence_score)
         """
-        preprocessed_text = self.preprocess_text(text)
-        text_lower = text.lower().strip()
+        return self._recognize_intents([text])[0]
+    
+    def recognize_intent_batch(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """
+        Recognize intents for several messages with one vectorizer pass.
         
-        # First, check for exact matches with high confidence
-        exact_greetings = [
-            'hello', 'hi', 'hey', 'how are you', 'how are u', 'how r u', 
-            "how's it going", 'whats up', "what's up", 'how do you do', 
-            'greetings', 'sup', 'yo', 'good morning', 'good afternoon', 'good evening'
-        ]
+        Args:
+            texts: Input texts
+            
+        Returns:
+            List of (intent, confidence_score) tuples in input order
+        """
+        return self._recognize_intents(texts)
+    
+    def _recognize_intents(self, texts: List[str], preprocessed: Optional[List[str]] = None,
+                           matches: Optional[List[FrozenSet[str]]] = None) -> List[Tuple[str, float]]:
+        """Batch intent recognition with optional precomputed preprocessing and keyword matches."""
+        if matches is None:
+            matches = [self.match_keywords(text) for text in texts]
+        
+        results = [self._match_rule_intent(text_matches) for text_matches in matches]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
         
-        if text_lower in exact_greetings:
-            return 'greeting', 0.95
+        if preprocessed is None:
+            preprocessed = [self.preprocess_text(text) if result is None else None
+                            for text, result in zip(texts, results)]
         
-        # Check for greetings that start with these words
-        greeting_starts = ['hello', 'hi', 'hey', 'how', 'whats', "what's", 'sup', 'yo']
-        if any(text_lower.startswith(start) for start in greeting_starts):
-            return 'greeting', 0.9
+        try:
+            text_vectors = self.vectorizer.transform([preprocessed[i] for i in pending])
+        except:
+            for i in pending:
+                results[i] = self._fallback_intent_recognition(texts[i], matches[i])
+            return results
         
-        # Check for exact goodbyes
-        exact_goodbyes = ['bye', 'goodbye', 'see you', 'take care', 'farewell']
-        if text_lower in exact_goodbyes:
-            return 'goodbye', 0.95
+        intent_scores = self._score_intents(text_vectors)
+        for row, i in enumerate(pending):
+            results[i] = self._select_intent(intent_scores[row])
         
-        # Check for exact thanks
-        exact_thanks = ['thank you', 'thanks', 'thank', 'appreciate it', 'grateful']
-        if text_lower in exact_thanks:
-            return 'thanks', 0.95
+        return results
+    
+    def match_keywords(self, text: str) -> FrozenSet[str]:
+        """
+        Match text against all rule-based keyword lists in a single pass.
         
-        # Check for business hours questions
-        business_hours_words = ['business hours', 'hours', 'when are you open', 'what time', 'operating hours']
-        if any(phrase in text_lower for phrase in business_hours_words):
-            return 'business_hours', 0.9
+        Args:
+            text: Input text
+            
+        Returns:
+            Set of matched rule categories, shared by NLP and response logic
+        """
+        return self.keyword_rules.match(text)
+    
+    def _match_rule_intent(self, matches: FrozenSet[str]) -> Optional[Tuple[str, float]]:
+        """Match high-confidence rule-based intents before vector scoring."""
+        rules = self.keyword_rules.rules
         
-        # Check for password reset questions
-        password_words = ['password reset', 'forgot password', 'reset password', 'change password']
-        if any(phrase in text_lower for phrase in password_words):
-            return 'password_reset', 0.9
+        # First, check for exact matches with high confidence
+        for intent in rules.get('exact', {}):
+            if f'exact:{intent}' in matches:
+                return intent, 0.95
         
-        # Check for contact/support questions
-        contact_words = ['contact support', 'how to contact', 'support phone', 'support email']
-        if any(phrase in text_lower for phrase in contact_words):
-            return 'contact_support', 0.9
+        # Check for messages that start with intent phrases
+        for intent in rules.get('prefix', {}):
+            if f'prefix:{intent}' in matches:
+                return intent, 0.9
         
-        # Vectorize the input text
-        try:
-            text_vector = self.vectorizer.transform([preprocessed_text])
-        except:
-            # Fallback: simple keyword matching
-            return self._fallback_intent_recognition(text)
+        # Check for phrases anywhere in the message (business hours, password, contact)
+        for category in self.keyword_rules.categories('intent:'):
+            if category in matches:
+                return category.split(':', 1)[1], 0.9
         
+        return None
+    
+    def _select_intent(self, intent_scores: 'np.ndarray') -> Tuple[str, float]:
+        """Pick the best intent from a row of per-intent similarity scores."""
         best_intent = "general"
         best_score = 0.0
         
-        # Compare with each intent's patterns
-        for intent, data in self.intents.items():
-            patterns = data.get('patterns', [])
-            if patterns:
-                try:
-                    pattern_vectors = self.vectorizer.transform(patterns)
-                    similarities = cosine_similarity(text_vector, pattern_vectors)
-                    max_similarity = np.max(similarities)
-                    
-                    if max_similarity > best_score:
-                        best_score = max_similarity
-                        best_intent = intent
-                except:
-                    continue
+        if len(self.intent_names):
+            best_index = int(intent_scores.argmax())
+            if intent_scores[best_index] > best_score:
+                best_score = float(intent_scores[best_index])
+                best_intent = self.intent_names[best_index]
         
         # Boost confidence for certain intents if we have a reasonable match
         if best_intent in ['greeting', 'goodbye', 'thanks'] and best_score > 0.3:
@@ -328,73 +1024,135 @@ class NLPProcessor:
         
         return best_intent, best_score
     
-    def _fallback_intent_recognition(self, text: str) -> Tuple[str, float]:
+    def _fallback_intent_recognition(self, text: str,
+                                     matches: Optional[FrozenSet[str]] = None) -> Tuple[str, float]:
         """Fallback intent recognition using keyword matching."""
-        text_lower = text.lower()
-        
-        intent_keywords = {
-            'greeting': [
-                'hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening',
-                'how are you', 'how are u', 'how r u', "how's it going", 'whats up', "what's up",
-                'how do you do', 'greetings', 'sup', 'yo'
-            ],
-            'goodbye': ['bye', 'goodbye', 'see you', 'take care'],
-            'help': ['help', 'support', 'assistance'],
-            'thanks': ['thank', 'thanks', 'appreciate'],
-            'support_ticket': ['ticket', 'issue', 'problem', 'bug', 'complaint'],
-            'product_info': ['product', 'feature', 'specification'],
-            'pricing': ['price', 'cost', 'how much', 'pricing']
-        }
+        if matches is None:
+            matches = self.match_keywords(text)
         
-        for intent, keywords in intent_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return intent, 0.8
+        for category in self.keyword_rules.categories('fallback:'):
+            if category in matches:
+                return category.split(':', 1)[1], 0.8
         
         return "general", 0.5
     
-    def process_message(self, message: str) -> Dict:
+    def process_message(self, message: str) -> NLPResult:
         """
         Process a complete message and return comprehensive analysis.
         
+        Keyword matching and intent recognition run immediately; tokens,
+        entities and sentiment are computed on first access. Repeated
+        messages are served from the analysis cache.
+        
         Args:
             message: User's input message
             
         Returns:
-            Dictionary containing intent, entities, sentiment, and other analysis
+            Dictionary-like NLPResult containing intent, entities, sentiment,
+            and other analysis
+        """
+        result = self._create_result(message)
+        result.run_stage('intent')
+        return result
+    
+    def process_batch(self, messages: List[str], lazy: bool = False) -> List[NLPResult]:
         """
-        # Preprocess text
-        preprocessed = self.preprocess_text(message)
+        Process many messages at once for bulk and offline classification.
         
-        # Tokenize and lemmatize
-        tokens = self.tokenize_and_lemmatize(preprocessed)
+        Intents for all messages are scored with one vectorizer transform and
+        a single matrix-wide similarity. Repeated messages are analyzed once.
         
-        # Recognize intent
-        intent, confidence = self.recognize_intent(message)
+        Args:
+            messages: User input messages
+            lazy: Leave tokens, entities and sentiment to be computed on
+                first access instead of computing every field now
+                
+        Returns:
+            List of analysis results identical to process_message output,
+            in input order
+        """
+        unique_messages = list(dict.fromkeys(messages))
+        analyses = {
+            message: self._create_result(message, self.preprocess_text(message))
+            for message in unique_messages
+        }
         
-        # Extract entities
-        entities = self.extract_entities(message)
+        # Score every message whose intent is not cached in one pass
+        pending = [message for message in unique_messages if not analyses[message].has_stage('intent')]
+        intents = self._recognize_intents(
+            pending,
+            [analyses[message]['preprocessed_text'] for message in pending],
+            [analyses[message]['keyword_matches'] for message in pending]
+        )
+        for message, (intent, confidence) in zip(pending, intents):
+            analyses[message].set_stage_values('intent', {'intent': intent, 'confidence': confidence})
         
-        # Analyze sentiment
-        sentiment = self.analyze_sentiment(message)
+        if not lazy:
+            for result in analyses.values():
+                result.resolve()
         
-        return {
-            'original_text': message,
-            'preprocessed_text': preprocessed,
-            'tokens': tokens,
-            'intent': intent,
-            'confidence': confidence,
-            'entities': entities,
-            'sentiment': sentiment,
-            'word_count': len(tokens),
-            'has_question': '?' in message,
-            'is_urgent': self._detect_urgency(message)
-        }
+        results = []
+        seen = set()
+        for message in messages:
+            if message in seen:
+                results.append(copy.deepcopy(analyses[message]))
+            else:
+                seen.add(message)
+                results.append(analyses[message])
+        
+        return results
+    
+    def _create_result(self, message: str, preprocessed: Optional[str] = None) -> NLPResult:
+        """Create a lazy result, seeded from the analysis cache when enabled."""
+        if self.analysis_cache is None:
+            result = NLPResult(self, message)
+            if preprocessed is not None:
+                result.set_stage_values('preprocess', {'preprocessed_text': preprocessed})
+            return result
+        
+        if preprocessed is None:
+            preprocessed = self.preprocess_text(message)
+        
+        cached = self.analysis_cache.get(preprocessed, message)
+        result = NLPResult(self, message, cached, self.analysis_cache, preprocessed)
+        if not result.has_stage('preprocess'):
+            result.set_stage_values('preprocess', {'preprocessed_text': preprocessed})
+        return result
+    
+    def _record_stage(self, intent: str, stage: str):
+        """Count an analysis stage run for the stage statistics."""
+        with self._stage_lock:
+            counts = self._stage_counts.setdefault(intent, Counter())
+            counts[stage] += 1
+    
+    def get_stage_stats(self) -> Dict:
+        """
+        Get how often each lazy analysis stage ran, per intent.
+        
+        Returns:
+            Dictionary keyed by intent with the number of analyzed messages
+            and, per stage, how many times it ran and was skipped
+        """
+        with self._stage_lock:
+            snapshot = {intent: Counter(counts) for intent, counts in self._stage_counts.items()}
+        
+        stats = {}
+        for intent, counts in snapshot.items():
+            messages = counts['message']
+            stats[intent] = {
+                'messages': messages,
+                'stages_run': {stage: counts[stage] for stage in NLPResult.STAGES},
+                'stages_skipped': {
+                    stage: max(messages - counts[stage], 0) for stage in NLPResult.STAGES
+                }
+            }
+        return stats
     
-    def _detect_urgency(self, text: str) -> bool:
+    def _detect_urgency(self, text: str, matches: Optional[FrozenSet[str]] = None) -> bool:
         """Detect if the message indicates urgency."""
-        urgent_keywords = ['urgent', 'emergency', 'asap', 'immediately', 'critical', 'broken', 'down']
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in urgent_keywords)
+        if matches is None:
+            matches = self.match_keywords(text)
+        return 'urgency' in matches
     
     def get_suggestions(self, intent: str) -> List[str]:
         """Get suggested follow-up questions based on intent."""
@@ -428,15 +1186,28 @@ class NLPProcessor:
         
         return suggestions.get(intent, ["Is there anything else I can help you with?"])
     
+    def _component_status(self, attribute: str) -> str:
+        """Report whether a lazily loaded component has been created yet."""
+        return 'initialized' if self.__dict__.get(attribute) is not None else 'not loaded'
+    
     def health_check(self) -> Dict:
         """Perform health check on NLP components."""
         return {
             'status': 'healthy',
             'components': {
-                'vectorizer': 'initialized',
-                'lemmatizer': 'initialized',
-                'sentiment_analyzer': 'initialized',
-                'intents_loaded': len(self.intents)
+                'vectorizer': self._component_status('_vectorizer'),
+                'lemmatizer': self._component_status('lemmatizer') if self._lemmatizer_available else 'unavailable',
+                'tokenizer': self.tokenizer,
+                'lemma_cache': self._lemmatize.cache_info()._asdict(),
+                'sentiment_analyzer': self._component_status('sentiment_analyzer'),
+                'intents_loaded': len(self.intents),
+                'keyword_rules': self.keyword_rules.health_check()
+            },
+            'stage_stats': self.get_stage_stats(),
+            'model_snapshot': {
+                'file': self.snapshot_file,
+                'status': self.snapshot_status
             },
+            'analysis_cache': self.analysis_cache.get_stats() if self.analysis_cache is not None else {'enabled': False},
             'intents_available': list(self.intents.keys())
         } 
\ No newline at end of file
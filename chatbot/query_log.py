@@ -0,0 +1,202 @@
+"""
+Query Log Module
+
+Times SQLite statements and records the slow ones with their query plan.
+Connections opened while a log is installed are created
+with a connection class whose cursors time ``execute``/``executemany``
+together with the fetches that follow, so a statement whose work happens
+while its rows are read is still measured.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+
+class SlowQueryLog:
+    """
+    Records statements that take at least ``threshold_ms``.
+    
+    Each entry holds the parameterized SQL, the duration and the
+    ``EXPLAIN QUERY PLAN`` details. Parameter values carry user messages,
+    so they are used for the plan but never logged. The newest
+    ``max_entries`` entries are kept in memory; with ``log_file`` every
+    entry is also appended to that file as a JSON line.
+    """
+    
+    def __init__(self, threshold_ms: float = 100.0, max_entries: int = 100,
+                 log_file: Optional[str] = None, explain: bool = True, echo: bool = True):
+        """
+        Initialize the log.
+        
+        Args:
+            threshold_ms: Statements at least this slow are recorded
+            max_entries: Recent entries kept in memory
+            log_file: Optional JSON Lines file every entry is appended to
+            explain: Record the query plan of each entry
+            echo: Print a line for each entry
+        """
+        self.threshold_ms = max(float(threshold_ms), 0.0)
+        self.log_file = log_file
+        self.explain = explain
+        self.echo = echo
+        
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=max(int(max_entries), 1))
+        self._slow = 0
+    
+    def observe(self, conn: sqlite3.Connection, sql: str, params, elapsed_ms: float,
+                executions: Optional[int] = None):
+        """
+        Record a slow statement.
+        
+        Args:
+            conn: Connection that ran the statement, used for the plan
+            sql: Statement text
+            params: Parameters of the statement (the first set for executemany),
+                used only to explain it
+            elapsed_ms: Execution and fetch time
+            executions: Parameter sets run by executemany
+        """
+        entry = {
+            'time': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(elapsed_ms, 3),
+            'sql': ' '.join(sql.split())
+        }
+        if executions is not None:
+            entry['executions'] = executions
+        if self.explain:
+            entry['plan'] = explain_query_plan(conn, sql, params)
+        
+        with self._lock:
+            self._slow += 1
+            self._entries.append(entry)
+            if self.log_file:
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        if self.echo:
+            plan = '; '.join(line.strip() for line in entry.get('plan') or [])
+            print(f"🐢 Slow query ({entry['duration_ms']:.1f} ms): {entry['sql'][:200]}"
+                  + (f" plan: {plan}" if plan else ''))
+    
+    def get_entries(self) -> List[Dict]:
+        """Get the recorded entries, oldest first."""
+        with self._lock:
+            return list(self._entries)
+    
+    def clear(self):
+        """Forget the recorded entries and counters."""
+        with self._lock:
+            self._entries.clear()
+            self._slow = 0
+    
+    def get_stats(self) -> Dict:
+        """Get log settings and counters."""
+        with self._lock:
+            return {
+                'enabled': True,
+                'threshold_ms': self.threshold_ms,
+                'slow_queries': self._slow,
+                'recent': list(self._entries)[-5:]
+            }
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, params=()) -> Optional[List[str]]:
+    """
+    Get the EXPLAIN QUERY PLAN details of a statement, indented by depth.
+    
+    Args:
+        conn: Connection to plan on
+        sql: Statement text
+        params: Statement parameters
+        
+    Returns:
+        Plan lines, or None if the statement cannot be explained
+    """
+    try:
+        # A plain cursor, so explaining is not timed itself
+        rows = sqlite3.Cursor(conn).execute('EXPLAIN QUERY PLAN ' + sql, params or ()).fetchall()
+    except (sqlite3.Error, ValueError):
+        return None
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that times each statement across its execute and fetch calls."""
+    
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._pending = None
+    
+    def _finish(self, started: float):
+        """Add the time since ``started`` and record the statement once it is slow."""
+        if self._pending is None:
+            return
+        sql, params, executions, elapsed = self._pending
+        elapsed += (time.perf_counter() - started) * 1000
+        query_log = self.connection.query_log
+        if elapsed >= query_log.threshold_ms:
+            # Recorded once; later fetches of the same statement are not timed
+            self._pending = None
+            query_log.observe(self.connection, sql, params, elapsed, executions)
+        else:
+            self._pending = (sql, params, executions, elapsed)
+    
+    def execute(self, sql: str, parameters=()):
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._pending = (sql, parameters, None, 0.0)
+        self._finish(started)
+        return self
+    
+    def executemany(self, sql: str, seq_of_parameters):
+        if not isinstance(seq_of_parameters, Sequence):
+            seq_of_parameters = list(seq_of_parameters)
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        first = seq_of_parameters[0] if seq_of_parameters else ()
+        self._pending = (sql, first, len(seq_of_parameters), 0.0)
+        self._finish(started)
+        return self
+    
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._finish(started)
+        return row
+    
+    def fetchmany(self, size: Optional[int] = None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._finish(started)
+        return rows
+    
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._finish(started)
+        return rows
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose statements run on TimedCursors; ``query_log`` is set after connecting."""
+    
+    query_log: Optional[SlowQueryLog] = None
+    
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+    
+    def execute(self, sql: str, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql: str, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
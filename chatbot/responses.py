@@ -7,9 +7,11 @@ knowledge base. Manages conversation flow and provides intelligent responses.
 
 import json
 import random
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from datetime import datetime
 
+from .keywords import KeywordRules
+
 
 class ResponseManager:
     """
@@ -17,17 +19,23 @@ class ResponseManager:
     Handles different intents, context awareness, and dynamic responses.
     """
     
+    # Intents answered from a template without looking at their sentiment
+    SMALL_TALK_INTENTS = frozenset({'greeting', 'goodbye', 'thanks'})
+    
     def __init__(self, knowledge_base_path: str = "data/knowledge_base.json",
-                 responses_path: str = "data/responses.json"):
+                 responses_path: str = "data/responses.json",
+                 keyword_rules: Optional[KeywordRules] = None):
         """
         Initialize the response manager.
         
         Args:
             knowledge_base_path: Path to knowledge base file
             responses_path: Path to response templates file
+            keyword_rules: Compiled keyword rules, shared with the NLP processor
         """
         self.knowledge_base = self._load_knowledge_base(knowledge_base_path)
         self.response_templates = self._load_response_templates(responses_path)
+        self.keyword_rules = keyword_rules or KeywordRules()
         
         # Conversation state tracking
         self.conversation_states = {}
@@ -162,11 +170,13 @@ class ResponseManager:
                          user_id: str) -> Dict:
         """
         Generate an appropriate response based on the message and context.
+        
+        Entities and sentiment are read only by the branches that use them,
+        so a lazy NLP result never computes them for a plain template reply.
         """
         intent = nlp_result.get('intent', 'general')
         confidence = nlp_result.get('confidence', 0.0)
-        entities = nlp_result.get('entities', {})
-        sentiment = nlp_result.get('sentiment', {})
+        matches = self._get_keyword_matches(message, nlp_result)
         
         # Check if we need to escalate to human
         if self._should_escalate(message, nlp_result, context):
@@ -178,9 +188,9 @@ class ResponseManager:
         elif intent == 'support_ticket':
             response = self._handle_support_ticket_request(message, user_id)
         elif intent == 'product_info':
-            response = self._handle_product_inquiry(message, entities)
+            response = self._handle_product_inquiry(message, nlp_result.get('entities', {}))
         elif intent == 'pricing':
-            response = self._handle_pricing_inquiry(message, entities)
+            response = self._handle_pricing_inquiry(message, nlp_result.get('entities', {}))
         elif intent == 'account_help':
             response = self._get_template_response('account_help')
         elif intent == 'technical_support':
@@ -201,7 +211,7 @@ class ResponseManager:
                 response = faq_response
             else:
                 # If no good match found, provide a helpful fallback
-                response = self._get_unrelated_response(message, intent, confidence)
+                response = self._get_unrelated_response(message, intent, confidence, matches)
         
         # Add suggestions based on intent
         suggestions = self._generate_suggestions(intent, context)
@@ -214,29 +224,26 @@ class ResponseManager:
             'confidence': confidence,
             'intent': intent,
             'suggestions': suggestions,
-            'requires_human': requires_human,
-            'entities': entities,
-            'sentiment': sentiment
+            'requires_human': requires_human
         }
     
-    def _get_unrelated_response(self, message: str, intent: str, confidence: float) -> str:
+    def _get_keyword_matches(self, message: str, nlp_result: Optional[Dict] = None) -> FrozenSet[str]:
+        """Get rule keyword matches, reusing the NLP result's matches when present."""
+        matches = nlp_result.get('keyword_matches') if nlp_result else None
+        if matches is None:
+            matches = self.keyword_rules.match(message)
+        return matches
+    
+    def _get_unrelated_response(self, message: str, intent: str, confidence: float,
+                                matches: Optional[FrozenSet[str]] = None) -> str:
         """Generate a response for unrelated or unclear messages."""
-        message_lower = message.lower()
-        
-        # Check if it's a greeting that wasn't properly recognized
-        greeting_words = ['hello', 'hi', 'hey', 'how are you', 'how r u', 'how\'s it going', 'whats up']
-        if any(word in message_lower for word in greeting_words):
-            return self._get_template_response('greeting')
+        if matches is None:
+            matches = self._get_keyword_matches(message)
         
-        # Check if it's a goodbye that wasn't properly recognized
-        goodbye_words = ['bye', 'goodbye', 'see you', 'take care', 'farewell']
-        if any(word in message_lower for word in goodbye_words):
-            return self._get_template_response('goodbye')
-        
-        # Check if it's a thank you that wasn't properly recognized
-        thanks_words = ['thank', 'thanks', 'appreciate', 'grateful']
-        if any(word in message_lower for word in thanks_words):
-            return self._get_template_response('thanks')
+        # Check if it's a greeting, goodbye or thank you that wasn't properly recognized
+        for category in self.keyword_rules.categories('unrelated:'):
+            if category in matches:
+                return self._get_template_response(category.split(':', 1)[1])
         
         # For truly unrelated messages, provide helpful guidance
         if confidence < 0.3:
@@ -248,13 +255,11 @@ class ResponseManager:
     def _should_escalate(self, message: str, nlp_result: Dict, context: List[Dict]) -> bool:
         """Determine if the conversation should be escalated to a human."""
         # Check for urgent keywords
-        urgent_words = ['urgent', 'emergency', 'critical', 'broken', 'down', 'not working']
-        if any(word in message.lower() for word in urgent_words):
+        if 'escalation:urgent' in self._get_keyword_matches(message, nlp_result):
             return True
         
         # Check sentiment
-        sentiment = nlp_result.get('sentiment', {})
-        if sentiment.get('compound', 0) < -0.5:  # Very negative sentiment
+        if self._is_negative(nlp_result, -0.5):  # Very negative sentiment
             return True
         
         # Check if user is frustrated (repeated questions)
@@ -265,6 +270,13 @@ class ResponseManager:
         
         return False
     
+    def _is_negative(self, nlp_result: Dict, threshold: float) -> bool:
+        """Check whether the message sentiment falls below a compound threshold."""
+        if nlp_result.get('intent') in self.SMALL_TALK_INTENTS:
+            return False
+        sentiment = nlp_result.get('sentiment', {})
+        return sentiment.get('compound', 0) < threshold
+    
     def _generate_escalation_response(self, user_id: str, message: str) -> str:
         """Generate response for escalation to human agent."""
         # First, give the escalation message
@@ -542,18 +554,17 @@ class ResponseManager:
             return True
         
         # Very negative sentiment
-        sentiment = nlp_result.get('sentiment', {})
-        if sentiment.get('compound', 0) < -0.7:
+        if self._is_negative(nlp_result, -0.7):
             return True
         
+        matches = self._get_keyword_matches(message, nlp_result)
+        
         # Complex technical questions
-        technical_keywords = ['api', 'integration', 'configuration', 'setup', 'installation']
-        if any(keyword in message.lower() for keyword in technical_keywords):
+        if 'human:technical' in matches:
             return True
         
         # User explicitly asks for human
-        human_keywords = ['human', 'person', 'agent', 'representative', 'real person']
-        if any(keyword in message.lower() for keyword in human_keywords):
+        if 'human:request' in matches:
             return True
         
         return False
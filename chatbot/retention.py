@@ -0,0 +1,264 @@
+"""
+Data Retention Module
+
+Deletes expired conversations, tickets and analytics rows in small rowid
+batches from a background thread, pausing between batches so chat turns
+are never blocked for long, and reclaims freed pages with incremental
+vacuum.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Per-table retention policies: rows whose time column is older than
+# ``days`` are deleted, optionally only when ``status`` is one of ``statuses``
+DEFAULT_POLICIES = {
+    'conversations': {'days': 90, 'column': 'timestamp_ms'},
+    'tickets': {'days': 365, 'column': 'updated_at_ms', 'statuses': ['closed', 'resolved']},
+    'analytics': {'days': 730, 'column': 'date_ms'}
+}
+
+# Policy keys a retention request may override; tables and time columns stay server-side
+REQUEST_POLICY_KEYS = ('days', 'statuses')
+
+# Upper bound for retention days, keeping cutoffs inside SQLite's integer range
+MAX_RETENTION_DAYS = 36500
+
+
+def _check_days(table: str, days) -> None:
+    if isinstance(days, bool) or not isinstance(days, int) or not 0 <= days <= MAX_RETENTION_DAYS:
+        raise ValueError(f"Retention days for {table} must be an integer from 0 to {MAX_RETENTION_DAYS}")
+
+
+def _coerce_days(table: str, days) -> int:
+    """Convert a requested number of days, accepting numeric strings such as "30"."""
+    if isinstance(days, bool):
+        raise ValueError(f"Retention days for {table} must be a number")
+    try:
+        days = int(days)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"Retention days for {table} must be a number") from None
+    _check_days(table, days)
+    return days
+
+
+def validate_policy_overrides(policies) -> Dict:
+    """
+    Check retention policy overrides sent by a client.
+    
+    Only known tables and the ``days`` and ``statuses`` keys are accepted,
+    so the time column and table names used in SQL never come from a request.
+    Numeric ``days`` values such as ``"30"`` are converted to integers.
+    
+    Args:
+        policies: {table: {'days': int, 'statuses': [str, ...]}}
+        
+    Returns:
+        Copy of the overrides with integer days
+        
+    Raises:
+        ValueError: If a table, key or value is not allowed
+    """
+    if not isinstance(policies, dict):
+        raise ValueError("Retention policies must be an object")
+    checked = {}
+    for table, policy in policies.items():
+        if table not in DEFAULT_POLICIES:
+            raise ValueError(f"Unknown retention table: {table}")
+        if not isinstance(policy, dict):
+            raise ValueError(f"Retention policy for {table} must be an object")
+        unknown = set(policy) - set(REQUEST_POLICY_KEYS)
+        if unknown:
+            raise ValueError(f"Retention policy keys not allowed: {', '.join(sorted(map(str, unknown)))}")
+        checked[table] = dict(policy)
+        if 'days' in policy:
+            checked[table]['days'] = _coerce_days(table, policy['days'])
+        if 'statuses' in policy:
+            statuses = policy['statuses']
+            if not isinstance(statuses, list) or not all(isinstance(status, str) for status in statuses):
+                raise ValueError(f"Retention statuses for {table} must be a list of strings")
+    return checked
+
+
+class RetentionJob:
+    """
+    One retention pass over every table with a policy.
+    
+    Each batch selects up to ``batch_size`` expired rowids through the
+    table's time index and deletes them in its own short transaction, so
+    the writer lock is only held for one batch at a time. Run it in the
+    background with ``start()`` or inline with ``run()``, and read progress
+    with ``get_status()``.
+    
+    When the database archives conversations, the conversation cutoff is
+    never earlier than the archive threshold, so rows are archived before
+    they can be purged.
+    """
+    
+    def __init__(self, db, policies: Optional[Dict] = None, batch_size: int = 1000,
+                 pause_ms: float = 10.0, vacuum_pages: int = 256):
+        """
+        Initialize the retention job.
+        
+        Args:
+            db: DatabaseManager to clean up
+            policies: Per-table policies; tables missing here use DEFAULT_POLICIES
+            batch_size: Maximum rows deleted per transaction
+            pause_ms: Pause between batches so other writers can run
+            vacuum_pages: Free pages released after each batch when the
+                database uses incremental auto-vacuum
+        """
+        self.db = db
+        self.policies = self._merge_policies(policies or {})
+        self.batch_size = max(int(batch_size), 1)
+        self.pause = max(pause_ms, 0.0) / 1000.0
+        self.vacuum_pages = max(int(vacuum_pages), 0)
+        
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = None
+        self._status = {
+            'state': 'pending',
+            'started_at': None,
+            'finished_at': None,
+            'current_table': None,
+            'batches': 0,
+            'deleted': {table: 0 for table in self.policies},
+            'archived': 0,
+            'pages_vacuumed': 0,
+            'error': None
+        }
+    
+    @staticmethod
+    def _merge_policies(policies: Dict) -> Dict:
+        merged = {}
+        for table, default in DEFAULT_POLICIES.items():
+            policy = dict(default)
+            policy.update(policies.get(table) or {})
+            if policy.get('days') is not None:
+                # Fail when the job is created, not later in its thread
+                _check_days(table, policy['days'])
+                merged[table] = policy
+        return merged
+    
+    def start(self) -> 'RetentionJob':
+        """Run the job in a background thread."""
+        with self._lock:
+            if self._thread is None:
+                # Report running right away so callers polling the status see it
+                self._status['state'] = 'running'
+                self._thread = threading.Thread(target=self.run, name="db-retention", daemon=True)
+                self._thread.start()
+        return self
+    
+    def cancel(self):
+        """Stop after the current batch."""
+        self._cancelled.set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background run to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running()
+    
+    def is_running(self) -> bool:
+        with self._lock:
+            return self._status['state'] == 'running'
+    
+    def run(self) -> Dict:
+        """
+        Delete expired rows from every table with a policy.
+        
+        Returns:
+            Final job status
+        """
+        self._update(state='running', started_at=self._now())
+        try:
+            vacuum = self.vacuum_pages and self._incremental_vacuum_enabled()
+            if self.db.archive is not None:
+                # Move aged conversations to the archive before anything is deleted
+                self._update(current_table='archive')
+                self._update(archived=self.db.archive_old_data()['archived'])
+            for table, policy in self.policies.items():
+                self._update(current_table=table)
+                self._purge_table(table, policy, vacuum)
+                if self._cancelled.is_set():
+                    break
+            if self.db.profile_cache is not None:
+                # Cached conversation and ticket counts may include deleted rows
+                self.db.profile_cache.invalidate()
+            state = 'cancelled' if self._cancelled.is_set() else 'completed'
+            self._update(state=state, current_table=None, finished_at=self._now())
+        except Exception as e:
+            print(f"Error running retention job: {e}")
+            self._update(state='failed', error=str(e), finished_at=self._now())
+        return self.get_status()
+    
+    def _purge_table(self, table: str, policy: Dict, vacuum: bool):
+        """Delete a table's expired rows batch by batch."""
+        days = policy['days']
+        if table == 'conversations' and self.db.archive is not None:
+            # Leave conversations younger than the archive threshold for the archive
+            days = max(days, self.db.archive_config['after_days'])
+        cutoff_ms = self.db._now_ms() - int(days * 86400000)
+        where = f"{policy['column']} < ?"
+        params: List = [cutoff_ms]
+        if policy.get('statuses'):
+            where += f" AND status IN ({', '.join('?' for _ in policy['statuses'])})"
+            params.extend(policy['statuses'])
+        
+        while not self._cancelled.is_set():
+            with self.db.lock, self.db.connections.transaction() as conn:
+                cursor = conn.cursor()
+                columns = 'rowid, status' if table == 'tickets' else 'rowid'
+                cursor.execute(f'SELECT {columns} FROM {table} WHERE {where} LIMIT ?', params + [self.batch_size])
+                rows = cursor.fetchall()
+                if table == 'tickets':
+                    # Keep the ticket status counters in step
+                    for _, status in rows:
+                        self.db.rollups.record_ticket_status(cursor, status, None)
+                cursor.executemany(f'DELETE FROM {table} WHERE rowid = ?', [(row[0],) for row in rows])
+            
+            if rows:
+                with self._lock:
+                    self._status['batches'] += 1
+                    self._status['deleted'][table] += len(rows)
+                if vacuum:
+                    self._vacuum()
+            if len(rows) < self.batch_size:
+                return
+            # Let queued chat turns take the writer lock
+            time.sleep(self.pause)
+    
+    def _incremental_vacuum_enabled(self) -> bool:
+        conn = self.db.connections.connection()
+        return conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+    
+    def _vacuum(self):
+        """Release up to vacuum_pages free pages back to the file system."""
+        with self.db.lock:
+            conn = self.db.connections.connection()
+            before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            conn.execute(f'PRAGMA incremental_vacuum({self.vacuum_pages})').fetchall()
+            after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        with self._lock:
+            self._status['pages_vacuumed'] += before - after
+    
+    def _update(self, **fields):
+        with self._lock:
+            self._status.update(fields)
+    
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+    
+    def get_status(self) -> Dict:
+        """Get job progress and deletion counts."""
+        with self._lock:
+            status = dict(self._status)
+            status['deleted'] = dict(status['deleted'])
+        status['total_deleted'] = sum(status['deleted'].values())
+        status['policies'] = {table: dict(policy) for table, policy in self.policies.items()}
+        return status
@@ -0,0 +1,275 @@
+"""
+Statistics Rollups Module
+
+Maintains hourly and daily message rollups, distinct user and session sets,
+and ticket status counters as messages and tickets are written, so usage
+statistics are read from small summary tables instead of scanning the
+conversation history.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+
+ROLLUP_TABLES = [
+    'stats_hourly', 'stats_daily',
+    'stats_hourly_users', 'stats_daily_users',
+    'stats_hourly_sessions', 'stats_daily_sessions',
+    'ticket_status_counts'
+]
+
+
+def floor_to(epoch_ms: int, bucket_ms: int) -> int:
+    """Round an epoch-millisecond timestamp down to its bucket start."""
+    return epoch_ms - epoch_ms % bucket_ms
+
+
+class StatisticsRollups:
+    """
+    Incrementally maintained summary tables for get_statistics.
+    
+    Message counts and bot confidence sums are kept per UTC hour and day.
+    Distinct users and sessions are kept as exact per-hour and per-day sets,
+    so a period is answered from daily rows for whole days plus hourly rows
+    for the partial days at either end.
+    """
+    
+    def create_tables(self, cursor):
+        """Create rollup tables if they don't exist."""
+        for granularity in ('hourly', 'daily'):
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS stats_{granularity} (
+                    bucket_start INTEGER PRIMARY KEY,
+                    messages INTEGER NOT NULL DEFAULT 0,
+                    bot_messages INTEGER NOT NULL DEFAULT 0,
+                    confidence_sum REAL NOT NULL DEFAULT 0,
+                    confidence_count INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            for member in ('user_id', 'session_id'):
+                table = f"stats_{granularity}_{member.split('_')[0]}s"
+                cursor.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        bucket_start INTEGER NOT NULL,
+                        {member} TEXT NOT NULL,
+                        PRIMARY KEY (bucket_start, {member})
+                    ) WITHOUT ROWID
+                ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ticket_status_counts (
+                status TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+    
+    def record_messages(self, cursor, messages: Iterable[Tuple[int, str, str, str, Optional[float]]]):
+        """
+        Add messages to the rollups.
+        
+        Args:
+            cursor: Cursor inside the transaction that stores the messages
+            messages: Tuples of (timestamp_ms, user_id, session_id, sender, confidence)
+        """
+        counters = {'hourly': defaultdict(lambda: [0, 0, 0.0, 0]), 'daily': defaultdict(lambda: [0, 0, 0.0, 0])}
+        users = {'hourly': set(), 'daily': set()}
+        sessions = {'hourly': set(), 'daily': set()}
+        
+        for timestamp_ms, user_id, session_id, sender, confidence in messages:
+            for granularity, bucket_ms in (('hourly', HOUR_MS), ('daily', DAY_MS)):
+                bucket = floor_to(timestamp_ms, bucket_ms)
+                counter = counters[granularity][bucket]
+                counter[0] += 1
+                if sender == 'bot':
+                    counter[1] += 1
+                    if confidence is not None:
+                        counter[2] += confidence
+                        counter[3] += 1
+                users[granularity].add((bucket, user_id))
+                sessions[granularity].add((bucket, session_id))
+        
+        for granularity in ('hourly', 'daily'):
+            cursor.executemany(f'''
+                INSERT INTO stats_{granularity} (bucket_start, messages, bot_messages, confidence_sum, confidence_count)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(bucket_start) DO UPDATE SET
+                    messages = messages + excluded.messages,
+                    bot_messages = bot_messages + excluded.bot_messages,
+                    confidence_sum = confidence_sum + excluded.confidence_sum,
+                    confidence_count = confidence_count + excluded.confidence_count
+            ''', [(bucket, *values) for bucket, values in counters[granularity].items()])
+            cursor.executemany(
+                f'INSERT OR IGNORE INTO stats_{granularity}_users (bucket_start, user_id) VALUES (?, ?)',
+                users[granularity]
+            )
+            cursor.executemany(
+                f'INSERT OR IGNORE INTO stats_{granularity}_sessions (bucket_start, session_id) VALUES (?, ?)',
+                sessions[granularity]
+            )
+    
+    def record_ticket_status(self, cursor, old_status: Optional[str], new_status: Optional[str]):
+        """
+        Move a ticket between status counters.
+        
+        Args:
+            cursor: Cursor inside the transaction that writes the ticket
+            old_status: Previous status, or None for a new ticket
+            new_status: New status, or None for a deleted ticket
+        """
+        if old_status == new_status:
+            return
+        if old_status is not None:
+            cursor.execute('UPDATE ticket_status_counts SET count = count - 1 WHERE status = ?', (old_status,))
+        if new_status is not None:
+            cursor.execute('''
+                INSERT INTO ticket_status_counts (status, count) VALUES (?, 1)
+                ON CONFLICT(status) DO UPDATE SET count = count + 1
+            ''', (new_status,))
+    
+    def read_statistics(self, cursor, start_ms: int, end_ms: int) -> Dict:
+        """
+        Summarize the hours from the one containing start_ms to the one containing end_ms.
+        
+        Args:
+            cursor: Database cursor
+            start_ms: Period start as epoch milliseconds
+            end_ms: Period end as epoch milliseconds
+            
+        Returns:
+            Dictionary with message, user, session, bot confidence and open
+            ticket figures
+        """
+        ranges = self._split_period(floor_to(start_ms, HOUR_MS), floor_to(end_ms, HOUR_MS))
+        
+        totals = [0, 0, 0.0, 0]
+        for table, low, high in ranges:
+            cursor.execute(f'''
+                SELECT COALESCE(SUM(messages), 0), COALESCE(SUM(bot_messages), 0),
+                       COALESCE(SUM(confidence_sum), 0), COALESCE(SUM(confidence_count), 0)
+                FROM stats_{table} WHERE bucket_start BETWEEN ? AND ?
+            ''', (low, high))
+            for i, value in enumerate(cursor.fetchone()):
+                totals[i] += value
+        
+        distinct = {}
+        for member, column in (('users', 'user_id'), ('sessions', 'session_id')):
+            union, params = self._members_query(ranges, member, column)
+            cursor.execute(f'SELECT COUNT(DISTINCT {column}) FROM ({union})', params)
+            distinct[member] = cursor.fetchone()[0]
+        
+        cursor.execute("SELECT COALESCE(SUM(count), 0) FROM ticket_status_counts WHERE status = 'open'")
+        open_tickets = cursor.fetchone()[0]
+        
+        return {
+            'total_messages': totals[0],
+            'unique_users': distinct['users'],
+            'total_conversations': distinct['sessions'],
+            'open_tickets': open_tickets,
+            'avg_confidence': totals[2] / totals[3] if totals[3] else 0.0,
+            'bot_messages': totals[1],
+            'confidence_sum': totals[2],
+            'confidence_count': totals[3]
+        }
+    
+    def read_session_ids(self, cursor, start_ms: int, end_ms: int) -> Set[str]:
+        """
+        Get the session IDs active in the period read_statistics covers.
+        
+        Lets sessions counted in several databases be merged into one
+        distinct count.
+        """
+        ranges = self._split_period(floor_to(start_ms, HOUR_MS), floor_to(end_ms, HOUR_MS))
+        union, params = self._members_query(ranges, 'sessions', 'session_id')
+        cursor.execute(union, params)
+        return {row[0] for row in cursor.fetchall()}
+    
+    @staticmethod
+    def _members_query(ranges: List[Tuple[str, int, int]], member: str, column: str) -> Tuple[str, List]:
+        """Select one member column from the user or session sets of every range."""
+        union = ' UNION ALL '.join(
+            f'SELECT {column} FROM stats_{table}_{member} WHERE bucket_start BETWEEN ? AND ?'
+            for table, _, _ in ranges
+        )
+        return union, [bound for _, low, high in ranges for bound in (low, high)]
+    
+    def _split_period(self, first_hour: int, last_hour: int) -> List[Tuple[str, int, int]]:
+        """Cover an hour range with daily buckets for whole days and hourly buckets at the edges."""
+        first_day = floor_to(first_hour + DAY_MS - 1, DAY_MS)
+        end_day = floor_to(last_hour + HOUR_MS, DAY_MS)
+        
+        if first_day >= end_day:
+            return [('hourly', first_hour, last_hour)]
+        
+        ranges = [('daily', first_day, end_day - DAY_MS)]
+        if first_hour < first_day:
+            ranges.append(('hourly', first_hour, first_day - HOUR_MS))
+        if end_day <= last_hour:
+            ranges.append(('hourly', end_day, last_hour))
+        return ranges
+    
+    def backfill(self, cursor, timestamp_ms_sql: str):
+        """
+        Rebuild the rollups from the conversations and tickets tables.
+        
+        Retention and archiving delete conversations but keep their
+        rollups, so statistics still cover purged periods. A backfill keeps
+        that history too: message buckets before the one holding the oldest
+        remaining conversation are left as they are, and in that boundary
+        bucket the larger of the kept and recounted figures wins, with user
+        and session sets merged. Everything after it, and the ticket status
+        counters, are rebuilt from the raw rows.
+        
+        Args:
+            cursor: Cursor inside a write transaction
+            timestamp_ms_sql: SQL expression giving a conversation row's
+                timestamp as epoch milliseconds
+        """
+        cursor.execute(f'SELECT MIN({timestamp_ms_sql}) FROM conversations')
+        oldest_ms = cursor.fetchone()[0]
+        
+        for granularity, bucket_ms in (('hourly', HOUR_MS), ('daily', DAY_MS)):
+            if oldest_ms is None:
+                # Nothing to recount; every bucket is history
+                continue
+            boundary = floor_to(oldest_ms, bucket_ms)
+            cursor.execute(f'''
+                SELECT messages, bot_messages, confidence_sum, confidence_count
+                FROM stats_{granularity} WHERE bucket_start = ?
+            ''', (boundary,))
+            kept = cursor.fetchone()
+            cursor.execute(f'DELETE FROM stats_{granularity} WHERE bucket_start >= ?', (boundary,))
+            for member in ('users', 'sessions'):
+                cursor.execute(f'DELETE FROM stats_{granularity}_{member} WHERE bucket_start > ?', (boundary,))
+            
+            bucket = f'({timestamp_ms_sql}) - ({timestamp_ms_sql}) % {bucket_ms}'
+            cursor.execute(f'''
+                INSERT INTO stats_{granularity} (bucket_start, messages, bot_messages, confidence_sum, confidence_count)
+                SELECT {bucket}, COUNT(*),
+                       SUM(sender = 'bot'),
+                       COALESCE(SUM(CASE WHEN sender = 'bot' THEN confidence END), 0),
+                       COUNT(CASE WHEN sender = 'bot' THEN confidence END)
+                FROM conversations GROUP BY 1
+            ''')
+            if kept is not None:
+                cursor.execute(f'''
+                    UPDATE stats_{granularity} SET
+                        messages = MAX(messages, ?), bot_messages = MAX(bot_messages, ?),
+                        confidence_sum = MAX(confidence_sum, ?), confidence_count = MAX(confidence_count, ?)
+                    WHERE bucket_start = ?
+                ''', (*kept, boundary))
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO stats_{granularity}_users (bucket_start, user_id)
+                SELECT DISTINCT {bucket}, user_id FROM conversations
+            ''')
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO stats_{granularity}_sessions (bucket_start, session_id)
+                SELECT DISTINCT {bucket}, session_id FROM conversations
+            ''')
+        
+        cursor.execute('DELETE FROM ticket_status_counts')
+        cursor.execute('''
+            INSERT INTO ticket_status_counts (status, count)
+            SELECT status, COUNT(*) FROM tickets WHERE status IS NOT NULL GROUP BY status
+        ''')
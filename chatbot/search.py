@@ -0,0 +1,299 @@
+"""
+Full-Text Search Module
+
+SQLite FTS5 indexes over conversation messages and ticket subjects and
+descriptions. The indexes are external-content tables: they store only
+the inverted index and read the text back from the source tables, and
+triggers keep them in step with every insert, update and delete.
+"""
+
+import re
+import sqlite3
+from typing import Dict, List, Optional
+
+# Source table, FTS table, key column, indexed columns
+FTS_TABLES = [
+    ('conversations', 'conversations_fts', 'id', ['message']),
+    ('tickets', 'tickets_fts', 'ticket_id', ['subject', 'description'])
+]
+
+CONVERSATION_COLUMNS = ['id', 'user_id', 'session_id', 'message', 'sender', 'timestamp', 'timestamp_ms', 'intent']
+TICKET_COLUMNS = ['ticket_id', 'user_id', 'subject', 'status', 'priority', 'category', 'created_at_ms', 'updated_at_ms']
+
+
+def fts5_available(cursor) -> bool:
+    """Check whether the SQLite library was built with FTS5."""
+    try:
+        cursor.execute("SELECT 1 FROM pragma_compile_options WHERE compile_options = 'ENABLE_FTS5'")
+        return cursor.fetchone() is not None
+    except sqlite3.Error:
+        return False
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query that matches every word.
+    
+    Words are quoted so punctuation and FTS5 operators in user input are
+    matched literally; a trailing ``*`` keeps prefix matching.
+    
+    Args:
+        query: Search text
+        
+    Returns:
+        FTS5 MATCH expression
+    """
+    terms = re.findall(r'\w+\*?', query)
+    if not terms:
+        raise ValueError("Search query has no words")
+    return ' '.join(
+        f'"{term[:-1]}"*' if term.endswith('*') else f'"{term}"'
+        for term in terms
+    )
+
+
+class FullTextSearch:
+    """
+    Creates, rebuilds and queries the FTS5 indexes.
+    
+    Computing BM25 ranks is the expensive part of a search, so a
+    conversation search without a user filter ranks only the newest
+    ``rank_window`` matches in the time range; a term that appears in a
+    large share of millions of messages then still takes milliseconds.
+    Older matches are reached window by window with the ``before_id``
+    keyset cursor. With a user filter every match of that user is ranked.
+    """
+    
+    def __init__(self, rank_window: int = 1000):
+        """
+        Initialize the search helper.
+        
+        Args:
+            rank_window: Newest matches ranked by unfiltered conversation searches
+        """
+        self.rank_window = max(int(rank_window), 1)
+    
+    def create_tables(self, cursor) -> bool:
+        """
+        Create the FTS tables and their sync triggers.
+        
+        Args:
+            cursor: Cursor inside a transaction
+            
+        Returns:
+            True if the tables were created and need a rebuild
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'conversations_fts'")
+        exists = cursor.fetchone() is not None
+        
+        for source, fts, key, columns in FTS_TABLES:
+            column_list = ', '.join(columns)
+            new_values = ', '.join(f'new.{column}' for column in columns)
+            old_values = ', '.join(f'old.{column}' for column in columns)
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                    {column_list}, content='{source}', content_rowid='{key}',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {source} BEGIN
+                    INSERT INTO {fts} (rowid, {column_list}) VALUES (new.{key}, {new_values});
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {source} BEGIN
+                    INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.{key}, {old_values});
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {column_list} ON {source} BEGIN
+                    INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.{key}, {old_values});
+                    INSERT INTO {fts} (rowid, {column_list}) VALUES (new.{key}, {new_values});
+                END
+            ''')
+        return not exists
+    
+    def rebuild(self, cursor, sources: Optional[List[str]] = None):
+        """
+        Rebuild FTS indexes from their source tables.
+        
+        Args:
+            cursor: Cursor inside a transaction
+            sources: Source tables to reindex; all of them by default
+        """
+        for source, fts, _, _ in FTS_TABLES:
+            if sources is None or source in sources:
+                cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+    
+    def search_conversations(self, cursor, query: str, user_id: Optional[str] = None,
+                             start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                             limit: int = 20, offset: int = 0, before_id: Optional[int] = None) -> Dict:
+        """
+        Search conversation messages, best matches first.
+        
+        Without a user filter only the newest ``rank_window`` matches are
+        ranked and paged through; ``truncated`` tells whether older matches
+        were left out, and ``next_before_id`` passed back as ``before_id``
+        ranks the next older window.
+        
+        Args:
+            cursor: Database cursor
+            query: Search text
+            user_id: Optional user filter
+            start_ms: Optional inclusive lower time bound
+            end_ms: Optional exclusive upper time bound
+            limit: Results per page
+            offset: Results to skip
+            before_id: Only search messages with a smaller id
+            
+        Returns:
+            Page dictionary with results, has_more, truncated, rank_window
+            (None when every match is ranked) and next_before_id
+        """
+        match = build_match_query(query)
+        columns = ', '.join('c.' + column for column in CONVERSATION_COLUMNS)
+        time_filter = ''
+        time_params: List = []
+        if start_ms is not None:
+            time_filter += ' AND timestamp_ms >= ?'
+            time_params.append(start_ms)
+        if end_ms is not None:
+            time_filter += ' AND timestamp_ms < ?'
+            time_params.append(end_ms)
+        # Keyset cursor: only messages older than before_id
+        id_filter = ' AND id < ?' if before_id is not None else ''
+        rowid_filter = ' AND conversations_fts.rowid < ?' if before_id is not None else ''
+        key_params = [before_id] if before_id is not None else []
+        
+        if user_id:
+            # The user's messages come from the history index; the unary +
+            # stops SQLite from running the full-text query once per rowid
+            page = self._search(cursor, f'''
+                SELECT {columns},
+                       bm25(conversations_fts) AS rank,
+                       snippet(conversations_fts, 0, '[', ']', '…', 12) AS snippet
+                FROM conversations_fts
+                JOIN conversations c ON c.id = conversations_fts.rowid
+                WHERE conversations_fts MATCH ?
+                  AND +conversations_fts.rowid IN (
+                      SELECT id FROM conversations WHERE user_id = ?{time_filter}{id_filter}
+                  )
+                ORDER BY rank, c.id DESC
+                LIMIT ? OFFSET ?
+            ''', [match, user_id] + time_params + key_params, CONVERSATION_COLUMNS, limit, offset)
+            page.update(rank_window=None, next_before_id=None)
+            return page
+        
+        # A rowid bound lets FTS5 start its scan at the cursor
+        time_filter += rowid_filter
+        time_params += key_params
+        
+        # The oldest match in the window and whether one follows it. Cheap,
+        # as nothing is ranked; the oldest id is the cursor to the next window
+        cursor.execute(f'''
+            SELECT conversations_fts.rowid
+            FROM conversations_fts
+            JOIN conversations ON conversations.id = conversations_fts.rowid
+            WHERE conversations_fts MATCH ?{time_filter}
+            ORDER BY conversations_fts.rowid DESC
+            LIMIT 2 OFFSET ?
+        ''', [match] + time_params + [self.rank_window - 1])
+        edge = cursor.fetchall()
+        truncated = len(edge) == 2
+        
+        # Matches stream newest first by rowid; only the window is ranked
+        page = self._search(cursor, f'''
+            SELECT {columns}, m.rank, m.snippet
+            FROM (
+                SELECT conversations_fts.rowid AS id,
+                       bm25(conversations_fts) AS rank,
+                       snippet(conversations_fts, 0, '[', ']', '…', 12) AS snippet
+                FROM conversations_fts
+                JOIN conversations ON conversations.id = conversations_fts.rowid
+                WHERE conversations_fts MATCH ?{time_filter}
+                ORDER BY conversations_fts.rowid DESC
+                LIMIT ?
+            ) m
+            JOIN conversations c ON c.id = m.id
+            ORDER BY m.rank, c.id DESC
+            LIMIT ? OFFSET ?
+        ''', [match] + time_params + [self.rank_window], CONVERSATION_COLUMNS, limit, offset, truncated)
+        page.update(rank_window=self.rank_window, next_before_id=edge[0][0] if truncated else None)
+        return page
+    
+    def search_tickets(self, cursor, query: str, user_id: Optional[str] = None,
+                       status: Optional[str] = None, start_ms: Optional[int] = None,
+                       end_ms: Optional[int] = None, limit: int = 20, offset: int = 0) -> Dict:
+        """
+        Search ticket subjects and descriptions, best matches first.
+        
+        Subject matches weigh twice as much as description matches.
+        
+        Args:
+            cursor: Database cursor
+            query: Search text
+            user_id: Optional user filter
+            status: Optional status filter
+            start_ms: Optional inclusive lower bound on creation time
+            end_ms: Optional exclusive upper bound on creation time
+            limit: Results per page
+            offset: Results to skip
+            
+        Returns:
+            Page dictionary with results, has_more and truncated
+        """
+        where = ['tickets_fts MATCH ?']
+        params: List = [build_match_query(query)]
+        if user_id:
+            where.append('t.user_id = ?')
+            params.append(user_id)
+        if status:
+            where.append('t.status = ?')
+            params.append(status)
+        if start_ms is not None:
+            where.append('t.created_at_ms >= ?')
+            params.append(start_ms)
+        if end_ms is not None:
+            where.append('t.created_at_ms < ?')
+            params.append(end_ms)
+        
+        return self._search(cursor, f'''
+            SELECT {', '.join('t.' + column for column in TICKET_COLUMNS)},
+                   bm25(tickets_fts, 2.0, 1.0) AS rank,
+                   snippet(tickets_fts, 1, '[', ']', '…', 12) AS snippet
+            FROM tickets_fts
+            JOIN tickets t ON t.ticket_id = tickets_fts.rowid
+            WHERE {' AND '.join(where)}
+            ORDER BY rank, t.ticket_id DESC
+            LIMIT ? OFFSET ?
+        ''', params, TICKET_COLUMNS, limit, offset)
+    
+    @staticmethod
+    def _search(cursor, sql: str, params: List, columns: List[str], limit: int, offset: int,
+                truncated: bool = False) -> Dict:
+        """
+        Run a search query, fetching one extra row to tell whether more pages exist.
+        
+        ``truncated`` marks a search that left matches out of the ranking, so
+        the last page does not mean every match was returned.
+        """
+        limit = max(int(limit), 1)
+        offset = max(int(offset), 0)
+        cursor.execute(sql, params + [limit + 1, offset])
+        rows = cursor.fetchall()
+        
+        results = []
+        for row in rows[:limit]:
+            result = dict(zip(columns, row))
+            result['rank'] = row[len(columns)]
+            result['snippet'] = row[len(columns) + 1]
+            results.append(result)
+        
+        return {
+            'results': results,
+            'has_more': len(rows) > limit,
+            'truncated': truncated,
+            'offset': offset,
+            'limit': limit
+        }
@@ -0,0 +1,411 @@
+"""
+Sharded Storage Module
+
+Spreads users across several SQLite files by a stable hash of the user ID.
+Each shard is a full DatabaseManager with its own connections and writer
+lock, so chat turns of users on different shards commit in parallel.
+Queries that are not scoped to one user fan out to every shard and merge
+the results.
+"""
+
+import heapq
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from .database import DatabaseManager
+from .export import EXPORT_COLUMNS, get_encoder
+from .importer import BulkImport, merge_stats, read_records
+
+
+def shard_for(user_id: str, shard_count: int) -> int:
+    """Map a user ID to a shard index; stable across processes and restarts."""
+    return zlib.crc32(user_id.encode('utf-8')) % shard_count
+
+
+class ShardedDatabaseManager:
+    """
+    DatabaseManager-compatible facade over N user-sharded databases.
+    
+    Ticket IDs are made globally unique by encoding the shard in them:
+    ``global_id = local_id * shard_count + shard``, so ``update_ticket_status``
+    can route by ID alone. The shard count is therefore fixed for the life
+    of the data; changing it requires moving users between files.
+    """
+    
+    def __init__(self, shard_count: int = 4, directory: str = "database/shards",
+                 pragmas: Optional[Dict] = None, statement_cache_size: int = 256):
+        """
+        Initialize the shards.
+        
+        Args:
+            shard_count: Number of database files
+            directory: Directory holding the shard files
+            pragmas: Pragma overrides for every shard
+            statement_cache_size: Prepared statements cached per connection
+        """
+        if shard_count < 1:
+            raise ValueError("shard_count must be at least 1")
+        
+        self.shard_count = shard_count
+        self.directory = directory
+        self.shards = [
+            DatabaseManager(os.path.join(directory, f"chatbot-{index}.db"), pragmas, statement_cache_size)
+            for index in range(shard_count)
+        ]
+        self._executor = ThreadPoolExecutor(max_workers=shard_count, thread_name_prefix="db-shard")
+        
+        print(f"🧩 Sharded storage with {shard_count} shards in {directory}")
+    
+    # Routing
+    
+    def shard(self, user_id: str) -> DatabaseManager:
+        """Get the shard that stores a user's data."""
+        return self.shards[shard_for(user_id, self.shard_count)]
+    
+    def _fan_out(self, call: Callable[[DatabaseManager], object]) -> List:
+        """Run a call on every shard in parallel and return the results in shard order."""
+        if self.shard_count == 1:
+            return [call(self.shards[0])]
+        return list(self._executor.map(call, self.shards))
+    
+    def _global_ticket_id(self, shard_index: int, ticket_id: int) -> int:
+        return ticket_id * self.shard_count + shard_index
+    
+    # Setup, applied to every shard
+    
+    def initialize_database(self, migration_progress=None):
+        """Initialize and migrate every shard."""
+        for shard in self.shards:
+            shard.initialize_database(migration_progress)
+    
+    def migrate(self, progress=None) -> int:
+        return min(shard.migrate(progress) for shard in self.shards)
+    
+    def enable_write_behind(self, **kwargs):
+        for shard in self.shards:
+            shard.enable_write_behind(**kwargs)
+    
+    def enable_counter_buffer(self, **kwargs):
+        for shard in self.shards:
+            shard.enable_counter_buffer(**kwargs)
+    
+    def enable_profile_cache(self, **kwargs):
+        for shard in self.shards:
+            shard.enable_profile_cache(**kwargs)
+    
+    def configure_column_codecs(self, **kwargs):
+        for shard in self.shards:
+            shard.configure_column_codecs(**kwargs)
+    
+    def enable_slow_query_log(self, **kwargs):
+        for shard in self.shards:
+            shard.enable_slow_query_log(**kwargs)
+    
+    def get_slow_queries(self) -> List[Dict]:
+        entries = [entry for shard in self.shards for entry in shard.get_slow_queries()]
+        return sorted(entries, key=lambda entry: entry['time'])
+    
+    def flush_counters(self):
+        self._fan_out(lambda shard: shard.flush_counters())
+    
+    def configure_retention(self, **kwargs):
+        for shard in self.shards:
+            shard.configure_retention(**kwargs)
+    
+    def enable_archive(self, directory: str = "database/archive", **kwargs):
+        for index, shard in enumerate(self.shards):
+            shard.enable_archive(os.path.join(directory, f"shard-{index}"), **kwargs)
+    
+    @property
+    def archive(self):
+        return self.shards[0].archive
+    
+    # User-scoped operations
+    
+    def store_message(self, user_id: str, *args, **kwargs):
+        return self.shard(user_id).store_message(user_id, *args, **kwargs)
+    
+    def get_conversation_history(self, user_id: str, *args, **kwargs) -> List[Dict]:
+        return self.shard(user_id).get_conversation_history(user_id, *args, **kwargs)
+    
+    def get_conversation_page(self, user_id: str, *args, **kwargs) -> Dict:
+        return self.shard(user_id).get_conversation_page(user_id, *args, **kwargs)
+    
+    def iter_archived_history(self, user_id: str, *args, **kwargs):
+        return self.shard(user_id).iter_archived_history(user_id, *args, **kwargs)
+    
+    def get_user_profile(self, user_id: str) -> Dict:
+        return self.shard(user_id).get_user_profile(user_id)
+    
+    def update_user_preferences(self, user_id: str, preferences: Dict) -> bool:
+        return self.shard(user_id).update_user_preferences(user_id, preferences)
+    
+    # Tickets
+    
+    def create_ticket(self, user_id: str, *args, **kwargs) -> int:
+        shard_index = shard_for(user_id, self.shard_count)
+        ticket_id = self.shards[shard_index].create_ticket(user_id, *args, **kwargs)
+        return self._global_ticket_id(shard_index, ticket_id)
+    
+    def update_ticket_status(self, ticket_id: int, status: str, assigned_to: str = None) -> bool:
+        shard_index = ticket_id % self.shard_count
+        return self.shards[shard_index].update_ticket_status(ticket_id // self.shard_count, status, assigned_to)
+    
+    def get_tickets(self, user_id: str = None, status: str = None, limit: int = 50) -> List[Dict]:
+        """
+        Get support tickets, newest first.
+        
+        With a user filter only that user's shard is read; otherwise every
+        shard returns its newest ``limit`` tickets and the lists are merged.
+        
+        Args:
+            user_id: Optional user filter
+            status: Optional status filter
+            limit: Maximum number of tickets to return
+            
+        Returns:
+            List of tickets with global ticket IDs
+        """
+        if user_id:
+            shard_index = shard_for(user_id, self.shard_count)
+            per_shard = [(shard_index, self.shards[shard_index].get_tickets(user_id, status, limit))]
+        else:
+            per_shard = list(enumerate(self._fan_out(lambda shard: shard.get_tickets(None, status, limit))))
+        
+        for shard_index, tickets in per_shard:
+            for ticket in tickets:
+                ticket['ticket_id'] = self._global_ticket_id(shard_index, ticket['ticket_id'])
+        
+        merged = heapq.merge(
+            *(tickets for _, tickets in per_shard),
+            key=lambda ticket: (ticket['created_at_ms'] or 0, ticket['ticket_id']),
+            reverse=True
+        )
+        return list(islice(merged, limit))
+    
+    # Export
+    
+    def iter_conversations(self, user_id: str = None, start_ms: int = None, end_ms: int = None,
+                           chunk_size: int = 1000) -> Iterator[List[tuple]]:
+        """
+        Walk every shard's conversations merged into one timestamp order.
+        
+        Row IDs are local to their shard, so they are not unique across
+        the export.
+        """
+        if user_id:
+            yield from self.shard(user_id).iter_conversations(user_id, start_ms, end_ms, chunk_size)
+            return
+        
+        timestamp_index = EXPORT_COLUMNS.index('timestamp_ms')
+        merged = heapq.merge(
+            *(chain.from_iterable(shard.iter_conversations(None, start_ms, end_ms, chunk_size))
+              for shard in self.shards),
+            key=lambda row: row[timestamp_index]
+        )
+        while True:
+            rows = list(islice(merged, chunk_size))
+            if not rows:
+                return
+            yield rows
+    
+    def export_conversations(self, fmt: str = 'jsonl', user_id: str = None, start_ms: int = None,
+                             end_ms: int = None, chunk_size: int = 1000) -> Iterator[bytes]:
+        return get_encoder(fmt)(self.iter_conversations(user_id, start_ms, end_ms, chunk_size))
+    
+    # Search
+    
+    def _search(self, user_id: Optional[str], search: Callable, limit: int, offset: int,
+                ticket_ids: bool = False) -> Dict:
+        """
+        Run a search on the user's shard, or on every shard merged by rank.
+        
+        Every shard returns its best ``offset + limit`` matches; BM25 ranks
+        are computed per shard, so the merged order is approximate.
+        """
+        limit = max(int(limit), 1)
+        offset = max(int(offset), 0)
+        if user_id:
+            shard_indexes = [shard_for(user_id, self.shard_count)]
+            pages = [search(self.shards[shard_indexes[0]], offset + limit)]
+        else:
+            shard_indexes = list(range(self.shard_count))
+            pages = self._fan_out(lambda shard: search(shard, offset + limit))
+        
+        if ticket_ids:
+            for shard_index, page in zip(shard_indexes, pages):
+                for result in page['results']:
+                    result['ticket_id'] = self._global_ticket_id(shard_index, result['ticket_id'])
+        
+        merged = heapq.merge(*(page['results'] for page in pages), key=lambda result: result['rank'])
+        results = list(islice(merged, offset + limit + 1))
+        return {
+            'results': results[offset:offset + limit],
+            'has_more': len(results) > offset + limit or any(page['has_more'] for page in pages),
+            'truncated': any(page['truncated'] for page in pages),
+            'offset': offset,
+            'limit': limit
+        }
+    
+    def search_conversations(self, query: str, user_id: str = None, start_ms: int = None,
+                             end_ms: int = None, limit: int = 20, offset: int = 0,
+                             before: str = None) -> Dict:
+        """
+        Search conversations on the user's shard, or on every shard merged by rank.
+        
+        Each shard ranks its own window, so the cursor holds one position
+        per shard, joined with dots; a shard with no older matches left
+        gets position 0.
+        """
+        positions = before.split('.') if before else [None] * self.shard_count
+        if len(positions) != self.shard_count:
+            raise ValueError("Invalid search cursor")
+        shard_pages = {}
+        
+        def search(shard: DatabaseManager, count: int) -> Dict:
+            index = self.shards.index(shard)
+            shard_pages[index] = shard.search_conversations(
+                query, user_id, start_ms, end_ms, count, 0, positions[index])
+            return shard_pages[index]
+        
+        page = self._search(user_id, search, limit, offset)
+        page['rank_window'] = next(iter(shard_pages.values()))['rank_window']
+        page['next_before'] = None
+        if any(shard_page['next_before'] for shard_page in shard_pages.values()):
+            page['next_before'] = '.'.join(
+                (shard_pages[index]['next_before'] if index in shard_pages else None) or '0'
+                for index in range(self.shard_count)
+            )
+        return page
+    
+    def search_tickets(self, query: str, user_id: str = None, status: str = None,
+                       start_ms: int = None, end_ms: int = None, limit: int = 20,
+                       offset: int = 0) -> Dict:
+        return self._search(user_id, lambda shard, count: shard.search_tickets(
+            query, user_id, status, start_ms, end_ms, count, 0), limit, offset, ticket_ids=True)
+    
+    def rebuild_search_index(self):
+        self._fan_out(lambda shard: shard.rebuild_search_index())
+    
+    # Fan-out reads and maintenance
+    
+    def get_statistics(self, days: int = 30) -> Dict:
+        """
+        Get usage statistics across all shards.
+        
+        Users live on exactly one shard, so per-shard user counts add up
+        to the global distinct count. A session ID may be used by users on
+        different shards, so session sets are merged before counting.
+        
+        Args:
+            days: Number of days to analyze
+            
+        Returns:
+            Statistics dictionary
+        """
+        totals = {}
+        sessions = set()
+        for shard_totals in self._fan_out(lambda shard: shard.get_statistics_totals(days, session_ids=True)):
+            sessions.update(shard_totals.pop('session_ids'))
+            for key, value in shard_totals.items():
+                totals[key] = totals.get(key, 0) + value
+        totals['total_conversations'] = len(sessions)
+        count = totals.get('confidence_count', 0)
+        totals['avg_confidence'] = totals.get('confidence_sum', 0.0) / count if count else 0.0
+        return DatabaseManager.summarize_statistics(days, totals)
+    
+    def backfill_rollups(self):
+        self._fan_out(lambda shard: shard.backfill_rollups())
+    
+    def rebuild_user_counters(self):
+        self._fan_out(lambda shard: shard.rebuild_user_counters())
+    
+    def bulk_import(self, records: Iterable[Dict], nlp=None, batch_size: int = 10000,
+                    defer_indexes: bool = True, progress=None) -> Dict:
+        """
+        Load records with one bulk import per shard, routed by user ID.
+        
+        Records without a user ID go to the first shard, which skips them.
+        """
+        jobs: List[BulkImport] = []
+        
+        def report(_):
+            if progress is not None:
+                progress(merge_stats([job.get_stats() for job in jobs]))
+        
+        jobs.extend(BulkImport(shard, nlp, batch_size, defer_indexes, report) for shard in self.shards)
+        
+        for job in jobs:
+            job.start()
+        failed = True
+        try:
+            for raw in records:
+                user_id = raw.get('user_id')
+                jobs[shard_for(user_id, self.shard_count) if isinstance(user_id, str) else 0].add(raw)
+            failed = False
+        finally:
+            for job in jobs:
+                job.finish(write_pending=not failed)
+        return merge_stats([job.get_stats() for job in jobs])
+    
+    def import_conversations(self, stream: TextIO, fmt: str = 'jsonl', **options) -> Dict:
+        return self.bulk_import(read_records(stream, fmt), **options)
+    
+    def run_retention(self, policies: Optional[Dict] = None, background: bool = False) -> Dict:
+        for shard in self.shards:
+            shard.run_retention(policies, background)
+        return self.get_retention_status()
+    
+    def get_retention_status(self) -> Dict:
+        """Get retention progress of every shard with summed counts."""
+        shards = [shard.get_retention_status() for shard in self.shards]
+        states = {status['state'] for status in shards}
+        for state in ('running', 'failed', 'cancelled', 'completed', 'idle'):
+            if state in states:
+                break
+        return {
+            'state': state,
+            'total_deleted': sum(status.get('total_deleted', 0) for status in shards),
+            'shards': shards
+        }
+    
+    def cleanup_old_data(self, days: int = 90) -> int:
+        return sum(self._fan_out(lambda shard: shard.cleanup_old_data(days)))
+    
+    def archive_old_data(self, days: int = None) -> Dict:
+        results = self._fan_out(lambda shard: shard.archive_old_data(days))
+        return {
+            'archived': sum(result['archived'] for result in results),
+            'segments': sorted({segment for result in results for segment in result['segments']})
+        }
+    
+    def vacuum(self):
+        for shard in self.shards:
+            shard.vacuum()
+    
+    def health_check(self) -> Dict:
+        """Perform health check on every shard."""
+        shards = self._fan_out(lambda shard: shard.health_check())
+        statistics = {}
+        for shard in shards:
+            for key, value in shard.get('statistics', {}).items():
+                statistics[key] = statistics.get(key, 0) + value
+        hits = sum(shard.get('profile_cache', {}).get('hits', 0) for shard in shards)
+        lookups = hits + sum(shard.get('profile_cache', {}).get('misses', 0) for shard in shards)
+        return {
+            'status': 'healthy' if all(shard['status'] == 'healthy' for shard in shards) else 'error',
+            'shard_count': self.shard_count,
+            'database_path': self.directory,
+            'statistics': statistics,
+            'profile_cache_hit_ratio': round(hits / lookups, 3) if lookups else 0.0,
+            'shards': shards
+        }
+    
+    def close(self):
+        """Close every shard."""
+        for shard in self.shards:
+            shard.close()
+        self._executor.shutdown(wait=True)
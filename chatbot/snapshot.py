@@ -0,0 +1,105 @@
+"""
+Model Snapshot Module
+
+Saves and loads a versioned snapshot of the fitted NLP model so that worker
+processes can start without refitting the vectorizer or recompiling the
+keyword rule tables.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from typing import Dict, Iterable, Optional
+
+# Bump whenever the snapshot layout or the model building code changes
+SNAPSHOT_VERSION = 1
+
+
+def compute_source_hash(source_files: Iterable[str], extra: str = "") -> str:
+    """
+    Hash the data a model snapshot is built from.
+    
+    Args:
+        source_files: Data files the model is built from; missing files are
+            hashed as missing so that creating them invalidates the snapshot
+        extra: Additional build settings to include in the hash
+        
+    Returns:
+        Hex digest identifying the snapshot sources
+    """
+    digest = hashlib.sha256()
+    digest.update(f"snapshot-v{SNAPSHOT_VERSION}".encode('utf-8'))
+    
+    for path in source_files:
+        digest.update(b"\0" + os.path.basename(path).encode('utf-8') + b"\0")
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b""):
+                    digest.update(chunk)
+        except FileNotFoundError:
+            digest.update(b"<missing>")
+    
+    digest.update(extra.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def save_snapshot(snapshot_file: str, source_hash: str, model: Dict):
+    """
+    Atomically write a model snapshot.
+    
+    Args:
+        snapshot_file: Destination path
+        source_hash: Hash of the sources the model was built from
+        model: Picklable model state
+    """
+    directory = os.path.dirname(snapshot_file) or '.'
+    os.makedirs(directory, exist_ok=True)
+    
+    payload = {
+        'version': SNAPSHOT_VERSION,
+        'source_hash': source_hash,
+        'created_at': time.time(),
+        'model': model
+    }
+    
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_file)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_snapshot(snapshot_file: str, source_hash: str) -> Optional[Dict]:
+    """
+    Load a model snapshot if it is current.
+    
+    Snapshots are pickles, so only load files produced by this application.
+    
+    Args:
+        snapshot_file: Snapshot path
+        source_hash: Hash of the current sources
+        
+    Returns:
+        Model state, or None if the snapshot is missing, stale or unreadable
+    """
+    try:
+        with open(snapshot_file, 'rb') as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error loading model snapshot: {e}")
+        return None
+    
+    if not isinstance(payload, dict):
+        return None
+    if payload.get('version') != SNAPSHOT_VERSION or payload.get('source_hash') != source_hash:
+        return None
+    
+    return payload.get('model')
@@ -0,0 +1,256 @@
+"""
+Write-behind Queue Module
+
+Buffers database writes in a bounded in-memory queue and commits them from
+a background thread in batches, so request threads do not wait for
+transaction commits.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# Queue markers
+_FLUSH = object()
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue drained by a writer thread that commits records in groups.
+    
+    Records are handed to ``write_batch`` in submission order, at most
+    ``batch_size`` at a time, at least every ``flush_interval_ms``. When the
+    queue is full, ``submit`` blocks until the writer catches up. Each record
+    may carry a key (such as a user id) so readers can wait for that key's
+    pending writes with ``wait_for``.
+    """
+    
+    def __init__(self, write_batch: Callable[[List[Any]], None],
+                 flush_interval_ms: float = 50.0, batch_size: int = 256,
+                 max_queue_size: int = 10000, name: str = "write-behind",
+                 on_failure: Optional[Callable[[List[Any]], None]] = None):
+        """
+        Initialize the queue and start its writer thread.
+        
+        Args:
+            write_batch: Callable that durably writes a list of records in
+                one transaction
+            flush_interval_ms: Longest time a record waits before its batch
+                is written
+            batch_size: Maximum number of records per transaction
+            max_queue_size: Number of queued records before submit blocks
+            name: Writer thread name
+            on_failure: Optional callable receiving the records that could
+                not be written
+        """
+        self.write_batch = write_batch
+        self.on_failure = on_failure
+        self.flush_interval = max(flush_interval_ms, 0.0) / 1000.0
+        self.batch_size = max(int(batch_size), 1)
+        self.max_queue_size = max(int(max_queue_size), 1)
+        
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._closed = False
+        self._submit_lock = threading.Lock()
+        self._committed = threading.Condition()
+        self._submitted_seq = 0
+        self._committed_seq = 0
+        self._pending_keys: Dict[Hashable, int] = {}
+        self._stats = {
+            'submitted': 0,
+            'written': 0,
+            'batches': 0,
+            'failed': 0,
+            'backpressure_waits': 0,
+            'max_batch_seen': 0
+        }
+        
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+    
+    def submit(self, record: Any, key: Optional[Hashable] = None):
+        """
+        Queue a record for the next batch, blocking while the queue is full.
+        
+        Args:
+            record: Record passed to write_batch
+            key: Optional key readers can wait on with wait_for
+        """
+        # Sequence numbers must follow queue order, and nothing may follow the stop marker
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("WriteBehindQueue is closed")
+            self._submitted_seq += 1
+            seq = self._submitted_seq
+            if key is not None:
+                with self._committed:
+                    self._pending_keys[key] = seq
+            
+            try:
+                self._queue.put_nowait((seq, key, record))
+            except queue.Full:
+                with self._committed:
+                    self._stats['backpressure_waits'] += 1
+                self._queue.put((seq, key, record))
+        
+        with self._committed:
+            self._stats['submitted'] += 1
+    
+    def has_pending(self, key: Hashable) -> bool:
+        """Check whether a key has records that are not committed yet."""
+        with self._committed:
+            return key in self._pending_keys
+    
+    def wait_for(self, key: Hashable, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every record submitted for a key is committed.
+        
+        Args:
+            key: Record key
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            True if the key has no pending records
+        """
+        with self._committed:
+            seq = self._pending_keys.get(key)
+        if seq is None:
+            return True
+        return self._wait_for_seq(seq, timeout)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write everything submitted so far without waiting for the interval.
+        
+        Args:
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            True if all submitted records are committed
+        """
+        with self._submit_lock:
+            seq = self._submitted_seq
+        return self._wait_for_seq(seq, timeout)
+    
+    def _wait_for_seq(self, seq: int, timeout: Optional[float]) -> bool:
+        """Ask the writer to flush and wait until ``seq`` is committed."""
+        with self._committed:
+            if self._committed_seq >= seq:
+                return True
+        
+        if self._worker.is_alive():
+            self._queue.put(_FLUSH)
+        
+        with self._committed:
+            return self._committed.wait_for(lambda: self._committed_seq >= seq, timeout)
+    
+    def close(self, timeout: Optional[float] = None):
+        """Stop accepting records, write everything queued and stop the writer."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._worker.join(timeout)
+    
+    def _run(self):
+        """Writer loop: gather a batch, write it, mark it committed."""
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                self._drain()
+                return
+            if entry is _FLUSH:
+                continue
+            
+            batch = [entry]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _FLUSH:
+                    # Write what is queued now instead of waiting for the interval
+                    deadline = 0
+                    continue
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+            
+            self._write(batch)
+            
+            if stop:
+                self._drain()
+                return
+    
+    def _drain(self):
+        """Write everything left in the queue."""
+        batch = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _FLUSH or entry is _STOP:
+                continue
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+    
+    def _write(self, batch: List):
+        """Write one batch, falling back to single records if the batch fails."""
+        records = [record for _, _, record in batch]
+        failed = []
+        
+        try:
+            self.write_batch(records)
+        except Exception as e:
+            print(f"Error writing batch of {len(records)} records: {e}")
+            # Isolate bad records so the rest of the batch is still written
+            for record in records:
+                try:
+                    self.write_batch([record])
+                except Exception as record_error:
+                    failed.append(record)
+                    print(f"Error writing record: {record_error}")
+        
+        if failed and self.on_failure is not None:
+            try:
+                self.on_failure(failed)
+            except Exception as e:
+                print(f"Error handling failed records: {e}")
+        
+        with self._committed:
+            self._committed_seq = batch[-1][0]
+            for seq, key, _ in batch:
+                if key is not None and self._pending_keys.get(key) == seq:
+                    del self._pending_keys[key]
+            
+            self._stats['batches'] += 1
+            self._stats['written'] += len(batch) - len(failed)
+            self._stats['failed'] += len(failed)
+            self._stats['max_batch_seen'] = max(self._stats['max_batch_seen'], len(batch))
+            self._committed.notify_all()
+    
+    def get_stats(self) -> Dict:
+        """Get write-behind statistics."""
+        with self._committed:
+            stats = dict(self._stats)
+            stats['pending'] = self._submitted_seq - self._committed_seq
+        
+        stats['avg_batch_size'] = round(stats['written'] / max(stats['batches'], 1), 2)
+        stats['queued'] = self._queue.qsize()
+        stats['flush_interval_ms'] = self.flush_interval * 1000.0
+        stats['batch_size'] = self.batch_size
+        stats['max_queue_size'] = self.max_queue_size
+        return stats
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Database Maintenance Script
+
+Runs maintenance tasks against the chatbot database. When the
+database.sharding settings in --config (data/config.json by default) enable
+sharding, every task runs on all shards and --db is ignored. Column codecs
+come from database.column_codecs in the same file.
+
+Usage:
+    python manage_db.py migrate [--batch-size 5000] [--db database/chatbot.db]
+    python manage_db.py backfill-rollups [--db database/chatbot.db]
+    python manage_db.py cleanup [--days 90] [--db database/chatbot.db]
+    python manage_db.py vacuum [--db database/chatbot.db]
+    python manage_db.py archive [--days 30] [--directory database/archive] [--db database/chatbot.db]
+    python manage_db.py rebuild-search [--db database/chatbot.db]
+    python manage_db.py export [--format jsonl|csv|parquet] [--output -] [--user USER_ID] [--db database/chatbot.db]
+    python manage_db.py import FILE [--format jsonl|csv] [--nlp] [--batch-size 10000] [--db database/chatbot.db]
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import time
+from typing import Dict, List
+
+from chatbot.database import DatabaseManager
+from chatbot.export import EXPORT_FORMATS
+from chatbot.importer import IMPORT_FORMATS
+from chatbot.sharding import ShardedDatabaseManager
+
+
+def load_config(path: str) -> Dict:
+    """Load the chatbot configuration; a missing file means the defaults."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def open_database(args):
+    """
+    Open the database the chatbot uses: all shards when sharding is
+    enabled, else --db. Column codecs follow the configuration, so
+    migrations and imports write the encodings the chatbot writes.
+    """
+    db_config = load_config(args.config).get('database', {})
+    sharding_config = db_config.get('sharding', {})
+    if sharding_config.get('enabled', False):
+        db = ShardedDatabaseManager(
+            shard_count=sharding_config.get('shards', 4),
+            directory=sharding_config.get('directory', 'database/shards')
+        )
+    else:
+        db = DatabaseManager(args.db)
+    codec_config = db_config.get('column_codecs', {})
+    db.configure_column_codecs(
+        entities=codec_config.get('entities', 'compact'),
+        sentiment=codec_config.get('sentiment', 'struct')
+    )
+    return db
+
+
+def databases(db) -> List[DatabaseManager]:
+    """The shards of a sharded database, or the database itself."""
+    return getattr(db, 'shards', [db])
+
+
+def migrate(db: DatabaseManager, args) -> bool:
+    """Apply pending schema migrations, printing backfill progress."""
+    for target in databases(db):
+        target.migrator.batch_size = args.batch_size
+        print(f"{target.db_path}: schema version {target.migrator.current_version()}, "
+              f"{len(target.migrator.pending())} migration(s) pending...")
+    start = time.perf_counter()
+    
+    def report(progress):
+        print(f"  v{progress['version']} {progress['table']}.{progress['column']}: {progress['rows']} rows")
+    
+    db.initialize_database(migration_progress=report)
+    version = min(target.migrator.current_version() for target in databases(db))
+    print(f"✓ Schema version {version} in {time.perf_counter() - start:.2f}s")
+    return True
+
+
+def backfill_rollups(db: DatabaseManager, args) -> bool:
+    """Rebuild the statistics rollups from the raw tables, keeping purged history."""
+    db.initialize_database()
+    print("Backfilling statistics rollups...")
+    start = time.perf_counter()
+    db.backfill_rollups()
+    print(f"✓ Rollups rebuilt in {time.perf_counter() - start:.2f}s")
+    return True
+
+
+def cleanup(db: DatabaseManager, args) -> bool:
+    """Run the retention policies in batches and report what was deleted."""
+    db.initialize_database()
+    policies = {'conversations': {'days': args.days}} if args.days is not None else None
+    statuses = [target.run_retention(policies) for target in databases(db)]
+    deleted = {}
+    for status in statuses:
+        for table, count in status['deleted'].items():
+            deleted[table] = deleted.get(table, 0) + count
+    for table, count in deleted.items():
+        print(f"  {table}: {count} rows deleted")
+    states = {status['state'] for status in statuses}
+    state = 'completed' if states == {'completed'} else ', '.join(sorted(states))
+    print(f"✓ Retention {state}, {sum(status['pages_vacuumed'] for status in statuses)} pages reclaimed")
+    return state == 'completed'
+
+
+def vacuum(db: DatabaseManager, args) -> bool:
+    """Rebuild the database file with incremental auto-vacuum enabled."""
+    db.initialize_database()
+    print("Vacuuming database (blocks writers until done)...")
+    start = time.perf_counter()
+    db.vacuum()
+    print(f"✓ Vacuumed in {time.perf_counter() - start:.2f}s")
+    return True
+
+
+def archive(db: DatabaseManager, args) -> bool:
+    """Move aged conversations into compressed daily segments."""
+    db.initialize_database()
+    db.enable_archive(args.directory, after_days=args.days, batch_size=args.batch_size)
+    start = time.perf_counter()
+    result = db.archive_old_data()
+    print(f"✓ Archived {result['archived']} rows into {len(result['segments'])} segments "
+          f"in {time.perf_counter() - start:.2f}s")
+    return True
+
+
+def rebuild_search(db: DatabaseManager, args) -> bool:
+    """Rebuild the full-text search indexes."""
+    db.initialize_database()
+    if not all(target.search_enabled for target in databases(db)):
+        print("✗ SQLite was built without FTS5")
+        return False
+    print("Rebuilding full-text search indexes...")
+    start = time.perf_counter()
+    db.rebuild_search_index()
+    print(f"✓ Search indexes rebuilt in {time.perf_counter() - start:.2f}s")
+    return True
+
+
+def export(db: DatabaseManager, args) -> bool:
+    """Stream conversations to a file or stdout."""
+    db.initialize_database()
+    try:
+        chunks = db.export_conversations(args.format, args.user, args.start_ms, args.end_ms, args.chunk_size)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return False
+    
+    start = time.perf_counter()
+    size = 0
+    # main() points sys.stdout at stderr while exporting to stdout
+    output = sys.__stdout__.buffer if args.output == '-' else open(args.output, 'wb')
+    try:
+        for data in chunks:
+            output.write(data)
+            size += len(data)
+        output.flush()
+    finally:
+        if output is not sys.__stdout__.buffer:
+            output.close()
+    print(f"✓ Exported {size} bytes of {args.format} in {time.perf_counter() - start:.2f}s")
+    return True
+
+
+def import_transcripts(db: DatabaseManager, args) -> bool:
+    """Bulk load conversations from a JSON Lines or CSV file, or stdin."""
+    db.initialize_database()
+    fmt = args.format or ('csv' if args.file.lower().endswith('.csv') else 'jsonl')
+    nlp = None
+    if args.nlp:
+        from chatbot.nlp import NLPProcessor
+        nlp = NLPProcessor(cache_size=0)
+    
+    def report(stats):
+        print(f"  {stats['imported']} imported, {stats['skipped']} skipped")
+    
+    stream = sys.stdin if args.file == '-' else open(args.file, 'r', encoding='utf-8', newline='')
+    try:
+        stats = db.import_conversations(stream, fmt, nlp=nlp, batch_size=args.batch_size,
+                                        defer_indexes=not args.keep_indexes, progress=report)
+    except ValueError as e:
+        print(f"✗ Import stopped: {e}")
+        return False
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    
+    for error in stats['errors']:
+        print(f"  skipped {error}")
+    print(f"✓ Imported {stats['imported']} messages for {stats['users']} users "
+          f"({stats['skipped']} skipped, {stats['analyzed']} analyzed) in {stats['seconds']:.2f}s")
+    return True
+
+
+def add_migrate_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--batch-size', type=int, default=5000, help="Rows backfilled per transaction")
+
+
+def add_cleanup_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--days', type=int, default=None, help="Conversation retention in days")
+
+
+def add_archive_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--days', type=int, default=30, help="Archive conversations older than N days")
+    parser.add_argument('--directory', default='database/archive', help="Segment directory")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Rows archived per transaction")
+
+
+def add_export_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='jsonl', help="Output format")
+    parser.add_argument('--output', default='-', help="Output file, or - for stdout")
+    parser.add_argument('--user', default=None, help="Only export this user's conversations")
+    parser.add_argument('--start-ms', type=int, default=None, help="Inclusive lower time bound (epoch ms)")
+    parser.add_argument('--end-ms', type=int, default=None, help="Exclusive upper time bound (epoch ms)")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="Rows read per query")
+
+
+def add_import_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('file', help="Transcript file, or - for stdin")
+    parser.add_argument('--format', choices=list(IMPORT_FORMATS), default=None,
+                        help="Input format (default: from the file extension)")
+    parser.add_argument('--nlp', action='store_true', help="Classify user messages that have no intent")
+    parser.add_argument('--batch-size', type=int, default=10000, help="Rows written per transaction")
+    parser.add_argument('--keep-indexes', action='store_true',
+                        help="Keep indexes during the load (faster for small imports into large databases)")
+
+
+# name: (handler, help, argument setup)
+COMMANDS = {
+    'migrate': (migrate, "Apply pending schema migrations in small transactions", add_migrate_arguments),
+    'backfill-rollups': (backfill_rollups,
+                         "Rebuild statistics rollups from conversations and tickets; buckets older than the "
+                         "oldest remaining conversation are kept, so purged or archived periods still count", None),
+    'cleanup': (cleanup, "Delete expired rows according to the retention policies", add_cleanup_arguments),
+    'vacuum': (vacuum, "Rebuild the database with incremental auto-vacuum enabled", None),
+    'archive': (archive, "Move aged conversations into compressed daily segments", add_archive_arguments),
+    'rebuild-search': (rebuild_search, "Rebuild the full-text search indexes", None),
+    'export': (export, "Stream conversations as JSON Lines, CSV or Parquet", add_export_arguments),
+    'import': (import_transcripts, "Bulk load conversation transcripts from JSON Lines or CSV", add_import_arguments)
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Chatbot database maintenance")
+    parser.add_argument('--db', default='database/chatbot.db', help="Path to the SQLite database")
+    parser.add_argument('--config', default='data/config.json',
+                        help="Chatbot configuration; its database.sharding and column_codecs settings apply")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (_, help_text, add_arguments) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        if add_arguments is not None:
+            add_arguments(subparser)
+    
+    args = parser.parse_args(argv)
+    # Keep status messages out of data written to stdout
+    quiet = getattr(args, 'output', None) == '-'
+    with contextlib.redirect_stdout(sys.stderr) if quiet else contextlib.nullcontext():
+        db = open_database(args)
+        try:
+            handler = COMMANDS[args.command][0]
+            return 0 if handler(db, args) else 1
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the NLP analysis cache.
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.cache import TTLCache
+from chatbot.nlp import NLPProcessor
+
+
+def test_cached_results_match_uncached():
+    """Cached analyses must be identical to freshly computed ones."""
+    
+    print("🧪 Testing NLP Analysis Cache")
+    print("=" * 50)
+    
+    cached_nlp = NLPProcessor()
+    uncached_nlp = NLPProcessor(cache_size=0)
+    
+    messages = ["Hello there!", "hello there", "HELLO THERE?", "My order #123 is broken", "Hello there!"]
+    for _ in range(2):
+        for message in messages:
+            assert cached_nlp.process_message(message) == uncached_nlp.process_message(message), message
+    
+    stats = cached_nlp.health_check()['analysis_cache']
+    assert stats['hits'] > 0
+    assert stats['size'] == 2
+    assert uncached_nlp.health_check()['analysis_cache'] == {'enabled': False}
+    
+    # Results handed out from the cache must not share mutable state
+    first = cached_nlp.process_message("Hello there!")
+    first['tokens'].append('mutated')
+    assert 'mutated' not in cached_nlp.process_message("Hello there!")['tokens']
+    
+    print("✅ SUCCESS: Cached results match uncached results!")
+
+
+def test_reload_invalidates_cache():
+    """Reloading intents or keyword rules must drop cached analyses."""
+    nlp = NLPProcessor()
+    nlp.process_message("What are your business hours?")
+    assert len(nlp.analysis_cache) == 1
+    
+    nlp.reload_intents()
+    assert len(nlp.analysis_cache) == 0
+    
+    nlp.process_message("What are your business hours?")
+    nlp.keyword_rules.reload()
+    assert len(nlp.analysis_cache) == 0
+    assert nlp.analysis_cache.get_stats()['invalidations'] == 2
+
+
+def test_ttl_cache_expiry_and_eviction():
+    """TTLCache evicts least recently used entries and expires old ones."""
+    cache = TTLCache(max_size=2, ttl=0.05)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1
+    
+    time.sleep(0.06)
+    assert cache.get('a') is None
+    
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1
+    assert stats['expirations'] >= 1
+
+
+if __name__ == "__main__":
+    test_cached_results_match_uncached()
+    test_reload_invalidates_cache()
+    test_ttl_cache_expiry_and_eviction()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the compressed conversation archive.
+"""
+
+import sys
+import os
+import gzip
+import shutil
+import sqlite3
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.archive import ARCHIVE_COLUMNS
+from chatbot.database import DatabaseManager
+
+DAY_MS = 86400000
+
+
+def test_archive_and_stream_back():
+    """Aged rows leave the hot table and stream back unchanged."""
+    
+    print("🧪 Testing Conversation Archive")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        db.enable_archive(os.path.join(tmp_dir, 'archive'), after_days=30, batch_size=7)
+        now_ms = db._now_ms()
+        base_ms = (now_ms - 40 * DAY_MS) // DAY_MS * DAY_MS
+        
+        records = []
+        for i in range(30):
+            user_id = f'user{i % 3}'
+            records.append((user_id, f'session{i % 2}', f'old {i} ✓', 'bot' if i % 2 else 'user',
+                            base_ms + (i % 4) * DAY_MS + i * 1000, 'greeting', 0.5,
+                            '{"email": ["a@b.c"]}', '{"compound": 0.1}'))
+        records.append(('user0', 'session0', 'recent', 'user', now_ms, None, None, None, None))
+        db._write_message_batch(records)
+        expected = db.get_conversation_history('user0', limit=100)[:-1]
+        
+        result = db.archive_old_data()
+        assert result['archived'] == 30
+        assert len(result['segments']) == 4
+        assert [m['message'] for m in db.get_conversation_history('user0', limit=100)] == ['recent']
+        
+        archived = list(db.iter_archived_history('user0'))
+        assert [r['message'] for r in archived] == [m['message'] for m in expected]
+        assert archived[0]['entities'] == {'email': ['a@b.c']}
+        assert archived[0]['timestamp'] == expected[0]['timestamp']
+        
+        # The index limits which segments are read
+        cursor = db.connections.connection().cursor()
+        cursor.execute("SELECT COUNT(*) FROM archive_index WHERE user_id = 'user1'")
+        assert cursor.fetchone()[0] == 4
+        session = list(db.iter_archived_history('user1', 'session1', start_ms=base_ms + DAY_MS))
+        assert all(r['session_id'] == 'session1' and r['timestamp_ms'] >= base_ms + DAY_MS for r in session)
+        assert len(session) == 5
+        
+        stats = db.health_check()['archive']
+        assert stats['segments'] == 4 and stats['archived_messages'] == 30
+        assert db.archive_old_data()['archived'] == 0
+        db.close()
+        
+        print("✅ SUCCESS: Archived history streams back!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_rearchived_rows_are_not_duplicated():
+    """Retrying a batch whose delete did not commit leaves segments and index unchanged."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        db.enable_archive(os.path.join(tmp_dir, 'archive'))
+        old_ms = db._now_ms() - 60 * DAY_MS
+        db._write_message_batch([('user1', 'session1', f'm{i}', 'user', old_ms + i, None, None, None, None)
+                                 for i in range(3)])
+        segment = db.archive.segment_path(db.archive.segment_name(old_ms))
+        
+        def segment_lines():
+            with gzip.open(segment, 'rt', encoding='utf-8') as f:
+                return len(f.readlines())
+        
+        # The delete transaction rolls back after the segment was written
+        archive_rows = db.archive.archive_rows
+        
+        def failing_archive_rows(cursor, rows):
+            archive_rows(cursor, rows)
+            raise sqlite3.OperationalError('disk I/O error')
+        
+        db.archive.archive_rows = failing_archive_rows
+        try:
+            db.archive_old_data()
+            assert False, "expected the archive to fail"
+        except sqlite3.OperationalError:
+            pass
+        db.archive.archive_rows = archive_rows
+        assert segment_lines() == 3
+        assert db.health_check()['archive']['archived_messages'] == 0
+        
+        assert db.archive_old_data()['archived'] == 3
+        assert segment_lines() == 3
+        assert db.health_check()['archive']['archived_messages'] == 3
+        
+        # A restarted process reads the ids back from the segment
+        db._write_message_batch([('user1', 'session1', 'm3', 'user', old_ms + 3, None, None, None, None)])
+        conn = db.connections.connection()
+        rows = conn.execute(f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM conversations").fetchall()
+        with db.connections.transaction() as tx:
+            db.archive.archive_rows(tx.cursor(), rows)
+        db.enable_archive(os.path.join(tmp_dir, 'archive'))
+        assert db.archive_old_data()['archived'] == 1
+        assert segment_lines() == 4
+        assert conn.execute('SELECT messages, first_ms, last_ms FROM archive_index').fetchall() == \
+            [(4, old_ms, old_ms + 3)]
+        assert [r['message'] for r in db.iter_archived_history('user1')] == ['m0', 'm1', 'm2', 'm3']
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_archive_and_stream_back()
+    test_rearchived_rows_are_not_duplicated()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test script to verify bulk imports of conversation transcripts.
+"""
+
+import sys
+import os
+import io
+import json
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+from chatbot.importer import defer_schema, parse_timestamp_ms
+from chatbot.nlp import NLPProcessor
+from chatbot.sharding import ShardedDatabaseManager
+
+DAY_MS = 86400000
+
+
+def schema(db) -> set:
+    conn = db.connections.connection()
+    return set(conn.execute("SELECT type, name FROM sqlite_master WHERE tbl_name = 'conversations'").fetchall())
+
+
+def transcript(count: int, base_ms: int) -> list:
+    return [
+        {
+            'user_id': f'user{i % 5}',
+            'session_id': f'session{i % 11}',
+            'message': f'my refund number {i}' if i % 10 == 0 else f'message {i}',
+            'sender': 'bot' if i % 2 else 'user',
+            'timestamp_ms': base_ms + i * 60000,
+            'confidence': 0.5 if i % 2 else None
+        }
+        for i in range(count)
+    ]
+
+
+def test_bulk_import_round_trip():
+    """Imported rows match an export, with indexes, search and counters rebuilt."""
+    
+    print("🧪 Testing Bulk Import")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        source = DatabaseManager(os.path.join(tmp_dir, 'source.db'))
+        source.initialize_database()
+        base_ms = source._now_ms() - 10 * DAY_MS
+        source._write_message_batch([
+            (r['user_id'], r['session_id'], r['message'], r['sender'], r['timestamp_ms'], None, r['confidence'],
+             json.dumps({'number': ['1']}) if i % 7 == 0 else None, None)
+            for i, r in enumerate(transcript(2500, base_ms))
+        ])
+        exported = b''.join(source.export_conversations('jsonl')).decode('utf-8')
+        
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        db.store_message('user1', 'live', 'already here', 'user')
+        before = schema(db)
+        
+        batches = []
+        bad = '{"user_id": "user9", "sender": "user", "timestamp_ms": 1}\n'
+        stats = db.import_conversations(io.StringIO(exported + bad), 'jsonl', batch_size=1000,
+                                        progress=lambda s: batches.append(s['imported']))
+        assert stats['imported'] == 2500 and stats['skipped'] == 1 and stats['users'] == 5
+        assert batches == [1000, 2000, 2500]
+        assert stats['errors'] == ['Record 2501: missing message']
+        
+        # Indexes and triggers are back and the deferred list is empty
+        assert schema(db) == before
+        conn = db.connections.connection()
+        assert conn.execute('SELECT COUNT(*) FROM deferred_schema').fetchone()[0] == 0
+        
+        copied = [json.loads(line) for line in b''.join(db.export_conversations('jsonl')).splitlines()]
+        original = [json.loads(line) for line in exported.splitlines()]
+        strip = lambda r: {k: v for k, v in r.items() if k != 'id'}
+        assert [strip(r) for r in copied if r['session_id'] != 'live'] == [strip(r) for r in original]
+        
+        # Full-text index, user counters and rollups cover the imported rows
+        assert len(db.search_conversations('refund', user_id='user0', limit=300)['results']) == 250
+        profile = db.get_user_profile('user1')
+        assert profile['total_messages'] == 501
+        assert profile['first_seen'] == db._format_timestamp(base_ms + 60000)
+        assert db.get_statistics_totals(days=30)['total_messages'] == 2501
+        
+        # CSV exports import the same way
+        csv_db = DatabaseManager(os.path.join(tmp_dir, 'csv.db'))
+        csv_db.initialize_database()
+        csv_text = b''.join(source.export_conversations('csv')).decode('utf-8')
+        stats = csv_db.import_conversations(io.StringIO(csv_text, newline=''), 'csv')
+        assert stats['imported'] == 2500 and stats['skipped'] == 0
+        assert [strip(json.loads(line)) for line in b''.join(csv_db.export_conversations('jsonl')).splitlines()] == \
+            [strip(r) for r in original]
+        
+        for manager in (source, db, csv_db):
+            manager.close()
+        print("✅ SUCCESS: Bulk import round-trips!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_interrupted_import_is_repaired():
+    """Indexes dropped by a crashed import come back on the next start."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'chatbot.db')
+        db = DatabaseManager(path)
+        db.initialize_database()
+        before = schema(db)
+        with db.connections.transaction() as conn:
+            defer_schema(conn.cursor())
+            conn.execute("INSERT INTO conversations (user_id, session_id, message, sender, timestamp_ms) "
+                         "VALUES ('user1', 's', 'lost refund', 'user', 1)")
+        assert schema(db) == {('table', 'conversations')}
+        db.close()
+        
+        db = DatabaseManager(path)
+        db.initialize_database()
+        assert schema(db) == before
+        assert len(db.search_conversations('refund')['results']) == 1
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_import_adds_to_existing_counters():
+    """Imported messages add to counters that also cover purged history."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        for i in range(3):
+            db.store_message('user1', 'live', f'live {i}', 'user')
+        last_seen = db.get_user_profile('user1')['last_seen']
+        # Gone from conversations, as after retention, but still counted
+        with db.connections.transaction() as conn:
+            conn.execute("DELETE FROM conversations WHERE user_id = 'user1'")
+        
+        base_ms = parse_timestamp_ms('2024-03-01 10:00:00')
+        stats = db.bulk_import(transcript(10, base_ms))
+        assert stats['imported'] == 10 and stats['users'] == 5
+        profile = db.get_user_profile('user1')
+        assert profile['total_messages'] == 5
+        assert profile['first_seen'] == db._format_timestamp(base_ms + 60000)
+        assert profile['last_seen'] == last_seen
+        assert db.get_user_profile('user2')['total_messages'] == 2
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_nlp_and_shards():
+    """NLP fills user messages without an intent; shards get their own users."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = ShardedDatabaseManager(3, tmp_dir)
+        db.initialize_database()
+        records = [
+            {'user_id': f'user{i}', 'message': 'I forgot password for my account', 'timestamp': '2024-03-01T10:00:00Z'}
+            for i in range(6)
+        ]
+        records.append({'user_id': 'user0', 'message': 'hello', 'intent': 'custom', 'timestamp': '2024-03-01 10:01:00'})
+        records.append({'user_id': 'user0', 'message': 'Reset it here', 'sender': 'bot', 'timestamp': 1709287320})
+        
+        stats = db.bulk_import(records, nlp=NLPProcessor(cache_size=0), batch_size=2)
+        assert stats['imported'] == 8 and stats['analyzed'] == 6 and stats['users'] == 6
+        
+        history = db.get_conversation_history('user0')
+        by_message = {row['message']: row for row in history}
+        assert by_message['I forgot password for my account']['intent'] == 'password_reset'
+        assert by_message['hello']['intent'] == 'custom'
+        assert by_message['Reset it here']['intent'] is None
+        assert by_message['Reset it here']['timestamp'] == '2024-03-01 10:02:00'
+        assert db.get_user_profile('user0')['total_messages'] == 3
+        assert db.get_user_profile('user5')['total_messages'] == 1
+        
+        assert parse_timestamp_ms('2024-03-01T10:00:00+02:00') == parse_timestamp_ms('2024-03-01 08:00:00')
+        assert parse_timestamp_ms('1970-01-02T00:00:00Z') == DAY_MS
+        
+        # Infinite, NaN and out-of-range timestamps skip the record instead of aborting the import
+        for bad in ('inf', '-inf', 'nan', '1e400', float('inf'), float('nan'), 10 ** 400, 1e300,
+                    '0001-01-01T00:00:00+01:00'):
+            try:
+                parse_timestamp_ms(bad)
+                assert False, f"expected ValueError for {bad!r}"
+            except ValueError:
+                pass
+        stats = db.bulk_import([
+            {'user_id': 'user7', 'message': 'infinite', 'timestamp': 'inf'},
+            {'user_id': 'user7', 'message': 'huge', 'timestamp_ms': '1e400'},
+            {'user_id': 'user7', 'message': 'far future', 'timestamp_ms': 10 ** 20},
+            {'user_id': 'user7', 'message': 'unsure', 'timestamp': 1709287320, 'confidence': 'nan'},
+            {'user_id': 'user7', 'message': 'fine', 'timestamp': 1709287320}
+        ])
+        assert stats['imported'] == 1 and stats['skipped'] == 4
+        assert [row['message'] for row in db.get_conversation_history('user7')] == ['fine']
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_bulk_import_round_trip()
+    test_interrupted_import_is_repaired()
+    test_import_adds_to_existing_counters()
+    test_nlp_and_shards()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the binary entities and sentiment column codecs.
+"""
+
+import sys
+import os
+import json
+import shutil
+import sqlite3
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.codecs import ColumnCodecs, decode_value
+from chatbot.database import DatabaseManager
+
+ENTITIES = [
+    {'email': ['jane@example.com']},
+    {'phone': ['555-123-4567', '555-000-1111'], 'price': ['$29.99'], 'date': []},
+    {'': ['empty type']},
+    {'note': ['tab\there', 'ünïcødé ✓']}
+]
+SENTIMENT = {'neg': 0.0, 'neu': 0.508, 'pos': 0.492, 'compound': 0.4404}
+
+
+def test_codecs_round_trip():
+    """Every value decodes to what was encoded, falling back to JSON when needed."""
+    
+    print("🧪 Testing Column Codecs")
+    print("=" * 50)
+    
+    codecs = ColumnCodecs()
+    for entities in ENTITIES:
+        stored = codecs.encode('entities', entities)
+        assert isinstance(stored, bytes)
+        assert decode_value(stored) == entities
+        assert len(stored) < len(json.dumps(entities))
+    
+    # Values the compact encoding cannot represent are stored as JSON
+    for entities in ({'x': ['a\x1eb']}, {'x': 'not a list'}, {'x': [1, 2]}, {'x': [{'nested': True}]}, ['a']):
+        stored = codecs.encode('entities', entities)
+        assert isinstance(stored, str) and decode_value(stored) == entities
+    assert codecs.encode('entities', {}) is None and decode_value(None) is None
+    
+    stored = codecs.encode('sentiment', SENTIMENT)
+    assert isinstance(stored, bytes) and len(stored) == 33
+    assert decode_value(stored) == SENTIMENT
+    for sentiment in ({'polarity': 0.5}, {'neg': 'x', 'neu': 0, 'pos': 0, 'compound': 0}):
+        assert decode_value(codecs.encode('sentiment', sentiment)) == sentiment
+    
+    try:
+        import msgpack  # noqa: F401
+    except ImportError:
+        try:
+            ColumnCodecs(entities='msgpack')
+            assert False, "expected RuntimeError"
+        except RuntimeError:
+            pass
+    else:
+        stored = ColumnCodecs(entities='msgpack').encode('entities', ENTITIES[1])
+        assert decode_value(stored) == ENTITIES[1]
+    
+    try:
+        ColumnCodecs(sentiment='pickle')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    
+    # Unknown tags and truncated values are ValueErrors, which recode keeps as stored
+    for stored in (b'\x7fjunk', b'\x03short'):
+        try:
+            decode_value(stored)
+            assert False, f"expected ValueError for {stored!r}"
+        except ValueError:
+            pass
+        assert ColumnCodecs().recode('sentiment', stored) == stored
+    
+    print("✅ SUCCESS: Codecs round-trip!")
+
+
+def test_stored_rows_decode_with_any_codec():
+    """History, exports and archives read binary and JSON rows alike."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        db.store_message('user1', 's1', 'binary', 'user', entities=ENTITIES[1], sentiment=SENTIMENT)
+        db.configure_column_codecs(entities='json', sentiment='json')
+        db.store_message('user1', 's1', 'json', 'user', entities=ENTITIES[1], sentiment=SENTIMENT)
+        
+        conn = db.connections.connection()
+        assert conn.execute('SELECT typeof(entities), typeof(sentiment) FROM conversations ORDER BY id').fetchall() == \
+            [('blob', 'blob'), ('text', 'text')]
+        
+        for message in db.get_conversation_history('user1'):
+            assert message['entities'] == ENTITIES[1] and message['sentiment'] == SENTIMENT
+        records = [json.loads(line) for line in b''.join(db.export_conversations('jsonl')).splitlines()]
+        assert [(r['entities'], r['sentiment']) for r in records] == [(ENTITIES[1], SENTIMENT)] * 2
+        csv_text = b''.join(db.export_conversations('csv')).decode('utf-8')
+        assert '\x1e' not in csv_text and '"{""neg"": 0.0' in csv_text
+        
+        db.enable_archive(os.path.join(tmp_dir, 'archive'), after_days=0)
+        time.sleep(0.01)
+        assert db.archive_old_data(days=0)['archived'] == 2
+        archived = list(db.iter_archived_history('user1'))
+        assert [(r['entities'], r['sentiment']) for r in archived] == [(ENTITIES[1], SENTIMENT)] * 2
+        assert db.health_check()['column_codecs'] == {'entities': 'json', 'sentiment': 'json'}
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_migration_recodes_json_rows():
+    """The schema migration rewrites existing JSON text and shrinks the columns."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'chatbot.db')
+        db = DatabaseManager(path)
+        db.initialize_database()
+        now_ms = db._now_ms()
+        db._write_message_batch([
+            ('user1', 's1', f'message {i}', 'user', now_ms + i, None, None,
+             json.dumps(ENTITIES[i % len(ENTITIES)]), json.dumps(SENTIMENT) if i % 3 else None)
+            for i in range(95)
+        ] + [('user1', 's1', 'broken', 'user', now_ms + 95, None, None, '{not json', json.dumps({'polarity': 1}))])
+        db.close()
+        
+        conn = sqlite3.connect(path)
+        before = conn.execute('SELECT SUM(LENGTH(entities)) + SUM(LENGTH(sentiment)) FROM conversations').fetchone()[0]
+        conn.execute('PRAGMA user_version = 3')
+        conn.commit()
+        conn.close()
+        
+        db = DatabaseManager(path)
+        db.migrator.batch_size = 10
+        progress = []
+        db.initialize_database(migration_progress=progress.append)
+        recoded = [p for p in progress if p['version'] == 4]
+        assert len(recoded) == 10 and recoded[-1]['rows'] == 95
+        
+        # Unreadable JSON and sentiment the struct cannot hold are left as they were
+        conn = db.connections.connection()
+        assert conn.execute("SELECT entities, sentiment FROM conversations WHERE typeof(entities) = 'text'").fetchall() == \
+            [('{not json', '{"polarity": 1}')]
+        after = conn.execute('SELECT SUM(LENGTH(entities)) + SUM(LENGTH(sentiment)) FROM conversations').fetchone()[0]
+        assert after < before * 0.7
+        
+        with db.connections.transaction():
+            conn.execute("DELETE FROM conversations WHERE message = 'broken'")
+        history = db.get_conversation_history('user1', limit=100)
+        assert [m['entities'] for m in history] == [ENTITIES[i % len(ENTITIES)] for i in range(95)]
+        assert [m['sentiment'] for m in history] == [SENTIMENT if i % 3 else None for i in range(95)]
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_manage_db_migrates_with_configured_codecs():
+    """manage_db.py recodes with the codecs of the configuration file."""
+    import manage_db
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'chatbot.db')
+        db = DatabaseManager(path)
+        db.initialize_database()
+        db._write_message_batch([('user1', 's1', 'hello', 'user', db._now_ms(), None, None,
+                                  json.dumps(ENTITIES[0]), json.dumps(SENTIMENT))])
+        db.close()
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA user_version = 3')
+        conn.commit()
+        conn.close()
+        
+        config = os.path.join(tmp_dir, 'config.json')
+        with open(config, 'w', encoding='utf-8') as f:
+            json.dump({'database': {'column_codecs': {'entities': 'json', 'sentiment': 'struct'}}}, f)
+        assert manage_db.main(['--db', path, '--config', config, 'migrate']) == 0
+        
+        conn = sqlite3.connect(path)
+        assert conn.execute('SELECT typeof(entities), typeof(sentiment) FROM conversations').fetchone() == \
+            ('text', 'blob')
+        conn.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_codecs_round_trip()
+    test_stored_rows_decode_with_any_codec()
+    test_migration_recodes_json_rows()
+    test_manage_db_migrates_with_configured_codecs()
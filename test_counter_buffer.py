@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script to verify buffered user counters and rollups.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+
+
+def count_writes(db, turns):
+    """Store chat turns and count the INSERT/UPDATE statements they run."""
+    statements = []
+    conn = db.connections.connection()
+    # Trigger programs are traced as repeats of the statement that fired them
+    for (trigger,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+        conn.execute(f'DROP TRIGGER {trigger}')
+    conn.set_trace_callback(statements.append)
+    try:
+        for i in range(turns):
+            db.store_message('user1', 'session1', f'question {i}', 'user')
+            db.store_message('user1', 'session1', f'answer {i}', 'bot', confidence=0.5)
+    finally:
+        conn.set_trace_callback(None)
+    return sum(1 for sql in statements if sql.lstrip().upper().startswith(('INSERT', 'UPDATE')))
+
+
+def test_buffered_counters_match_direct_writes():
+    """Profiles and statistics are exact before and after a flush."""
+    
+    print("🧪 Testing Counter Buffer")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        direct = DatabaseManager(os.path.join(tmp_dir, 'direct.db'))
+        direct.initialize_database()
+        buffered = DatabaseManager(os.path.join(tmp_dir, 'buffered.db'))
+        buffered.initialize_database()
+        buffered.enable_counter_buffer(flush_interval_ms=60000)
+        
+        direct_writes = count_writes(direct, 5)
+        buffered_writes = count_writes(buffered, 5)
+        print(f"Statements per turn: {direct_writes / 5:.0f} direct, {buffered_writes / 5:.0f} buffered")
+        assert buffered_writes == 10
+        assert direct_writes > buffered_writes
+        
+        # Nothing flushed yet: the user row only exists in memory
+        conn = buffered.connections.connection()
+        assert conn.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 0
+        profile = buffered.get_user_profile('user1')
+        assert profile['total_messages'] == 10
+        assert profile['total_conversations'] == 10
+        assert profile['first_seen'] and profile['last_seen'] >= profile['first_seen']
+        
+        # Preferences of a user whose row is still buffered are kept
+        assert buffered.update_user_preferences('user1', {'theme': 'dark'})
+        assert buffered.get_user_profile('user1')['total_messages'] == 10
+        buffered.flush_counters()
+        assert buffered.counter_buffer.get_stats()['pending_users'] == 0
+        profile = buffered.get_user_profile('user1')
+        assert profile['total_messages'] == 10
+        assert profile['preferences'] == {'theme': 'dark'}
+        
+        buffered.store_message('user1', 'session2', 'later', 'user')
+        assert buffered.get_user_profile('user1')['total_messages'] == 11
+        direct.store_message('user1', 'session2', 'later', 'user')
+        assert buffered.get_statistics(1) == direct.get_statistics(1)
+        
+        buffered.close()
+        reopened = DatabaseManager(os.path.join(tmp_dir, 'buffered.db'))
+        assert reopened.get_user_profile('user1')['total_messages'] == 11
+        reopened.close()
+        direct.close()
+        print("✅ SUCCESS: Buffered counters are exact!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_failed_flush_is_retried():
+    """Deltas survive a failed flush and are written by the next one."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        db.enable_counter_buffer(flush_interval_ms=60000)
+        db.store_message('user1', 'session1', 'hello', 'user')
+        
+        buffer = db.counter_buffer
+        write = buffer.write
+        buffer.write = lambda users, entries: (_ for _ in ()).throw(RuntimeError('disk full'))
+        assert not buffer.flush()
+        assert buffer.get_stats()['errors'] == 1
+        buffer.write = write
+        db.store_message('user1', 'session1', 'again', 'user')
+        assert buffer.flush()
+        
+        row = db.connections.connection().execute(
+            "SELECT total_messages FROM users WHERE user_id = 'user1'").fetchone()
+        assert row[0] == 2
+        assert db.get_statistics(1)['total_messages'] == 2
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_buffered_counters_match_direct_writes()
+    test_failed_flush_is_retried()
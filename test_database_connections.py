@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script to verify persistent per-thread database connections.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+
+
+def make_db(tmp_dir: str, **kwargs) -> DatabaseManager:
+    db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'), **kwargs)
+    db.initialize_database()
+    return db
+
+
+def test_connections_are_reused_per_thread():
+    """Each thread keeps one WAL-mode connection for all its calls."""
+    
+    print("🧪 Testing Persistent Database Connections")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = make_db(tmp_dir, pragmas={'synchronous': 'OFF'})
+        conn = db.connections.connection()
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 0
+        
+        db.store_message('user1', 'session1', 'hello', 'user')
+        db.get_conversation_history('user1')
+        assert db.connections.connection() is conn
+        assert db.connections.get_stats()['opened'] == 1
+        
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db.connections.connection()))
+        thread.start()
+        thread.join()
+        assert other[0] is not conn
+        
+        # The finished thread's connection is closed when the next one opens
+        thread = threading.Thread(target=db.connections.connection)
+        thread.start()
+        thread.join()
+        stats = db.connections.get_stats()
+        assert stats['opened'] == 3
+        assert stats['closed'] == 1
+        
+        db.close()
+        print("✅ SUCCESS: Connections are reused per thread!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_concurrent_writers_and_readers():
+    """Concurrent chat turns must not lose messages."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = make_db(tmp_dir)
+        errors = []
+        
+        def chat(user_id: str):
+            try:
+                for i in range(25):
+                    db.store_message(user_id, 'session', f'message {i}', 'user')
+                    db.get_conversation_history(user_id, 'session', limit=5)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=chat, args=(f'user{i}',)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert db.health_check()['statistics']['conversations_count'] == 100
+        assert db.get_user_profile('user0')['total_messages'] == 25
+        
+        # A failed transaction is rolled back
+        try:
+            with db.connections.transaction() as conn:
+                conn.execute("INSERT INTO users (user_id) VALUES ('rolled_back')")
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert db.get_user_profile('rolled_back') is None
+        
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_connections_are_reused_per_thread()
+    test_concurrent_writers_and_readers()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script to verify single-pass entity extraction.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.nlp import EntityExtractor, NLPProcessor
+
+
+def test_overlapping_entity_types():
+    """Higher-priority entities claim their text before numbers do."""
+    
+    print("🧪 Testing Entity Extraction")
+    print("=" * 50)
+    
+    nlp = NLPProcessor()
+    cases = {
+        "Call 555-123-4567 about order 42": {'phone': ['555-123-4567'], 'number': ['42']},
+        "Or 5551234567": {'phone': ['5551234567']},
+        "It costs $29.99, not 30 dollars": {'number': ['30'], 'currency': ['$29.99']},
+        "Save 15% or 12.5% today": {'percentage': ['15%', '12.5%']},
+        "Meet at 10:30 am or 9:05": {'time': ['10:30 am', '9:05']},
+        "Due 12/25/2024": {'date': ['12/25/2024']},
+        "Mail jane@example.com or see https://example.com/help?id=7": {
+            'email': ['jane@example.com'], 'url': ['https://example.com/help?id=7']
+        },
+        "nothing here": {}
+    }
+    for text, expected in cases.items():
+        assert nlp.extract_entities(text) == expected, text
+    
+    # Groups keep pattern order, whatever order the entities appear in
+    assert list(nlp.extract_entities("7 items at $5")) == ['number', 'currency']
+    
+    print("✅ SUCCESS: Entities are extracted without overlaps!")
+
+
+def test_entity_spans():
+    """Spans point at the matched text, in text order."""
+    nlp = NLPProcessor()
+    text = "Email jane@example.com by 10:30, budget $40 or 20%"
+    spans = nlp.extract_entity_spans(text)
+    assert [(span['type'], span['value']) for span in spans] == [
+        ('email', 'jane@example.com'), ('time', '10:30'), ('currency', '$40'), ('percentage', '20%')
+    ]
+    for span in spans:
+        assert text[span['start']:span['end']] == span['value']
+    assert nlp.extract_entity_spans("") == []
+
+
+def test_leftmost_match_beats_priority():
+    """Priority settles matches at one position; an earlier match wins otherwise."""
+    extractor = EntityExtractor({'short': r'ab', 'long': r'bcd'}, priority=['long', 'short'])
+    assert list(extractor.finditer('abcd')) == [('short', 'ab', 0, 2)]
+    assert list(extractor.finditer('xbcd')) == [('long', 'bcd', 1, 4)]
+    
+    same_start = EntityExtractor({'number': r'\d+', 'percentage': r'\d+%'}, priority=['percentage'])
+    assert same_start.extract('50%') == {'percentage': ['50%']}
+    assert same_start.priority == ['percentage', 'number']
+
+
+if __name__ == "__main__":
+    test_overlapping_entity_types()
+    test_entity_spans()
+    test_leftmost_match_beats_priority()
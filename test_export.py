@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script to verify streaming conversation exports.
+"""
+
+import sys
+import os
+import csv
+import io
+import json
+import shutil
+import tempfile
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+from chatbot.export import EXPORT_COLUMNS
+from chatbot.sharding import ShardedDatabaseManager
+
+
+def fill(db, count: int):
+    base_ms = db._now_ms() - count * 1000
+    db._write_message_batch([
+        (f'user{i % 4}', f'session{i % 7}', f'message {i}, "quoted"\nline two ✓', 'bot' if i % 2 else 'user',
+         base_ms + i * 1000, 'greeting' if i % 3 else None, 0.25 if i % 2 else None,
+         json.dumps({'number': [str(i)]}) if i % 5 == 0 else None, None)
+        for i in range(count)
+    ])
+
+
+def test_export_formats_round_trip():
+    """JSON Lines and CSV exports contain every row in time order."""
+    
+    print("🧪 Testing Conversation Export")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        fill(db, 250)
+        
+        chunks = list(db.iter_conversations(chunk_size=100))
+        assert [len(rows) for rows in chunks] == [100, 100, 50]
+        assert len(list(db.iter_conversations('user1', chunk_size=100))) == 1
+        
+        records = [json.loads(line) for line in b''.join(db.export_conversations('jsonl', chunk_size=64)).splitlines()]
+        assert len(records) == 250
+        assert [r['message'] for r in records] == [f'message {i}, "quoted"\nline two ✓' for i in range(250)]
+        assert records[0]['entities'] == {'number': ['0']} and records[1]['entities'] is None
+        
+        rows = list(csv.reader(io.StringIO(b''.join(db.export_conversations('csv', chunk_size=64)).decode('utf-8'))))
+        assert rows[0] == EXPORT_COLUMNS
+        assert len(rows) == 251
+        assert rows[1][EXPORT_COLUMNS.index('message')] == records[0]['message']
+        
+        # Filters
+        window = b''.join(db.export_conversations(
+            'jsonl', user_id='user2', start_ms=records[10]['timestamp_ms'], end_ms=records[50]['timestamp_ms']))
+        assert [json.loads(line)['message'].split(',')[0] for line in window.splitlines()] == \
+            [f'message {i}' for i in range(10, 50) if i % 4 == 2]
+        
+        try:
+            db.export_conversations('xml')
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        db.close()
+        
+        print("✅ SUCCESS: Exports round-trip!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_export_memory_is_bounded():
+    """Peak memory follows the chunk size, not the export size."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        fill(db, 20000)
+        
+        tracemalloc.start()
+        size = 0
+        for data in db.export_conversations('jsonl', chunk_size=200):
+            size += len(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"Exported {size} bytes with a {peak} byte peak")
+        assert peak < size / 5
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_parquet_and_shards():
+    """Parquet output reads back with pandas; shards merge by time."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = ShardedDatabaseManager(3, tmp_dir)
+        db.initialize_database()
+        for i in range(60):
+            db.store_message(f'user{i}', 'session', f'message {i}', 'user')
+        
+        records = [json.loads(line) for line in b''.join(db.export_conversations('jsonl', chunk_size=8)).splitlines()]
+        assert len(records) == 60
+        stamps = [r['timestamp_ms'] for r in records]
+        assert stamps == sorted(stamps)
+        assert sorted(r['message'] for r in records) == sorted(f'message {i}' for i in range(60))
+        
+        try:
+            import pandas as pd
+            import pyarrow  # noqa: F401
+        except ImportError:
+            try:
+                db.export_conversations('parquet')
+                assert False, "expected RuntimeError"
+            except RuntimeError:
+                pass
+        else:
+            frame = pd.read_parquet(io.BytesIO(b''.join(db.export_conversations('parquet', chunk_size=16))))
+            assert list(frame.columns) == EXPORT_COLUMNS
+            assert sorted(frame['message']) == sorted(f'message {i}' for i in range(60))
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_export_formats_round_trip()
+    test_export_memory_is_bounded()
+    test_parquet_and_shards()
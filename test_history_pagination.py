@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script to verify keyset-paginated conversation history.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+
+
+def make_db(tmp_dir: str) -> DatabaseManager:
+    db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+    db.initialize_database()
+    # Many messages share a timestamp, so paging must break ties by id
+    records = [
+        ('user1', f'session{i % 2}', f'message {i}', 'user', 1700000000000 + (i // 4) * 1000,
+         None, None, None, None)
+        for i in range(45)
+    ]
+    records.append(('user2', 'session0', 'other user', 'user', 1700000000000, None, None, None, None))
+    db._write_message_batch(records)
+    return db
+
+
+def test_paging_backwards_and_forwards():
+    """Walking the pages returns every message exactly once, in order."""
+    
+    print("🧪 Testing History Pagination")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = make_db(tmp_dir)
+        
+        pages = []
+        page = db.get_conversation_page('user1', limit=10)
+        pages.append(page['messages'])
+        while page['has_more']:
+            page = db.get_conversation_page('user1', limit=10, before=page['before'])
+            pages.append(page['messages'])
+        
+        assert [len(messages) for messages in pages] == [10, 10, 10, 10, 5]
+        older_first = [m['message'] for messages in reversed(pages) for m in messages]
+        assert older_first == [f'message {i}' for i in range(45)]
+        
+        # Scroll forward again from the oldest page
+        page = {'after': pages[-1][-1]['cursor'], 'has_more': True}
+        newer = []
+        while page['has_more']:
+            page = db.get_conversation_page('user1', limit=10, after=page['after'])
+            newer.extend(m['message'] for m in page['messages'])
+        assert newer == [f'message {i}' for i in range(5, 45)]
+        
+        # Session filter
+        session = db.get_conversation_history('user1', 'session1', limit=100)
+        assert [m['message'] for m in session] == [f'message {i}' for i in range(1, 45, 2)]
+        
+        empty = db.get_conversation_page('user1', limit=10, after=page['after'])
+        assert empty['messages'] == [] and not empty['has_more']
+        
+        try:
+            db.get_conversation_page('user1', before='not-a-cursor')
+            assert False, "Malformed cursor accepted"
+        except ValueError:
+            pass
+        
+        db.close()
+        print("✅ SUCCESS: History pages are consistent!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_history_queries_use_composite_indexes():
+    """History pages are read in index order without a temporary sort."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = make_db(tmp_dir)
+        conn = db.connections.connection()
+        queries = [
+            ('user_id = ? AND session_id = ? AND (timestamp_ms, id) < (?, ?)', 'DESC',
+             ('user1', 'session0', 1700000005000, 10), 'idx_conversations_user_session_time'),
+            ('user_id = ? AND (timestamp_ms, id) > (?, ?)', 'ASC',
+             ('user1', 1700000005000, 10), 'idx_conversations_user_time')
+        ]
+        for where, order, params, index in queries:
+            plan = ' '.join(row[3] for row in conn.execute(f'''
+                EXPLAIN QUERY PLAN SELECT message FROM conversations WHERE {where}
+                ORDER BY timestamp_ms {order}, id {order} LIMIT 10
+            ''', params))
+            assert index in plan, plan
+            assert 'TEMP B-TREE' not in plan, plan
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_paging_backwards_and_forwards()
+    test_history_queries_use_composite_indexes()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that importing the chatbot package stays fast.
+
+Each check runs in a fresh interpreter so modules imported by other tests
+do not hide slow imports.
+"""
+
+import sys
+import os
+import json
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Seconds allowed for importing the package without the NLP stack
+IMPORT_BUDGET_SECONDS = 0.25
+
+HEAVY_MODULES = ['nltk', 'sklearn', 'numpy', 'scipy']
+
+
+def measure_import(statement: str) -> dict:
+    """Run an import statement in a fresh interpreter and report time and loaded modules."""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [name for name in {HEAVY_MODULES!r} if name in sys.modules]\n"
+        "print(json.dumps({'seconds': elapsed, 'heavy': heavy}))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_package_import_is_lazy():
+    """Importing the package must not import NLTK, numpy or sklearn."""
+    
+    print("🧪 Testing Package Import Time")
+    print("=" * 50)
+    
+    result = measure_import("import chatbot")
+    print(f"import chatbot: {result['seconds'] * 1000:.1f} ms")
+    assert result['heavy'] == [], result['heavy']
+    assert result['seconds'] < IMPORT_BUDGET_SECONDS, result['seconds']
+    
+    print("✅ SUCCESS: Package import stays within budget!")
+
+
+def test_database_import_skips_nlp_stack():
+    """Database-only code paths must not pay for the NLP dependencies."""
+    result = measure_import("from chatbot import DatabaseManager")
+    assert result['heavy'] == [], result['heavy']
+    assert result['seconds'] < IMPORT_BUDGET_SECONDS, result['seconds']
+    
+    result = measure_import("from chatbot.nlp import NLPProcessor")
+    assert result['heavy'] == [], result['heavy']
+
+
+if __name__ == "__main__":
+    test_package_import_is_lazy()
+    test_database_import_skips_nlp_stack()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the keyword automaton and compiled keyword rules.
+"""
+
+import sys
+import os
+import json
+import random
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.keywords import DEFAULT_KEYWORD_RULES, KeywordAutomaton, KeywordRules
+from chatbot.nlp import NLPProcessor
+
+MESSAGES = [
+    "Hello", "  hi  ", "hiking this weekend", "What's the price?", "whats your pricing",
+    "I forgot password again", "what are your business hours", "The app is down, urgent!",
+    "this is a breakdown", "thank you so much", "Thanks", "goodbye and take care",
+    "I need a real person", "my API integration has a bug", "how much does it cost",
+    "there is an issue with my ticket", "product feature specification", "", "zzz",
+    "see you later", "contact support please", "appreciate it", "sure, yo"
+]
+
+
+def reference_match(categories: dict, text: str) -> set:
+    """The sequential ``phrase in text`` checks the automaton replaces."""
+    return {category for category, phrases in categories.items()
+            if any(phrase.lower() in text for phrase in phrases if phrase)}
+
+
+def test_automaton_matches_substring_checks():
+    """Overlapping and nested phrases are all found, exactly like ``in`` checks."""
+    
+    print("🧪 Testing Keyword Automaton")
+    print("=" * 50)
+    
+    categories = {
+        'he': ['he'], 'she': ['she'], 'his': ['his'], 'hers': ['hers'],
+        'down': ['down', 'breakdown'], 'not_working': ['not working', 'working'],
+        'ab': ['ab', 'bab', 'abab', 'babb']
+    }
+    automaton = KeywordAutomaton(categories)
+    
+    # Overlapping phrases share characters; nested phrases end inside longer ones
+    assert automaton.match('ushers') == {'he', 'she', 'hers'}
+    assert automaton.match('breakdown') == {'down'}
+    assert automaton.match('it is not working') == {'not_working'}
+    assert automaton.match('ababb') == {'ab'}
+    assert automaton.match('') == frozenset()
+    
+    # Phrases match inside words, as the old substring checks did
+    assert automaton.match('this') == {'his'}
+    rules = KeywordAutomaton(DEFAULT_KEYWORD_RULES['keywords'])
+    assert 'fallback:greeting' in rules.match('this is it')
+    assert 'urgency' in rules.match('countdown')
+    
+    rng = random.Random(5)
+    for _ in range(2000):
+        text = ''.join(rng.choice('abehrsw ') for _ in range(rng.randint(0, 12)))
+        assert automaton.match(text) == reference_match(categories, text), text
+    for message in MESSAGES:
+        text = message.lower()
+        assert rules.match(text) == reference_match(DEFAULT_KEYWORD_RULES['keywords'], text), message
+    
+    print("✅ SUCCESS: Automaton matches substring checks!")
+
+
+def test_rule_priority_matches_sequential_checks():
+    """Exact, prefix and keyword rules pick the same intent as checking them in order."""
+    nlp = NLPProcessor()
+    rules = nlp.keyword_rules.rules
+    
+    def sequential_rule_intent(text):
+        stripped = text.lower().strip()
+        for intent, phrases in rules['exact'].items():
+            if stripped in [phrase.lower() for phrase in phrases]:
+                return intent, 0.95
+        for intent, phrases in rules['prefix'].items():
+            if any(stripped.startswith(phrase) for phrase in phrases):
+                return intent, 0.9
+        for category, phrases in rules['keywords'].items():
+            if category.startswith('intent:') and any(phrase in text.lower() for phrase in phrases):
+                return category.split(':', 1)[1], 0.9
+        return None
+    
+    def sequential_fallback(text):
+        for category, phrases in rules['keywords'].items():
+            if category.startswith('fallback:') and any(phrase in text.lower() for phrase in phrases):
+                return category.split(':', 1)[1], 0.8
+        return 'general', 0.5
+    
+    for message in MESSAGES:
+        matches = nlp.match_keywords(message)
+        assert nlp._match_rule_intent(matches) == sequential_rule_intent(message), message
+        assert nlp._fallback_intent_recognition(message, matches) == sequential_fallback(message), message
+    
+    # Exact rules win over prefix rules, and prefix rules over keyword rules
+    assert nlp._match_rule_intent(nlp.match_keywords(' Hello ')) == ('greeting', 0.95)
+    assert nlp._match_rule_intent(nlp.match_keywords('hiking hours')) == ('greeting', 0.9)
+    assert nlp._match_rule_intent(nlp.match_keywords('what are your hours')) == ('business_hours', 0.9)
+
+
+def test_rules_reload_when_file_changes():
+    """Editing the rules file rebuilds the tables and notifies listeners."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'keyword_rules.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'keywords': {'urgency': ['urgent']}}, f)
+        
+        rules = KeywordRules(path, check_interval=0)
+        reloads = []
+        rules.add_reload_listener(lambda: reloads.append(True))
+        assert rules.match('URGENT refund') == {'urgency'}
+        assert not rules.reload_if_changed()
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'exact': {'thanks': ['ta']}, 'keywords': {'urgency': ['asap'], 'pricing': ['refund']}}, f)
+        mtime = os.path.getmtime(path) + 10
+        os.utime(path, (mtime, mtime))
+        
+        # The next match notices the new mtime
+        assert rules.match('refund asap') == {'urgency', 'pricing'}
+        assert rules.match(' Ta ') == {'exact:thanks'}
+        assert reloads == [True]
+        assert rules.health_check()['keyword_categories'] == 2
+        
+        # A missing file falls back to the built-in rules
+        assert KeywordRules(os.path.join(tmp_dir, 'missing.json')).rules == DEFAULT_KEYWORD_RULES
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_automaton_matches_substring_checks()
+    test_rule_priority_matches_sequential_checks()
+    test_rules_reload_when_file_changes()
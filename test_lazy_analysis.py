@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script to verify lazy NLP results and the per-intent stage statistics.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.nlp import NLPProcessor, NLPResult
+from chatbot.responses import ResponseManager
+
+
+def test_greeting_skips_sentiment_and_entities():
+    """A greeting answered from its intent never runs the entity or sentiment stages."""
+    
+    print("🧪 Testing Lazy NLP Results")
+    print("=" * 50)
+    
+    nlp = NLPProcessor()
+    result = nlp.process_message("Hello")
+    assert isinstance(result, NLPResult)
+    
+    # What a template response reads
+    assert result['intent'] == 'greeting'
+    assert result['confidence'] > 0
+    assert result['has_question'] is False
+    
+    assert {'keywords', 'intent'} <= set(result.stages_run)
+    for stage in ('tokens', 'entities', 'sentiment'):
+        assert stage not in result.stages_run, stage
+    # Fields stay visible as keys without being computed
+    assert 'sentiment' in result and 'entities' in result
+    
+    stats = nlp.get_stage_stats()['greeting']
+    assert stats['messages'] == 1
+    assert stats['stages_run']['keywords'] == 1 and stats['stages_run']['intent'] == 1
+    for stage in ('tokens', 'entities', 'sentiment'):
+        assert stats['stages_run'][stage] == 0, stage
+        assert stats['stages_skipped'][stage] == 1, stage
+    
+    print("✅ SUCCESS: Unused stages are never computed!")
+
+
+def test_stages_run_on_first_access():
+    """Reading a field runs its stage once, and the counts follow per intent."""
+    nlp = NLPProcessor()
+    
+    nlp.process_message("Hi there")
+    result = nlp.process_message("My order arrived broken and I am very upset")
+    intent = result['intent']
+    assert intent != 'greeting'
+    
+    sentiment = result['sentiment']
+    assert sentiment['compound'] < 0
+    assert result['sentiment'] is sentiment
+    assert result.stages_run.count('sentiment') == 1
+    assert 'entities' not in result.stages_run
+    
+    stats = nlp.get_stage_stats()
+    assert stats['greeting']['stages_skipped']['sentiment'] == 1
+    assert stats[intent]['stages_run']['sentiment'] == 1
+    assert stats[intent]['stages_skipped']['sentiment'] == 0
+    assert stats[intent]['stages_skipped']['entities'] == 1
+    
+    # to_dict computes every remaining stage, each exactly once
+    values = result.to_dict()
+    assert set(values) == set(NLPResult.FIELD_STAGES)
+    assert sorted(result.stages_run) == sorted(NLPResult.STAGES)
+    assert values['word_count'] == len(values['tokens'])
+    stats = nlp.get_stage_stats()[intent]
+    assert stats['messages'] == 1
+    assert all(count == 1 for count in stats['stages_run'].values())
+    assert all(count == 0 for count in stats['stages_skipped'].values())
+    
+    # The lazy result holds the same values as a fully resolved batch result
+    batch = nlp.process_batch(["My order arrived broken and I am very upset"])[0]
+    assert batch.to_dict() == values
+
+
+def test_template_reply_leaves_stages_unresolved():
+    """Generating a plain intent reply does not resolve entities or sentiment."""
+    nlp = NLPProcessor()
+    responses = ResponseManager(keyword_rules=nlp.keyword_rules)
+    
+    result = nlp.process_message("Hello")
+    reply = responses.generate_response("Hello", result, [], "test_user")
+    assert reply['intent'] == 'greeting'
+    assert reply['response']
+    
+    for stage in ('entities', 'sentiment'):
+        assert stage not in result.stages_run, stage
+    stats = nlp.get_stage_stats()['greeting']
+    assert stats['stages_run']['entities'] == 0
+    assert stats['stages_run']['sentiment'] == 0
+    
+    # Other intents still check the sentiment before answering
+    message = "I really dislike the new dashboard layout"
+    result = nlp.process_message(message)
+    assert result['intent'] not in ResponseManager.SMALL_TALK_INTENTS
+    responses.generate_response(message, result, [], "test_user")
+    assert 'sentiment' in result.stages_run
+
+
+if __name__ == "__main__":
+    test_greeting_skips_sentiment_and_entities()
+    test_stages_run_on_first_access()
+    test_template_reply_leaves_stages_unresolved()
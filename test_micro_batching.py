@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script to verify micro-batching of concurrent work items.
+"""
+
+import sys
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.batching import MicroBatcher
+
+
+def test_coalescing_and_result_order():
+    """Items submitted together share a batch and each caller gets its own result."""
+    
+    print("🧪 Testing Micro-batching")
+    print("=" * 50)
+    
+    batches = []
+    
+    def handler(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+    
+    batcher = MicroBatcher(handler, max_wait_ms=200, max_batch_size=8)
+    try:
+        futures = [batcher.submit(i) for i in range(20)]
+        assert [future.result(timeout=5) for future in futures] == [i * 2 for i in range(20)]
+        assert batches == [list(range(0, 8)), list(range(8, 16)), list(range(16, 20))]
+        
+        # Callers on many threads each get the result of their own item
+        results = {}
+        
+        def call(i):
+            results[i] = batcher.process(i, timeout=5)
+        
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(100, 140)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == {i: i * 2 for i in range(100, 140)}
+        
+        stats = batcher.get_stats()
+        assert stats['items'] == 60 and stats['max_batch_seen'] == 8
+        assert stats['batches'] < 60
+    finally:
+        batcher.close()
+    
+    print("✅ SUCCESS: Items are coalesced into batches!")
+
+
+def test_handler_errors_reach_every_future():
+    """A failing handler fails each future of its batch, and the worker keeps going."""
+    calls = []
+    
+    def handler(items):
+        calls.append(list(items))
+        if len(calls) == 1:
+            raise KeyError('model unavailable')
+        if len(calls) == 2:
+            return items[:-1]
+        return items
+    
+    batcher = MicroBatcher(handler, max_wait_ms=100)
+    try:
+        for expected in (KeyError, ValueError):
+            futures = [batcher.submit(i) for i in range(3)]
+            for future in futures:
+                try:
+                    future.result(timeout=5)
+                    assert False, "expected the handler error"
+                except expected:
+                    pass
+        assert batcher.process('ok', timeout=5) == 'ok'
+        assert batcher.get_stats()['errors'] == 2
+    finally:
+        batcher.close()
+
+
+def test_close_finishes_queued_items_and_rejects_new_ones():
+    """Queued items still run on close; later submits fail and nothing is left hanging."""
+    release = threading.Event()
+    
+    def handler(items):
+        release.wait(5)
+        return items
+    
+    batcher = MicroBatcher(handler, max_wait_ms=0, max_batch_size=1)
+    futures = [batcher.submit(i) for i in range(5)]
+    closer = threading.Thread(target=batcher.close)
+    closer.start()
+    time.sleep(0.05)
+    release.set()
+    closer.join(5)
+    assert [future.result(timeout=5) for future in futures] == list(range(5))
+    try:
+        batcher.submit(5)
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+
+
+def test_submits_racing_close_never_hang():
+    """Submits racing close() either raise or get a result; none block forever."""
+    for _ in range(20):
+        batcher = MicroBatcher(lambda items: items, max_wait_ms=0)
+        accepted = []
+        
+        def submit_many():
+            for i in range(200):
+                try:
+                    accepted.append(batcher.submit(i))
+                except RuntimeError:
+                    return
+        
+        threads = [threading.Thread(target=submit_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        batcher.close()
+        for thread in threads:
+            thread.join()
+        for future in accepted:
+            assert future.result(timeout=5) in range(200)
+
+
+def test_cancelled_and_timed_out_items_are_skipped():
+    """Cancelled or timed-out items never reach the handler, and the worker survives."""
+    release = threading.Event()
+    handled = []
+    
+    def handler(items):
+        release.wait(5)
+        handled.extend(items)
+        return None if 'broken' in items else items
+    
+    batcher = MicroBatcher(handler, max_wait_ms=0, max_batch_size=1)
+    try:
+        first = batcher.submit('first')
+        time.sleep(0.05)
+        cancelled = batcher.submit('cancelled')
+        assert cancelled.cancel()
+        try:
+            batcher.process('timed out', timeout=0.05)
+            assert False, "expected a timeout"
+        except FutureTimeoutError:
+            pass
+        broken = batcher.submit('broken')
+        last = batcher.submit('last')
+        release.set()
+        
+        assert first.result(timeout=5) == 'first'
+        try:
+            broken.result(timeout=5)
+            assert False, "expected the worker error"
+        except TypeError:
+            pass
+        assert last.result(timeout=5) == 'last'
+        assert handled == ['first', 'broken', 'last']
+    finally:
+        batcher.close()
+
+
+if __name__ == "__main__":
+    test_coalescing_and_result_order()
+    test_handler_errors_reach_every_future()
+    test_close_finishes_queued_items_and_rejects_new_ones()
+    test_submits_racing_close_never_hang()
+    test_cancelled_and_timed_out_items_are_skipped()
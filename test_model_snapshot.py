@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script to verify NLP model snapshots load and rebuild correctly.
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.nlp import NLPProcessor
+
+
+MESSAGES = [
+    "hello",
+    "What are your business hours?",
+    "how much does the subscription cost",
+    "create a support ticket, the app is down!",
+    "blah blah blah"
+]
+
+
+def test_snapshot_round_trip():
+    """A processor loaded from a snapshot must behave like a freshly fitted one."""
+    
+    print("🧪 Testing NLP Model Snapshot")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        snapshot_file = os.path.join(tmp_dir, 'nlp_model.pkl')
+        
+        built = NLPProcessor(snapshot_file=snapshot_file)
+        assert built.snapshot_status == 'built'
+        assert os.path.exists(snapshot_file)
+        
+        loaded = NLPProcessor(snapshot_file=snapshot_file)
+        assert loaded.snapshot_status == 'loaded'
+        
+        fresh = NLPProcessor()
+        for message in MESSAGES:
+            assert loaded.process_message(message) == fresh.process_message(message), message
+        assert loaded.keyword_rules.match("urgent: talk to a human") == fresh.keyword_rules.match("urgent: talk to a human")
+        
+        print("✅ SUCCESS: Snapshot model matches the fitted model!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_snapshot_rebuilt_when_sources_change():
+    """Changing the intents file must invalidate the snapshot."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        snapshot_file = os.path.join(tmp_dir, 'nlp_model.pkl')
+        intents_file = os.path.join(tmp_dir, 'intents.json')
+        intents = {
+            'greeting': {'patterns': ['hello'], 'responses': ['Hi!']},
+            'refund': {'patterns': ['refund my order'], 'responses': ['Sure.']}
+        }
+        with open(intents_file, 'w', encoding='utf-8') as f:
+            json.dump(intents, f)
+        
+        assert NLPProcessor(intents_file, snapshot_file=snapshot_file).snapshot_status == 'built'
+        assert NLPProcessor(intents_file, snapshot_file=snapshot_file).snapshot_status == 'loaded'
+        
+        intents['shipping'] = {'patterns': ['where is my parcel'], 'responses': ['Let me check.']}
+        with open(intents_file, 'w', encoding='utf-8') as f:
+            json.dump(intents, f)
+        
+        nlp = NLPProcessor(intents_file, snapshot_file=snapshot_file)
+        assert nlp.snapshot_status == 'built'
+        assert 'shipping' in nlp.intent_names
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_snapshot_round_trip()
+    test_snapshot_rebuilt_when_sources_change()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that batch NLP processing matches single-message processing.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.nlp import NLPProcessor
+
+
+def test_process_batch_matches_process_message():
+    """process_batch must return exactly what process_message returns per message."""
+    
+    print("🧪 Testing NLP Batch Processing Parity")
+    print("=" * 50)
+    
+    nlp = NLPProcessor()
+    
+    messages = [
+        "hello",
+        "how are you doing today?",
+        "What are your business hours",
+        "I forgot password for my account",
+        "Tell me about the Pro Plan features",
+        "how much does the subscription cost",
+        "create a support ticket, the app is down!",
+        "Call me at 555-123-4567 or email jane@example.com",
+        "I paid $29.99 on 12/05/2024 at 10:30 am",
+        "blah blah blah",
+        "",
+        "hello",
+        "thanks",
+        "see you"
+    ]
+    
+    batch_results = nlp.process_batch(messages)
+    assert len(batch_results) == len(messages)
+    
+    for message, batch_result in zip(messages, batch_results):
+        single_result = nlp.process_message(message)
+        assert batch_result == single_result, f"Mismatch for {message!r}"
+    
+    # Repeated messages must not share mutable results
+    assert batch_results[0] is not batch_results[11]
+    batch_results[0]['tokens'].append('mutated')
+    assert 'mutated' not in batch_results[11]['tokens']
+    
+    print("✅ SUCCESS: Batch results match single-message results!")
+
+
+def test_recognize_intent_batch_matches_recognize_intent():
+    """Batch intent recognition must agree with the single-message path."""
+    nlp = NLPProcessor()
+    
+    messages = ["bye", "pricing please", "I have a technical issue", "zzz", "hours?"]
+    assert nlp.recognize_intent_batch(messages) == [nlp.recognize_intent(m) for m in messages]
+    assert nlp.recognize_intent_batch([]) == []
+
+
+if __name__ == "__main__":
+    test_process_batch_matches_process_message()
+    test_recognize_intent_batch_matches_recognize_intent()
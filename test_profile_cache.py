@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the read-through user profile cache.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.cache import ProfileCache
+from chatbot.database import DatabaseManager
+
+
+def comparable(profile):
+    """Profile fields that do not depend on wall-clock time."""
+    return {key: value for key, value in profile.items() if key not in ('first_seen', 'last_seen')}
+
+
+def test_cached_profiles_stay_current():
+    """Cache hits skip SQLite and reflect messages, tickets and preferences."""
+    
+    print("🧪 Testing Profile Cache")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        plain = DatabaseManager(os.path.join(tmp_dir, 'plain.db'))
+        plain.initialize_database()
+        cached = DatabaseManager(os.path.join(tmp_dir, 'cached.db'))
+        cached.initialize_database()
+        cached.enable_counter_buffer(flush_interval_ms=60000)
+        cached.enable_profile_cache(max_size=16, ttl_seconds=60)
+        
+        for db in (plain, cached):
+            db.store_message('user1', 'session1', 'hello', 'user')
+            db.store_message('user1', 'session1', 'hi there', 'bot', confidence=0.9)
+        assert cached.get_user_profile('user1') == plain.get_user_profile('user1')
+        
+        # Every write updates the cached entry in place
+        for db in (plain, cached):
+            db.store_message('user1', 'session1', 'I need help', 'user')
+            db.create_ticket('user1', 'Help', 'Details')
+            db.update_user_preferences('user1', {'language': 'fr'})
+        
+        statements = []
+        conn = cached.connections.connection()
+        conn.set_trace_callback(statements.append)
+        profile = cached.get_user_profile('user1')
+        conn.set_trace_callback(None)
+        assert statements == []
+        assert comparable(profile) == comparable(plain.get_user_profile('user1'))
+        assert profile['total_messages'] == 3 and profile['total_tickets'] == 1
+        assert profile['preferences'] == {'language': 'fr'}
+        
+        # Callers get copies
+        profile['preferences']['language'] = 'de'
+        assert cached.get_user_profile('user1')['preferences'] == {'language': 'fr'}
+        
+        # The cache agrees with the database once it is dropped
+        cached.flush_counters()
+        cached.profile_cache.invalidate()
+        assert comparable(cached.get_user_profile('user1')) == comparable(plain.get_user_profile('user1'))
+        
+        assert cached.get_user_profile('missing') is None
+        stats = cached.health_check()['profile_cache']
+        assert stats['hits'] == 2 and stats['misses'] == 3
+        assert stats['hit_ratio'] == 0.4
+        assert plain.health_check()['profile_cache'] == {'enabled': False}
+        
+        plain.close()
+        cached.close()
+        print("✅ SUCCESS: Cached profiles stay current!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_load_racing_a_write_is_not_cached():
+    """A profile read while the same user is being written is not kept."""
+    cache = ProfileCache(max_size=4, ttl=60)
+    
+    def load_during_write(user_id):
+        with cache.writing(user_id, lambda profile: None):
+            return {'total_messages': 1}
+    
+    assert cache.get('user1', load_during_write) == {'total_messages': 1}
+    assert cache.get('user1', lambda user_id: {'total_messages': 2}) == {'total_messages': 2}
+    assert cache.get('user1', lambda user_id: {'total_messages': 3}) == {'total_messages': 2}
+    
+    # A failed write drops the entry instead of guessing
+    try:
+        with cache.writing('user1', lambda profile: profile.update(total_messages=99)):
+            raise RuntimeError('write failed')
+    except RuntimeError:
+        pass
+    assert cache.get('user1', lambda user_id: {'total_messages': 4}) == {'total_messages': 4}
+
+
+if __name__ == "__main__":
+    test_cached_profiles_stay_current()
+    test_load_racing_a_write_is_not_cached()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the slow-query log and the query plans of DatabaseManager.
+
+Every statement the database manager issues while serving requests is
+captured against a seeded database and its EXPLAIN QUERY PLAN checked for
+full table scans and temporary B-tree sorts.
+"""
+
+import sys
+import os
+import json
+import re
+import shutil
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+from chatbot.query_log import SlowQueryLog
+
+HOUR_MS = 3600000
+DAY_MS = 24 * HOUR_MS
+
+# Plan steps a hot query may take, per operation, with the reason
+ALLOWED = {
+    'get_tickets': [
+        (r'SCAN tickets USING INDEX idx_tickets_created_at_ms', "newest-first walk stopped by LIMIT")
+    ],
+    'get_statistics': [
+        (r'USE TEMP B-TREE FOR count\(DISTINCT\)', "distinct users/sessions of the rollup rows in the window")
+    ],
+    'search_conversations': [
+        (r'USE TEMP B-TREE FOR ORDER BY', "relevance order of the full-text matches")
+    ],
+    'search_tickets': [
+        (r'USE TEMP B-TREE FOR ORDER BY', "relevance order of the full-text matches")
+    ],
+    'export_conversations': [
+        (r'SCAN conversations USING INDEX idx_conversations_timestamp_ms', "keyset walk stopped by LIMIT")
+    ]
+}
+
+
+def seed(db: DatabaseManager) -> int:
+    """Fill a database with 60 days of conversations and some tickets."""
+    now_ms = db._now_ms()
+    db._write_message_batch([
+        (f'user{i % 20}', f'session{i % 7}', f'message {i} about my refund', 'bot' if i % 2 else 'user',
+         now_ms - (1440 - i) * HOUR_MS, 'greeting', 0.9, None, None)
+        for i in range(1440)
+    ])
+    for i in range(40):
+        db.create_ticket(f'user{i % 20}', f'refund request {i}', 'please help', category='billing')
+    return now_ms
+
+
+def hot_operations(db: DatabaseManager, now_ms: int) -> list:
+    """(operation, callable) pairs covering the request-serving queries."""
+    page = lambda: db.get_conversation_page('user1', limit=5)
+    return [
+        ('store_message', lambda: db.store_message('user1', 'session1', 'hello refund', 'user',
+                                                   intent='greeting', confidence=0.5,
+                                                   entities={'email': ['a@b.c']})),
+        ('get_conversation_history', lambda: db.get_conversation_history('user1')),
+        ('get_conversation_history', lambda: db.get_conversation_history('user1', 'session1')),
+        ('get_conversation_history', lambda: db.get_conversation_history('user1', before=page()['before'])),
+        ('get_conversation_history', lambda: db.get_conversation_history('user1', after=page()['before'])),
+        ('get_tickets', lambda: db.get_tickets()),
+        ('get_tickets', lambda: db.get_tickets(user_id='user1')),
+        ('get_tickets', lambda: db.get_tickets(status='open')),
+        ('get_tickets', lambda: db.get_tickets(user_id='user1', status='open')),
+        ('create_ticket', lambda: db.create_ticket('user1', 'subject', 'description')),
+        ('update_ticket_status', lambda: db.update_ticket_status(1, 'in_progress', 'agent1')),
+        ('get_user_profile', lambda: db.get_user_profile('user1')),
+        ('update_user_preferences', lambda: db.update_user_preferences('user1', {'language': 'en'})),
+        ('get_statistics', lambda: db.get_statistics(days=30)),
+        ('get_statistics', lambda: db.get_statistics_totals(days=7)),
+        ('search_conversations', lambda: db.search_conversations('refund')),
+        ('search_conversations', lambda: db.search_conversations('refund', user_id='user1', start_ms=0)),
+        ('search_tickets', lambda: db.search_tickets('refund')),
+        ('search_tickets', lambda: db.search_tickets('refund', user_id='user1', status='open')),
+        ('export_conversations', lambda: list(db.export_conversations('jsonl', chunk_size=500))),
+        ('export_conversations', lambda: list(db.export_conversations('jsonl', user_id='user1'))),
+        ('export_conversations', lambda: list(db.export_conversations('jsonl', start_ms=now_ms - 7 * DAY_MS,
+                                                                      end_ms=now_ms))),
+        ('cleanup_old_data', lambda: db.cleanup_old_data(days=50)),
+        ('archive_old_data', lambda: db.archive_old_data(days=40)),
+        ('iter_archived_history', lambda: list(db.iter_archived_history('user1')))
+    ]
+
+
+def maintenance_operations(db: DatabaseManager) -> list:
+    """Operations that read whole tables on purpose; their plans are not checked."""
+    return [
+        ('health_check', db.health_check),
+        ('backfill_rollups', db.backfill_rollups),
+        ('rebuild_user_counters', db.rebuild_user_counters),
+        ('rebuild_search_index', db.rebuild_search_index),
+        ('bulk_import', lambda: db.bulk_import([{'user_id': 'user99', 'message': 'imported'}]))
+    ]
+
+
+def plan_problems(plan: list) -> list:
+    """Plan steps that scan a whole table or index, or sort into a temporary B-tree."""
+    steps = [line.strip() for line in plan]
+    # Subqueries SQLite builds itself are scanned by design
+    built = {step.split(' ', 1)[1] for step in steps if step.startswith(('MATERIALIZE ', 'CO-ROUTINE '))}
+    problems = []
+    for step in steps:
+        match = re.match(r'SCAN (\S+)', step)
+        if match and match.group(1) not in built and 'VIRTUAL TABLE' not in step \
+                and not match.group(1).startswith('(subquery'):
+            problems.append(step)
+        elif 'USE TEMP B-TREE' in step:
+            problems.append(step)
+    return problems
+
+
+def capture(db: DatabaseManager, operations: list) -> dict:
+    """Run operations and collect the distinct statements each issued, with their plans."""
+    query_log = db.connections.query_log
+    statements = {}
+    for name, operation in operations:
+        query_log.clear()
+        operation()
+        for entry in query_log.get_entries():
+            statements.setdefault(name, {}).setdefault(entry['sql'], entry.get('plan'))
+    return statements
+
+
+def test_hot_queries_use_indexes():
+    """No request-serving query scans a table or sorts outside what ALLOWED lists."""
+    
+    print("🧪 Testing Query Plans")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        db.enable_archive(os.path.join(tmp_dir, 'archive'), after_days=40)
+        now_ms = seed(db)
+        db.connections.set_query_log(SlowQueryLog(threshold_ms=0, max_entries=100000, echo=False))
+        
+        operations = hot_operations(db, now_ms)
+        statements = capture(db, operations)
+        assert set(statements) == {name for name, _ in operations}
+        failures = []
+        for name, plans in statements.items():
+            allowed = ALLOWED.get(name, [])
+            for sql, plan in plans.items():
+                for step in plan_problems(plan or []):
+                    if not any(re.search(pattern, step) for pattern, _ in allowed):
+                        failures.append(f"{name}: {step}\n    {sql}\n    " + '\n    '.join(plan))
+        assert not failures, "Hot queries without a usable index:\n" + '\n'.join(failures)
+        
+        total = sum(len(plans) for plans in statements.values())
+        print(f"📊 Checked {total} statements of {len(statements)} operations")
+        db.close()
+        print("✅ SUCCESS: Hot queries use indexes!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_every_query_is_explained():
+    """Maintenance statements can be explained too, including whole-table reads."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        seed(db)
+        db.connections.set_query_log(SlowQueryLog(threshold_ms=0, max_entries=100000, echo=False))
+        
+        statements = capture(db, maintenance_operations(db))
+        assert set(statements) == {name for name, _ in maintenance_operations(db)}
+        for name, plans in statements.items():
+            for sql, plan in plans.items():
+                # Schema statements cannot be explained once they have run
+                if sql.split(' ', 1)[0].upper() in ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'):
+                    assert plan is not None, f"{name}: cannot explain {sql}"
+        
+        # A backfill reads every conversation, which the checker reports
+        backfill = [step for plan in statements['backfill_rollups'].values() for step in plan_problems(plan or [])]
+        assert any(step.startswith('SCAN conversations') for step in backfill)
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_slow_query_log():
+    """Slow statements are logged with their plan but no parameters, counting fetch time."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        log_file = os.path.join(tmp_dir, 'slow.jsonl')
+        db.enable_slow_query_log(threshold_ms=25, log_file=log_file)
+        assert db.health_check()['slow_query_log']['slow_queries'] == 0
+        
+        conn = db.connections.connection()
+        conn.create_function('sleep_ms', 1, lambda ms: time.sleep(ms / 1000.0) or ms)
+        db.store_message('user1', 'session1', 'fast', 'user')
+        assert db.get_slow_queries() == []
+        
+        # Each row sleeps 10 ms: only the first is stepped by execute, the rest while fetching
+        rows = conn.execute('SELECT sleep_ms(10), user_id FROM conversations, (SELECT 1 UNION ALL SELECT 2 '
+                            'UNION ALL SELECT 3) WHERE user_id = ?', ('user1',)).fetchall()
+        assert len(rows) == 3
+        entries = db.get_slow_queries()
+        assert len(entries) == 1
+        assert entries[0]['duration_ms'] >= 25 and 'params' not in entries[0]
+        assert any('conversations' in step for step in entries[0]['plan'])
+        
+        with open(log_file, encoding='utf-8') as f:
+            assert [json.loads(line) for line in f] == entries
+        health = db.health_check()['slow_query_log']
+        assert health['slow_queries'] == 1 and health['threshold_ms'] == 25
+        
+        # Parameter values never reach the log, only the placeholders
+        conn.execute('SELECT sleep_ms(30), ?', ('my secret message',)).fetchone()
+        assert db.get_slow_queries()[-1]['sql'] == 'SELECT sleep_ms(30), ?'
+        with open(log_file, encoding='utf-8') as f:
+            assert 'my secret message' not in f.read()
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_hot_queries_use_indexes()
+    test_every_query_is_explained()
+    test_slow_query_log()
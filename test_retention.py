@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the batched background retention job.
+"""
+
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+from chatbot.retention import RetentionJob, validate_policy_overrides
+
+DAY_MS = 86400000
+
+
+def test_background_retention_with_policies():
+    """Expired rows are removed in batches according to each table's policy."""
+    
+    print("🧪 Testing Retention Job")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        db.configure_retention(batch_size=50, pause_ms=0, vacuum_pages=1000)
+        now_ms = db._now_ms()
+        
+        padding = 'x' * 2000
+        old = [('user1', 'session1', f'old {i} {padding}', 'user', now_ms - 100 * DAY_MS - i,
+                None, None, None, None) for i in range(230)]
+        recent = [('user1', 'session1', f'recent {i}', 'user', now_ms - DAY_MS, None, None, None, None)
+                  for i in range(10)]
+        db._write_message_batch(old + recent)
+        
+        for _ in range(3):
+            db.create_ticket('user1', 'Subject', 'Description')
+        db.update_ticket_status(1, 'closed')
+        db.update_ticket_status(2, 'closed')
+        conn = db.connections.connection()
+        conn.execute('UPDATE tickets SET updated_at_ms = ? WHERE ticket_id IN (1, 2, 3)', (now_ms - 400 * DAY_MS,))
+        conn.execute('UPDATE tickets SET updated_at_ms = ? WHERE ticket_id = 2', (now_ms,))
+        conn.execute('INSERT INTO analytics (date, date_ms) VALUES (?, ?)', ('2000-01-01', 946684800000))
+        
+        assert db.get_retention_status() == {'state': 'idle'}
+        started = db.run_retention(background=True)
+        assert started['state'] == 'running'
+        assert db.retention_job.wait(timeout=30)
+        
+        status = db.get_retention_status()
+        assert status['state'] == 'completed', status
+        assert status['deleted'] == {'conversations': 230, 'tickets': 1, 'analytics': 1}
+        assert status['batches'] == 5 + 1 + 1
+        assert status['pages_vacuumed'] > 0
+        
+        remaining = [m['message'] for m in db.get_conversation_history('user1', limit=500)]
+        assert remaining == [f'recent {i}' for i in range(10)]
+        # Open and recently closed tickets are kept, and the counters follow
+        assert sorted(t['ticket_id'] for t in db.get_tickets()) == [2, 3]
+        assert conn.execute("SELECT count FROM ticket_status_counts WHERE status = 'closed'").fetchone()[0] == 1
+        assert db.health_check()['retention']['total_deleted'] == 232
+        
+        db.close()
+        print("✅ SUCCESS: Retention job removed expired rows!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_cleanup_old_data_and_vacuum_conversion():
+    """The synchronous cleanup keeps its contract and vacuum enables incremental mode."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'chatbot.db')
+        # A database created before incremental auto-vacuum was the default
+        legacy = sqlite3.connect(path)
+        legacy.execute('CREATE TABLE placeholder (id INTEGER)')
+        legacy.commit()
+        legacy.close()
+        
+        db = DatabaseManager(path)
+        db.initialize_database()
+        assert db.health_check()['auto_vacuum'] == 0
+        db.vacuum()
+        assert db.health_check()['auto_vacuum'] == 2
+        
+        now_ms = db._now_ms()
+        db._write_message_batch([
+            ('user1', 'session1', f'message {i}', 'user', now_ms - i * DAY_MS + 3600000, None, None, None, None)
+            for i in range(10)
+        ])
+        assert db.cleanup_old_data(days=5) == 4
+        assert len(db.get_conversation_history('user1')) == 6
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_request_policy_overrides_are_validated():
+    """Clients may only set days and statuses of known tables."""
+    overrides = {'conversations': {'days': 30}, 'tickets': {'days': 0, 'statuses': ['closed']}}
+    assert validate_policy_overrides(overrides) == overrides
+    # Numeric days are converted the way the endpoint always did
+    assert validate_policy_overrides({'conversations': {'days': '30'}}) == {'conversations': {'days': 30}}
+    assert validate_policy_overrides({'analytics': {'days': 7.0}}) == {'analytics': {'days': 7}}
+    
+    rejected = [
+        {'conversations': {'column': '-1e18', 'days': 1}},
+        {'sqlite_master': {'days': 1}},
+        {'conversations': {'days': 'thirty'}},
+        {'conversations': {'days': None}},
+        {'conversations': {'days': -1}},
+        {'conversations': {'days': '-1'}},
+        {'conversations': {'days': 10 ** 12}},
+        {'conversations': {'days': float('inf')}},
+        {'conversations': {'days': True}},
+        {'tickets': {'statuses': 'closed'}},
+        {'tickets': {'statuses': [1]}},
+        {'conversations': 30},
+        ['conversations']
+    ]
+    for policies in rejected:
+        try:
+            validate_policy_overrides(policies)
+            assert False, f"expected ValueError for {policies}"
+        except ValueError:
+            pass
+    
+    # Bad days fail when the job is created instead of inside its thread
+    try:
+        RetentionJob(None, {'analytics': {'days': '30'}})
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_purge_waits_for_the_archive():
+    """Conversations younger than the archive threshold are kept until archived."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        db.enable_archive(os.path.join(tmp_dir, 'archive'), after_days=30)
+        now_ms = db._now_ms()
+        db._write_message_batch([
+            ('user1', 'session1', f'{age} days', 'user', now_ms - age * DAY_MS, None, None, None, None)
+            for age in (1, 10, 20, 40, 50)
+        ])
+        
+        status = db.run_retention({'conversations': {'days': 5}})
+        assert status['state'] == 'completed', status
+        assert status['archived'] == 2
+        assert status['deleted']['conversations'] == 0
+        
+        live = [m['message'] for m in db.get_conversation_history('user1', limit=10)]
+        archived = [m['message'] for m in db.iter_archived_history('user1')]
+        assert sorted(live) == ['1 days', '10 days', '20 days']
+        assert sorted(archived) == ['40 days', '50 days']
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_background_retention_with_policies()
+    test_cleanup_old_data_and_vacuum_conversion()
+    test_request_policy_overrides_are_validated()
+    test_purge_waits_for_the_archive()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the epoch-millisecond timestamp schema migration.
+"""
+
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+from chatbot.migrations import SCHEMA_VERSION
+
+LEGACY_SCHEMA = '''
+    CREATE TABLE conversations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        session_id TEXT NOT NULL,
+        message TEXT NOT NULL,
+        sender TEXT NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        intent TEXT,
+        confidence REAL,
+        entities TEXT,
+        sentiment TEXT
+    );
+    CREATE TABLE tickets (
+        ticket_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        description TEXT NOT NULL,
+        priority TEXT DEFAULT 'medium',
+        status TEXT DEFAULT 'open',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        assigned_to TEXT,
+        category TEXT
+    );
+    CREATE INDEX idx_conversations_timestamp ON conversations(timestamp);
+'''
+
+
+def epoch_ms(text: str) -> int:
+    parsed = datetime.fromisoformat(text.replace(' ', 'T')).replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def make_legacy_db(path: str, count: int = 53):
+    """Create a database the way versions without migrations left it."""
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany(
+        'INSERT INTO conversations (user_id, session_id, message, sender, timestamp) VALUES (?, ?, ?, ?, ?)',
+        [('user1', 'session1', f'message {i}', 'user', f'2024-01-{1 + i % 28:02d} 10:{i % 60:02d}:00')
+         for i in range(count)]
+    )
+    conn.execute(
+        "INSERT INTO tickets (user_id, subject, description, created_at, updated_at) "
+        "VALUES ('user1', 'Subject', 'Description', '2024-02-03T04:05:06.789', '2024-02-04 00:00:00')"
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_database_is_migrated_in_chunks():
+    """Existing text timestamps are converted and range queries use the new index."""
+    
+    print("🧪 Testing Schema Migration")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'chatbot.db')
+        make_legacy_db(path)
+        
+        db = DatabaseManager(path)
+        db.migrator.batch_size = 10
+        progress = []
+        db.initialize_database(migration_progress=progress.append)
+        
+        conversation_chunks = [p for p in progress if p['table'] == 'conversations' and p['version'] == 1]
+        assert len(conversation_chunks) == 6
+        assert conversation_chunks[-1]['rows'] == 53
+        
+        conn = db.connections.connection()
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        for text, value in conn.execute('SELECT timestamp, timestamp_ms FROM conversations'):
+            assert value == epoch_ms(text)
+        created, updated = conn.execute('SELECT created_at_ms, updated_at_ms FROM tickets').fetchone()
+        assert created == epoch_ms('2024-02-03T04:05:06.789')
+        assert updated == epoch_ms('2024-02-04 00:00:00')
+        
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert 'idx_conversations_timestamp_ms' in indexes
+        assert 'idx_conversations_timestamp' not in indexes
+        plan = ' '.join(row[3] for row in conn.execute(
+            'EXPLAIN QUERY PLAN DELETE FROM conversations WHERE timestamp_ms < ?', (0,)))
+        assert 'idx_conversations_timestamp_ms' in plan
+        
+        # Migrated rows are visible to the rollups and the query paths
+        assert db.get_statistics(100000)['total_messages'] == 53
+        assert db.cleanup_old_data(days=1) == 53
+        
+        # New rows are written with both representations
+        db.store_message('user2', 'session2', 'hello', 'user')
+        text, value = conn.execute('SELECT timestamp, timestamp_ms FROM conversations').fetchone()
+        assert epoch_ms(text) == value - value % 1000
+        
+        # Running again is a no-op
+        progress.clear()
+        db.initialize_database(migration_progress=progress.append)
+        assert progress == []
+        db.close()
+        
+        print("✅ SUCCESS: Legacy database migrated!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_interrupted_migration_resumes():
+    """Rows a previous run already converted are not rewritten."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'chatbot.db')
+        make_legacy_db(path, count=20)
+        conn = sqlite3.connect(path)
+        conn.execute('ALTER TABLE conversations ADD COLUMN timestamp_ms INTEGER')
+        conn.execute('UPDATE conversations SET timestamp_ms = -1 WHERE id <= 5')
+        conn.commit()
+        conn.close()
+        
+        db = DatabaseManager(path)
+        progress = []
+        db.initialize_database(migration_progress=progress.append)
+        assert [p['rows'] for p in progress if p['table'] == 'conversations' and p['version'] == 1] == [15]
+        rows = db.connections.connection().execute('SELECT COUNT(*) FROM conversations WHERE timestamp_ms = -1')
+        assert rows.fetchone()[0] == 5
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_legacy_database_is_migrated_in_chunks()
+    test_interrupted_migration_resumes()
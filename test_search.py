@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test script to verify full-text search over conversations and tickets.
+"""
+
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+from chatbot.sharding import ShardedDatabaseManager
+
+DAY_MS = 86400000
+
+
+def test_search_conversations_and_tickets():
+    """Triggers keep the indexes in sync and filters narrow the results."""
+    
+    print("🧪 Testing Full-Text Search")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        now_ms = db._now_ms()
+        
+        db._write_message_batch([
+            ('user1', 's1', 'I want a refund for my order', 'user', now_ms - 10 * DAY_MS, None, None, None, None),
+            ('user1', 's1', 'Refund refund refund, please!', 'user', now_ms - 2 * DAY_MS, None, None, None, None),
+            ('user2', 's2', 'Refunds take 5 days', 'bot', now_ms - DAY_MS, None, None, None, None),
+            ('user2', 's2', 'What are your business hours?', 'user', now_ms, None, None, None, None),
+            ('user3', 's3', 'Je veux être remboursé', 'user', now_ms, None, None, None, None)
+        ])
+        
+        page = db.search_conversations('refund')
+        assert [r['message'] for r in page['results']] == [
+            'Refund refund refund, please!', 'I want a refund for my order'
+        ]
+        assert '[refund]' in page['results'][1]['snippet']
+        assert len(db.search_conversations('refund*')['results']) == 3
+        assert len(db.search_conversations('etre')['results']) == 1
+        
+        # User and time-range filters
+        week_ago = now_ms - 7 * DAY_MS
+        assert [r['user_id'] for r in db.search_conversations('refund*', start_ms=week_ago)['results']] == ['user1', 'user2']
+        assert len(db.search_conversations('refund*', user_id='user2')['results']) == 1
+        assert db.search_conversations('refund*', end_ms=week_ago)['results'][0]['message'] == 'I want a refund for my order'
+        
+        # Pagination
+        first = db.search_conversations('refund*', limit=2)
+        second = db.search_conversations('refund*', limit=2, offset=2)
+        assert first['has_more'] and not second['has_more']
+        assert len({r['id'] for r in first['results'] + second['results']}) == 3
+        
+        # FTS syntax in user input is matched literally
+        assert db.search_conversations('refund" OR hours')['results'] == []
+        try:
+            db.search_conversations('?!')
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        
+        # Tickets, including updates and deletes
+        ticket_id = db.create_ticket('user1', 'Refund request', 'Charged twice for the Pro plan', 'high')
+        db.create_ticket('user2', 'Login issue', 'Password reset email never arrives')
+        assert [r['ticket_id'] for r in db.search_tickets('pro plan')['results']] == [ticket_id]
+        assert db.search_tickets('refund', status='closed')['results'] == []
+        db.update_ticket_status(ticket_id, 'closed')
+        assert [r['ticket_id'] for r in db.search_tickets('refund', status='closed')['results']] == [ticket_id]
+        
+        conn = db.connections.connection()
+        with db.connections.transaction():
+            conn.execute("UPDATE tickets SET subject = 'Billing question' WHERE ticket_id = ?", (ticket_id,))
+        assert db.search_tickets('refund')['results'] == []
+        assert len(db.search_tickets('billing')['results']) == 1
+        
+        db.cleanup_old_data(days=5)
+        assert sorted(r['message'] for r in db.search_conversations('refund*')['results']) == [
+            'Refund refund refund, please!', 'Refunds take 5 days'
+        ]
+        conn.execute("INSERT INTO conversations_fts (conversations_fts) VALUES ('integrity-check')")
+        assert db.health_check()['search'] == {'enabled': True}
+        db.close()
+        
+        print("✅ SUCCESS: Full-text search works!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_existing_database_is_indexed():
+    """Databases created before full-text search get their rows indexed."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'chatbot.db')
+        db = DatabaseManager(path)
+        db.initialize_database()
+        db.store_message('user1', 's1', 'where is my refund', 'user')
+        db.create_ticket('user1', 'Refund', 'Still waiting')
+        db.close()
+        
+        conn = sqlite3.connect(path)
+        for name in ('conversations_fts', 'tickets_fts'):
+            for suffix in ('_insert', '_delete', '_update'):
+                conn.execute(f'DROP TRIGGER {name}{suffix}')
+            conn.execute(f'DROP TABLE {name}')
+        conn.commit()
+        conn.close()
+        
+        db = DatabaseManager(path)
+        db.initialize_database()
+        assert len(db.search_conversations('refund')['results']) == 1
+        assert len(db.search_tickets('waiting')['results']) == 1
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_rank_window_truncation_is_reported():
+    """Searches across users flag pages that left matches outside the rank window."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        db.search.rank_window = 3
+        now_ms = db._now_ms()
+        db._write_message_batch([
+            (f'user{i % 2}', 's', f'refund number {i}', 'user', now_ms - (5 - i) * DAY_MS, None, None, None, None)
+            for i in range(5)
+        ])
+        
+        # Only the three newest matches are ranked and paged through
+        pages = [db.search_conversations('refund', limit=2, offset=offset) for offset in (0, 2)]
+        assert [page['has_more'] for page in pages] == [True, False]
+        assert [page['truncated'] for page in pages] == [True, True]
+        assert sorted(r['message'] for page in pages for r in page['results']) == \
+            [f'refund number {i}' for i in range(2, 5)]
+        assert pages[0]['rank_window'] == 3
+        
+        # The cursor moves the window to the older matches
+        older = db.search_conversations('refund', before=pages[0]['next_before'])
+        assert sorted(r['message'] for r in older['results']) == ['refund number 0', 'refund number 1']
+        assert not older['truncated'] and older['next_before'] is None
+        try:
+            db.search_conversations('refund', before='abc')
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        
+        # Exactly a window of matches, user searches and tickets are complete
+        assert not db.search_conversations('refund', start_ms=now_ms - 3 * DAY_MS)['truncated']
+        assert len(db.search_conversations('refund', user_id='user0')['results']) == 3
+        assert not db.search_conversations('refund', user_id='user0')['truncated']
+        db.create_ticket('user1', 'Refund', 'Please')
+        assert not db.search_tickets('refund')['truncated']
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_sharded_search_merges_shards():
+    """Searches fan out to every shard and return global ticket IDs."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = ShardedDatabaseManager(3, tmp_dir)
+        db.initialize_database()
+        ticket_ids = []
+        for i in range(9):
+            db.store_message(f'user{i}', 's', f'refund number {i}', 'user')
+            ticket_ids.append(db.create_ticket(f'user{i}', 'Refund', f'Ticket {i}'))
+        
+        pages = [db.search_conversations('refund', limit=4, offset=offset) for offset in (0, 4, 8)]
+        assert [page['has_more'] for page in pages] == [True, True, False]
+        assert not any(page['truncated'] for page in pages)
+        assert sorted(r['message'] for page in pages for r in page['results']) == \
+            sorted(f'refund number {i}' for i in range(9))
+        assert len(db.search_conversations('refund', user_id='user4')['results']) == 1
+        
+        # Each shard's window moves on its own until every match was seen
+        for shard in db.shards:
+            shard.search.rank_window = 1
+        seen = []
+        before = None
+        while True:
+            page = db.search_conversations('refund', limit=20, before=before)
+            seen.extend(r['message'] for r in page['results'])
+            before = page['next_before']
+            if before is None:
+                break
+        assert sorted(seen) == sorted(f'refund number {i}' for i in range(9))
+        
+        found = db.search_tickets('refund', limit=20)['results']
+        assert sorted(r['ticket_id'] for r in found) == sorted(ticket_ids)
+        assert db.update_ticket_status(found[0]['ticket_id'], 'closed')
+        assert [r['ticket_id'] for r in db.search_tickets('refund', status='closed')['results']] == [found[0]['ticket_id']]
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_search_conversations_and_tickets()
+    test_existing_database_is_indexed()
+    test_rank_window_truncation_is_reported()
+    test_sharded_search_merges_shards()
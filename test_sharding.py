@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script to verify user-sharded database storage.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+from chatbot.sharding import ShardedDatabaseManager, shard_for
+
+
+def fill(db, users: int = 12):
+    for i in range(users):
+        user_id = f'user{i}'
+        for turn in range(3):
+            db.store_message(user_id, f'{user_id}-session', f'question {turn}', 'user')
+            db.store_message(user_id, f'{user_id}-session', f'answer {turn}', 'bot', confidence=0.1 * (i % 10))
+        db.create_ticket(user_id, f'Subject {i}', 'Description')
+
+
+def test_sharded_storage_matches_single_database():
+    """Routing, fan-out statistics and merged ticket lists match one database."""
+    
+    print("🧪 Testing Sharded Storage")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        single = DatabaseManager(os.path.join(tmp_dir, 'single.db'))
+        single.initialize_database()
+        sharded = ShardedDatabaseManager(4, os.path.join(tmp_dir, 'shards'))
+        sharded.initialize_database()
+        fill(single)
+        fill(sharded)
+        
+        # Stable routing: each user's rows live only in their shard
+        assert shard_for('user1', 4) == shard_for('user1', 4)
+        for index, shard in enumerate(sharded.shards):
+            users = {row[0] for row in shard.connections.connection().execute(
+                'SELECT DISTINCT user_id FROM conversations')}
+            assert all(shard_for(user_id, 4) == index for user_id in users)
+        assert len({shard_for(f'user{i}', 4) for i in range(12)}) > 1
+        
+        history = [(m['message'], m['sender']) for m in sharded.get_conversation_history('user5')]
+        assert history == [(m['message'], m['sender']) for m in single.get_conversation_history('user5')]
+        assert sharded.get_user_profile('user5')['total_messages'] == 6
+        
+        expected = single.get_statistics(1)
+        assert sharded.get_statistics(1) == expected
+        assert expected['unique_users'] == 12 and expected['total_messages'] == 72
+        
+        # A session ID shared by users on different shards counts once
+        for db in (single, sharded):
+            db.store_message('user1', 'shared-session', 'hello', 'user')
+            db.store_message('user2', 'shared-session', 'hello', 'user')
+        assert shard_for('user1', 4) != shard_for('user2', 4)
+        expected = single.get_statistics(1)
+        assert expected['total_conversations'] == 13
+        assert sharded.get_statistics(1) == expected
+        
+        # Global ticket IDs route status updates to the right shard
+        tickets = sharded.get_tickets(limit=5)
+        assert len(tickets) == 5
+        created = [t['created_at_ms'] for t in tickets]
+        assert created == sorted(created, reverse=True)
+        all_tickets = sharded.get_tickets(limit=100)
+        assert sorted(t['subject'] for t in all_tickets) == sorted(t['subject'] for t in single.get_tickets(limit=100))
+        assert len({t['ticket_id'] for t in all_tickets}) == 12
+        target = tickets[2]
+        assert sharded.update_ticket_status(target['ticket_id'], 'closed')
+        assert [t['ticket_id'] for t in sharded.get_tickets(status='closed')] == [target['ticket_id']]
+        assert sharded.get_statistics(1)['open_tickets'] == 11
+        assert [t['user_id'] for t in sharded.get_tickets(user_id='user3')] == ['user3']
+        
+        health = sharded.health_check()
+        assert health['status'] == 'healthy'
+        assert health['statistics']['conversations_count'] == 74
+        
+        single.close()
+        sharded.close()
+        print("✅ SUCCESS: Sharded storage is consistent!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_sharded_storage_matches_single_database()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test script to verify statistics rollups against raw conversation queries.
+"""
+
+import sys
+import os
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+from chatbot.rollups import HOUR_MS, ROLLUP_TABLES, floor_to
+
+
+def make_history(db: DatabaseManager, now: datetime, count: int = 600):
+    """Store messages spread over the last ten days."""
+    rng = random.Random(13)
+    records = []
+    for i in range(count):
+        timestamp = now - timedelta(minutes=rng.randrange(10 * 24 * 60))
+        sender = rng.choice(['user', 'bot'])
+        records.append((
+            f'user{rng.randrange(12)}', f'session{rng.randrange(30)}', f'message {i}', sender,
+            int(timestamp.timestamp() * 1000), None,
+            rng.random() if sender == 'bot' and i % 7 else None, None, None
+        ))
+    # Several write batches, like the write-behind queue produces
+    for start in range(0, count, 100):
+        db._write_message_batch(records[start:start + 100])
+
+
+def raw_statistics(db: DatabaseManager, start_ms: int, end_ms: int) -> dict:
+    """Compute the rollup figures straight from the conversations table."""
+    cursor = db.connections.connection().cursor()
+    window = 'timestamp_ms BETWEEN ? AND ?'
+    params = (floor_to(start_ms, HOUR_MS), floor_to(end_ms, HOUR_MS) + HOUR_MS - 1)
+    cursor.execute(f'''
+        SELECT COUNT(*), COUNT(DISTINCT user_id), COUNT(DISTINCT session_id)
+        FROM conversations WHERE {window}
+    ''', params)
+    total_messages, unique_users, total_conversations = cursor.fetchone()
+    cursor.execute(f"SELECT AVG(confidence) FROM conversations WHERE sender = 'bot' AND {window}", params)
+    avg_confidence = cursor.fetchone()[0] or 0.0
+    cursor.execute("SELECT COUNT(*) FROM tickets WHERE status = 'open'")
+    return {
+        'total_messages': total_messages,
+        'unique_users': unique_users,
+        'total_conversations': total_conversations,
+        'open_tickets': cursor.fetchone()[0],
+        'avg_confidence': avg_confidence
+    }
+
+
+def rollup_rows(db: DatabaseManager) -> dict:
+    cursor = db.connections.connection().cursor()
+    return {table: sorted(cursor.execute(f'SELECT * FROM {table}').fetchall()) for table in ROLLUP_TABLES}
+
+
+def test_rollups_match_raw_queries():
+    """Rollup statistics equal the same figures computed from raw rows."""
+    
+    print("🧪 Testing Statistics Rollups")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        now = datetime.now(timezone.utc)
+        make_history(db, now)
+        
+        for ticket in range(5):
+            db.create_ticket(f'user{ticket}', 'Subject', 'Description')
+        db.update_ticket_status(1, 'closed')
+        db.update_ticket_status(2, 'in_progress')
+        db.update_ticket_status(2, 'open')
+        
+        now_ms = int(now.timestamp() * 1000)
+        windows = [(now - timedelta(days=days), now) for days in (1, 3, 7, 30)]
+        windows.append((now - timedelta(days=6, hours=5), now - timedelta(days=2, hours=3)))
+        windows.append((now - timedelta(hours=5), now - timedelta(hours=2)))
+        
+        cursor = db.connections.connection().cursor()
+        for start, end in windows:
+            start_ms, end_ms = int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+            expected = raw_statistics(db, start_ms, end_ms)
+            actual = db.rollups.read_statistics(cursor, start_ms, end_ms)
+            assert abs(actual.pop('avg_confidence') - expected.pop('avg_confidence')) < 1e-9
+            assert {key: actual[key] for key in expected} == expected, (start, end, actual, expected)
+        
+        stats = db.get_statistics(7)
+        expected = raw_statistics(db, now_ms - 7 * 24 * HOUR_MS, now_ms)
+        assert stats['total_messages'] == expected['total_messages']
+        assert stats['unique_users'] == expected['unique_users']
+        assert stats['open_tickets'] == 4
+        
+        print("✅ SUCCESS: Rollups match raw queries!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_backfill_rebuilds_incremental_rollups():
+    """A backfill reproduces the rollups maintained on write."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        make_history(db, datetime.now(timezone.utc), count=300)
+        db.store_message('user1', 'session1', 'hello', 'user')
+        db.store_message('user1', 'session1', 'hi there', 'bot', confidence=0.5)
+        db.create_ticket('user1', 'Subject', 'Description')
+        
+        incremental = rollup_rows(db)
+        db.backfill_rollups()
+        rebuilt = rollup_rows(db)
+        
+        for table in ROLLUP_TABLES:
+            if table in ('stats_hourly', 'stats_daily'):
+                # Confidence sums may differ in the last float bits
+                for before, after in zip(incremental[table], rebuilt[table]):
+                    assert before[:3] == after[:3] and before[4] == after[4]
+                    assert abs(before[3] - after[3]) < 1e-9
+                assert len(incremental[table]) == len(rebuilt[table])
+            else:
+                assert incremental[table] == rebuilt[table], table
+        
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_backfill_keeps_purged_history():
+    """Statistics are the same whether or not a backfill runs after retention and archiving."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        now = datetime.now(timezone.utc)
+        make_history(db, now)
+        
+        cursor = db.connections.connection().cursor()
+        windows = [(now - timedelta(days=days), now) for days in (1, 3, 5, 7, 30)]
+        windows.append((now - timedelta(days=6, hours=5), now - timedelta(days=2, hours=3)))
+        windows = [(int(start.timestamp() * 1000), int(end.timestamp() * 1000)) for start, end in windows]
+        
+        def statistics():
+            figures = [db.rollups.read_statistics(cursor, start_ms, end_ms) for start_ms, end_ms in windows]
+            for stats in figures:
+                stats['confidence_sum'] = round(stats.pop('confidence_sum'), 9)
+                stats['avg_confidence'] = round(stats.pop('avg_confidence'), 9)
+            return figures
+        
+        before = statistics()
+        # Purge before archiving is enabled; afterwards retention keeps rows until they are archived
+        db.cleanup_old_data(days=6)
+        db.enable_archive(os.path.join(tmp_dir, 'archive'), after_days=4)
+        db.archive_old_data()
+        remaining = cursor.execute('SELECT MIN(timestamp_ms) FROM conversations').fetchone()[0]
+        assert remaining > int((now - timedelta(days=4, hours=1)).timestamp() * 1000)
+        assert statistics() == before
+        
+        db.backfill_rollups()
+        assert statistics() == before
+        
+        # Recent buckets lost from the rollups are recounted from the raw rows
+        with db.connections.transaction() as conn:
+            for granularity in ('hourly', 'daily'):
+                conn.execute(f'DELETE FROM stats_{granularity} WHERE bucket_start > ?', (remaining + 24 * HOUR_MS,))
+        db.backfill_rollups()
+        assert statistics() == before
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_rollups_match_raw_queries()
+    test_backfill_rebuilds_incremental_rollups()
+    test_backfill_keeps_purged_history()
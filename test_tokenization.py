@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the fast regex tokenizer matches the NLTK tokenizer.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.nlp import NLPProcessor
+
+
+SAMPLE_MESSAGES = [
+    "Hello, how are you?",
+    "I cannot log in to my account!!",
+    "I'm gonna need a refund, wanna help?",
+    "Gimme the pricing for the Pro Plan",
+    "Lemme know when you're open... gotta go",
+    "My order #12345 costs $29.99 (not 19.99)",
+    "Contact me at jane.doe@example.com or 555-123-4567",
+    "The API integration isn't working since 10:30 am",
+    "What are your business hours on 12/24/2024?",
+    "don't won't can't shouldn't",
+    "   lots   of    spaces   ",
+    ""
+]
+
+
+def test_regex_tokenizer_matches_nltk():
+    """Both tokenizer modes must produce the same tokens for preprocessed text."""
+    
+    print("🧪 Testing Tokenizer Parity")
+    print("=" * 50)
+    
+    nltk_nlp = NLPProcessor(tokenizer='nltk')
+    regex_nlp = NLPProcessor(tokenizer='regex')
+    
+    for message in SAMPLE_MESSAGES:
+        preprocessed = nltk_nlp.preprocess_text(message)
+        assert regex_nlp.tokenize(preprocessed) == nltk_nlp.tokenize(preprocessed), message
+        assert regex_nlp.tokenize_and_lemmatize(preprocessed) == nltk_nlp.tokenize_and_lemmatize(preprocessed), message
+    
+    print("✅ SUCCESS: Regex and NLTK tokenizers agree!")
+
+
+def test_stopwords_and_lemma_cache():
+    """Stopwords are a frozen set and repeated tokens hit the lemma cache."""
+    nlp = NLPProcessor(lemma_cache_size=128)
+    
+    assert isinstance(nlp.stop_words, frozenset)
+    assert 'the' in nlp.stop_words
+    
+    nlp.tokenize_and_lemmatize("tickets tickets tickets")
+    cache_info = nlp._lemmatize.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 2
+    assert 'the' not in nlp.tokenize_and_lemmatize("the ticket")
+
+
+def test_unknown_tokenizer_rejected():
+    """An unknown tokenizer mode is a configuration error."""
+    try:
+        NLPProcessor(tokenizer='whitespace')
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError for unknown tokenizer")
+
+
+if __name__ == "__main__":
+    test_regex_tokenizer_matches_nltk()
+    test_stopwords_and_lemma_cache()
+    test_unknown_tokenizer_rejected()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script to verify write-behind message storage.
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chatbot.database import DatabaseManager
+from chatbot.write_behind import WriteBehindQueue
+
+
+def test_read_your_writes_and_group_commit():
+    """Queued messages are visible to the writer's own history reads."""
+    
+    print("🧪 Testing Write-behind Storage")
+    print("=" * 50)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        # A long interval proves reads flush instead of waiting for the timer
+        db.enable_write_behind(flush_interval_ms=10000, batch_size=100)
+        
+        start = time.perf_counter()
+        for i in range(20):
+            db.store_message('user1', 'session1', f'message {i}', 'user' if i % 2 == 0 else 'bot')
+        history = db.get_conversation_history('user1', 'session1', limit=50)
+        assert time.perf_counter() - start < 5
+        
+        assert [item['message'] for item in history] == [f'message {i}' for i in range(20)]
+        assert db.get_user_profile('user1')['total_messages'] == 20
+        
+        stats = db.health_check()['write_behind']
+        assert stats['written'] == 20
+        assert stats['batches'] == 1
+        assert stats['pending'] == 0
+        
+        # Shutdown flushes what is still queued
+        db.store_message('user2', 'session2', 'last words', 'user')
+        db.close()
+        reopened = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        assert reopened.get_conversation_history('user2')[0]['message'] == 'last words'
+        reopened.close()
+        
+        print("✅ SUCCESS: Write-behind storage is consistent!")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_backpressure_and_failed_records():
+    """A full queue blocks producers and a bad record does not drop its batch."""
+    written = []
+    release = threading.Event()
+    
+    def write_batch(records):
+        release.wait()
+        if 'bad' in records:
+            raise ValueError("bad record")
+        written.extend(records)
+    
+    failures = []
+    writer = WriteBehindQueue(write_batch, flush_interval_ms=0, batch_size=10, max_queue_size=2,
+                              on_failure=failures.extend)
+    producer = threading.Thread(target=lambda: [writer.submit(item) for item in ['a', 'bad', 'b', 'c', 'd']])
+    producer.start()
+    time.sleep(0.1)
+    assert producer.is_alive()
+    
+    release.set()
+    producer.join()
+    assert writer.flush(timeout=5)
+    writer.close()
+    
+    assert written == ['a', 'b', 'c', 'd']
+    assert failures == ['bad']
+    stats = writer.get_stats()
+    assert stats['backpressure_waits'] > 0
+    assert stats['failed'] == 1
+
+
+def test_submits_racing_close_are_written():
+    """Every record accepted while close() runs is written; later submits raise."""
+    for _ in range(20):
+        written = []
+        writer = WriteBehindQueue(written.extend, flush_interval_ms=0, batch_size=16)
+        accepted = []
+        
+        def submit_many(thread_index):
+            for i in range(200):
+                try:
+                    writer.submit((thread_index, i))
+                except RuntimeError:
+                    return
+                accepted.append((thread_index, i))
+        
+        threads = [threading.Thread(target=submit_many, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        writer.close()
+        for thread in threads:
+            thread.join()
+        assert sorted(written) == sorted(accepted)
+
+
+def test_failed_writes_invalidate_cached_profiles():
+    """A cached profile does not keep counting a queued message that failed to write."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(tmp_dir, 'chatbot.db'))
+        db.initialize_database()
+        db.enable_profile_cache()
+        db.enable_write_behind(flush_interval_ms=10000)
+        db.store_message('user1', 'session1', 'hello', 'user')
+        assert db.get_user_profile('user1')['total_messages'] == 1
+        
+        # NULL violates the NOT NULL message column once the batch is written
+        db.store_message('user1', 'session1', None, 'user')
+        db.write_queue.flush(timeout=5)
+        assert db.write_queue.get_stats()['failed'] == 1
+        assert db.get_user_profile('user1')['total_messages'] == 1
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_read_your_writes_and_group_commit()
+    test_backpressure_and_failed_records()
+    test_submits_racing_close_are_written()
+    test_failed_writes_invalidate_cached_profiles()